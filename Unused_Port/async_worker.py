@@ -0,0 +1,162 @@
+import asyncio
+import logging
+from typing import FrozenSet, Generator, Iterable, Iterator, Union
+
+from Unused_Port.concurrency import Outcome
+from Unused_Port.executor import executor
+from Unused_Port.health import health_store
+from Unused_Port.ip_set import IPSet
+from Unused_Port.retry import RetryStats
+from Unused_Port.ssh_worker import SSHWorker
+from Unused_Port.static import ASYNC_DISCOVERY_LIMIT, ASYNC_SSH_LIMIT
+
+_log = logging.getLogger(__name__)
+
+
+class AsyncWorker:
+    """
+    Asyncio Worker.
+
+    Cette classe utilise une seule boucle asyncio pour découvrir les hosts
+    (port 22) et lancer 'Unused Port Checker' sur chaque host up dès qu'il
+    est découvert, sans attendre la fin de la découverte.
+
+    Paramiko étant bloquant, les sessions SSH sont executées dans le pool
+    de threads partagé (voir executor.py), au plus 'ssh_limit' en meme temps
+    et dans la limite du controller 'ssh' du site (voir concurrency.py), la
+    découverte elle n'utilise aucun thread.
+    """
+
+    def __init__(
+        self,
+        l_hosts: Union[list, set, Generator, FrozenSet, IPSet],
+        *,
+        username: str,
+        password: str,
+        stdout: str = "default",
+        site=None,
+        limit: int = ASYNC_DISCOVERY_LIMIT,
+        ssh_limit: int = ASYNC_SSH_LIMIT,
+    ):
+        """
+        Instancie la classe 'AsyncWorker'.
+
+        :param l_hosts: Une 'liste' d'une ou plusieurs ipv4
+        :param username: l'username du compte
+        :param password: le password du compte
+        :param stdout: la sortie voulu 'excel', 'console', 'txt'
+        :param site: le site 'France', 'Paris' ...
+        :param limit: le nombre de connexions de découverte en parallèle
+        :param ssh_limit: le nombre de sessions SSH en parallèle
+        """
+        self._hosts: Iterable = l_hosts
+        self._limit: int = limit
+        self._ssh_limit: int = ssh_limit
+        self._site = site
+        self._ssh = SSHWorker(
+            [], username=username, password=password, stdout=stdout, site=site
+        )
+        self.valid: list[str] = []
+
+    def start(self) -> list[str]:
+        """
+        Point d'entrée pour chaque instance de classe 'AsyncWorker', lance la
+        boucle asyncio jusqu'a ce que tous les hosts soient traités.
+
+        :return: la liste des ips valides
+        """
+        _log.info("Debut du check des ips (asyncio)")
+        asyncio.run(self._run())
+        RetryStats.log()
+        _log.info(f"Fin du processus asyncio, {len(self.valid)} Hosts détectés")
+        return self.valid
+
+    async def _run(self) -> None:
+        """
+        Cette fonction crée les coroutines de découverte et les coroutines
+        SSH, reliées par une queue.
+
+        :return: None
+        """
+        hosts: Iterator = iter(self._hosts)
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self._ssh_limit * 2)
+
+        discover = [
+            asyncio.create_task(self._discover(hosts, queue))
+            for _ in range(self._limit)
+        ]
+        ssh = [
+            asyncio.create_task(self._validate(queue)) for _ in range(self._ssh_limit)
+        ]
+        await asyncio.gather(*discover)
+        await queue.join()
+        for task in ssh:
+            task.cancel()
+        await asyncio.gather(*ssh, return_exceptions=True)
+
+    async def _discover(self, hosts: Iterator, queue: asyncio.Queue) -> None:
+        """
+        Cette coroutine récupère le prochain host, check si il est up et
+        l'envoie dans la queue SSH.
+
+        :param hosts: l'itérateur d'ips partagé par les coroutines
+        :param queue: la queue vers les coroutines SSH
+        :return: None
+        """
+        for host in hosts:
+            host = str(host).strip()
+            if await self._check_host(host):
+                self.valid.append(host)
+                await queue.put(host)
+
+    async def _check_host(self, host: str) -> bool:
+        """
+        Cette coroutine essaye d'ouvrir une connexion vers l'host sur le port
+        22 avec un timeout de 1s.
+
+        :param host: ipv4
+        :return: True si l'host est up, sinon False
+        """
+        try:
+            _, writer = await asyncio.wait_for(
+                asyncio.open_connection(host, 22), timeout=1
+            )
+        except (asyncio.TimeoutError, OSError) as e:
+            _log.debug(f"Erreur lors de la connexion vers l'host {host}: {e}")
+            health_store.record(host, Outcome.DOWN)
+            return False
+        writer.close()
+        try:
+            await writer.wait_closed()  # libère le transport
+        except OSError:
+            pass
+        _log.debug(f"Succes lors de la connexion vers l'host {host}.")
+        return True
+
+    async def _validate(self, queue: asyncio.Queue) -> None:
+        """
+        Cette coroutine récupère les hosts up de la queue et execute
+        SSHWorker._validate_host() dans le pool de threads.
+
+        :param queue: la queue alimentée par les coroutines de découverte
+        :return: None
+        """
+        while True:
+            ip = await queue.get()
+            try:
+                await asyncio.wrap_future(
+                    executor.submit(
+                        self._ssh._validate_host,
+                        ip,
+                        site=self._site,
+                        controller=self._ssh.controller,
+                    )
+                )
+            except Exception as e:
+                _log.error(e)
+            finally:
+                queue.task_done()
+
+
+if __name__ == "__main__":
+    pass
@@ -0,0 +1,144 @@
+import logging
+import os
+import re
+import socket
+from time import monotonic
+from typing import Optional
+
+from Unused_Port.concurrency import AIMDController, Outcome
+from Unused_Port.executor import executor
+from Unused_Port.handoff import socket_handoff
+from Unused_Port.health import health_store
+from Unused_Port.static import BANNER_DROP, BANNER_RULES, BANNER_TIMEOUT
+
+_log = logging.getLogger(__name__)
+
+try:
+    from paramiko import SSHException, Transport
+except ImportError:
+    _log.warning("Installation de paramiko en cours ...")
+    os.system("pip install paramiko -q -q -q")
+    from paramiko import SSHException, Transport
+
+_rules: list[tuple[re.Pattern, str]] = [
+    (re.compile(pattern, re.IGNORECASE), kind) for pattern, kind in BANNER_RULES
+]
+
+
+def classify(banner: str, key_type: str = "") -> str:
+    """
+    Cette fonction classe un équipement depuis sa bannière SSH (ex :
+    'SSH-2.0-Cisco-1.25') et le type de sa clé d'host si il est connu, avec
+    les règles de static.BANNER_RULES (la premiere règle qui match gagne).
+
+    :param banner: la bannière SSH de l'host
+    :param key_type: le type de la clé d'host (ex : 'ssh-rsa'), optionnel
+    :return: le type d'équipement ('cisco_ios', 'panos' ...), 'unknown' si
+        aucune règle ne match
+    """
+    value = f"{banner} {key_type}".strip()
+    for rule, kind in _rules:
+        if rule.search(value):
+            return kind
+    return "unknown"
+
+
+def is_dropped(kind: str) -> bool:
+    """
+    Cette fonction check si un type d'équipement ne peut pas produire de
+    rapport (static.BANNER_DROP), il est alors ignoré avant le login SSH.
+
+    :param kind: le type d'équipement, voir classify()
+    :return: True si l'host doit etre ignoré
+    """
+    return kind in BANNER_DROP
+
+
+def peek_banner(sock: socket.socket) -> Optional[str]:
+    """
+    Cette fonction lit la bannière SSH envoyée par l'host, sans la retirer
+    du socket (MSG_PEEK) : paramiko la relira si le socket lui est donné
+    (voir handoff.py).
+
+    :param sock: le socket connecté au port 22 de l'host
+    :return: la ligne 'SSH-...', None si rien n'est recu
+    """
+    try:
+        data = sock.recv(255, socket.MSG_PEEK)
+    except (BlockingIOError, socket.timeout):
+        return None
+    except OSError as e:
+        _log.debug(f"Erreur lors de la lecture de la bannière SSH : {e}")
+        return None
+    for line in data.decode("ascii", "replace").splitlines():
+        if line.startswith("SSH-"):
+            return line.strip()
+    return data.decode("ascii", "replace").strip() or None
+
+
+def host_key_type(host: str, timeout: float = BANNER_TIMEOUT) -> str:
+    """
+    Cette fonction récupère le type de la clé d'host (échange de clés SSH,
+    sans authentification) sur une nouvelle connexion.
+
+    :param host: ipv4
+    :param timeout: le délai max en seconde
+    :return: le type de clé (ex : 'ssh-rsa'), '' si erreur
+    """
+    sock, transport = None, None
+    try:
+        sock = socket.create_connection((host, 22), timeout=timeout)
+        transport = Transport(sock)
+        transport.banner_timeout = timeout
+        transport.start_client(timeout=timeout)
+        return transport.get_remote_server_key().get_name()
+    except (SSHException, OSError, EOFError) as e:
+        _log.debug(f"Erreur lors de la récupération de la clé d'host de {host}: {e}")
+        return ""
+    finally:
+        if transport:
+            transport.close()
+        elif sock:
+            sock.close()
+
+
+def filter_host_keys(
+    hosts: list[str], banners: dict[str, str], site: Optional[str] = None
+) -> list[str]:
+    """
+    Cette fonction récupère le type de clé d'host de chaque host, dans le
+    pool de threads partagé (voir executor.py) limité par le controller
+    'ssh' du site, et retire les hosts que la bannière + le type de clé
+    classent dans static.BANNER_DROP.
+
+    :param hosts: les ips valides de la découverte
+    :param banners: la bannière SSH de chaque host
+    :param site: le site ('France' / 'US' ...), pour la concurrence du site
+    :return: les ips gardées
+    """
+    key_types: dict[str, str] = {}
+
+    def _fetch(host: str) -> tuple[str, Optional[float]]:
+        start = monotonic()
+        key_types[host] = host_key_type(host)
+        if not key_types[host]:
+            return Outcome.ERROR, None
+        return Outcome.SUCCESS, monotonic() - start
+
+    executor.run(_fetch, hosts, site=site, controller=AIMDController.get(site, "ssh"))
+    kept: list[str] = []
+    for host in hosts:
+        key_type = key_types.get(host, "")
+        kind = classify(banners.get(host, ""), key_type)
+        if not is_dropped(kind):
+            kept.append(host)
+            continue
+        _log.debug(f"Host {host} ignoré, équipement {kind} ({key_type})")
+        if sock := socket_handoff.pop(host):
+            sock.close()
+        health_store.record(host, Outcome.NON_CISCO)
+    return kept
+
+
+if __name__ == "__main__":
+    pass
@@ -1,18 +1,27 @@
 import logging
 import os
-from typing import ClassVar, Union
+import socket
+from time import monotonic
+from typing import ClassVar, Optional, Union
 
-from Unused_Port.errors import UPC_SSH_CONNEXION_ERROR
-from Unused_Port.helper import retry
+from Unused_Port.errors import (
+    UPC_AUTH_ERROR,
+    UPC_SSH_CONNEXION_ERROR,
+    UPC_TIMEOUT_ERROR,
+)
+from Unused_Port.handoff import socket_handoff
+from Unused_Port.ratelimit import throttle
+from Unused_Port.retry import RetryBudget, retry
+from Unused_Port.session_pool import session_pool
 
 _log = logging.getLogger(__name__)
 
 try:
-    from paramiko import SSHClient
+    from paramiko import AuthenticationException, SSHClient
 except ImportError:
     _log.warning("Installation de paramiko en cours ...")
     os.system("pip install paramiko -q -q -q")
-    from paramiko import SSHClient
+    from paramiko import AuthenticationException, SSHClient
 
 
 class BaseConnexion(SSHClient):
@@ -37,8 +46,12 @@ class BaseConnexion(SSHClient):
         cls._instance[_check] = _instance
         return _instance
 
-    def __init__(self, hostname: str, username: str, password: str):
-        """Instancie la classe et crée les attributs _* utilisés par les childs."""
+    def __init__(self, hostname: str, username: str, password: str, site=None):
+        """
+        Instancie la classe et crée les attributs _* utilisés par les childs.
+
+        :param site: le site ('France' / 'US' ...), pour les rate limits du site
+        """
         if not hostname or not username or not password:
             raise Exception(
                 "Les paramètres 'hostname','username' et 'password' sont obligatoires"
@@ -46,7 +59,12 @@ class BaseConnexion(SSHClient):
         self._hostname: str = hostname
         self._username: str = username
         self._password: str = password
+        self._site = site
+        self._session_key: tuple[str, str, str] = (hostname, username, password)
+        RetryBudget.reset(hostname)  # nouveau budget de retry a chaque check
         self.valid = False
+        self.error: Optional[UPC_SSH_CONNEXION_ERROR] = None
+        self.latency: Optional[float] = None
 
         super().__init__()
 
@@ -57,31 +75,63 @@ class BaseConnexion(SSHClient):
         délais de 1 seconde entre chaque essai, au switch dont
         l'hostname est self._hostname.
 
+        Si une session authentifiée est disponible dans la pool de sessions
+        (voir session_pool.py), elle est réutilisée sans nouveau login. Sinon
+        le socket de la découverte est utilisé si il est encore ouvert (voir
+        handoff.py), ou une nouvelle connexion est ouverte.
+
         :return: False si connecté, raise UPC_SSH_CONNEXION_ERROR()
-            après 3 essais non concluants
+            après 3 essais non concluants (UPC_AUTH_ERROR /
+            UPC_TIMEOUT_ERROR si l'erreur est identifiée, gardée dans
+            self.error)
         """
         _log.debug(
             f"Connexion SSH au switch {self._hostname}... (20s avant de timeout)"
         )
+        if transport := session_pool.get(self._session_key):
+            self._transport = transport
+            self.latency = None  # pas de login, pas de mesure pour l'AIMD
+            self.error = None
+            self.valid = True
+            return False
+        throttle(self._site, "login")
+        sock = socket_handoff.pop(self._hostname)
+        start = monotonic()
         try:
             self.connect(
                 hostname=self._hostname,
                 username=self._username,
                 password=self._password,
+                sock=sock,
             )
 
         except (OSError, Exception) as e:
             self.close()
-            if isinstance(e, OSError) and e.winerror == 10060:
-                raise UPC_SSH_CONNEXION_ERROR(
-                    "Erreur timeout, " "Check l'ip fournie !"
-                ) from e
-            raise UPC_SSH_CONNEXION_ERROR(str(e)) from e
+            if isinstance(e, AuthenticationException):
+                self.error = UPC_AUTH_ERROR(f"{e} (ip: {self._hostname})")
+            elif isinstance(e, socket.timeout) or getattr(e, "winerror", None) == 10060:
+                self.error = UPC_TIMEOUT_ERROR("Erreur timeout, Check l'ip fournie !")
+            else:
+                self.error = UPC_SSH_CONNEXION_ERROR(str(e))
+            raise self.error from e
         else:
             _log.info(f"Connexion SSH au switch {self._hostname} : Succes !")
+            self.latency = monotonic() - start
+            self.error = None
             self.valid = True
             return False
 
+    def _release_session(self) -> None:
+        """
+        Permet de rendre le transport SSH a la pool de sessions, pour les
+        prochains checks du meme switch, ou de le fermer si la pool le refuse.
+
+        :return: None
+        """
+        if session_pool.put(self._session_key, self.get_transport()):
+            self._transport = None  # gardé par la pool, close() ne le ferme pas
+        self.close()
+
     @classmethod
     def _remove_instance(cls, hostname: str, username: str, password: str):
         """
@@ -101,4 +151,5 @@ class BaseConnexion(SSHClient):
     def _stop(self):
         """Permet de stopper l'instance en cours."""
         self._remove_instance(self._hostname, self._username, self._password)
+        RetryBudget.reset(self._hostname)
         _log.debug(f"Suppression de l'instance pour l'host {self._hostname}")
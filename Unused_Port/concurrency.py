@@ -0,0 +1,159 @@
+import logging
+from threading import Condition, Lock
+from time import monotonic
+from typing import ClassVar, Optional
+
+from Unused_Port.static import CONCURRENCY, SITE_CONCURRENCY
+
+_log = logging.getLogger(__name__)
+
+
+class Outcome:
+    """Liste des résultats possibles d'un host, remontés au controller."""
+
+    SUCCESS = "success"
+    DOWN = "down"  # host non joignable lors de la découverte, neutre
+    TIMEOUT = "timeout"
+    AUTH = "auth"
+    NON_CISCO = "non_cisco"  # 'sh version' non compris, neutre
+    ERROR = "error"  # erreur propre a l'host, neutre
+
+
+class AIMDController:
+    """
+    Controller AIMD (additive increase / multiplicative decrease) du
+    nombre d'hosts traités en meme temps.
+
+    Chaque succès rapide augmente la limite de 'increase', une latence trop
+    haute, un timeout ou un refus d'authentification la multiplie par
+    'decrease' (au plus une fois par 'cooldown' secondes), entre 'floor' et
+    'ceiling'.
+    """
+
+    _instance: ClassVar[dict[tuple[Optional[str], str], "AIMDController"]] = {}
+    _lock: ClassVar[Lock] = Lock()
+
+    def __init__(
+        self,
+        ceiling: int,
+        *,
+        floor: int = 1,
+        target_latency: float = 1.0,
+        increase: float = 1.0,
+        decrease: float = 0.5,
+        cooldown: float = 1.0,
+        name: str = "",
+    ):
+        """
+        Instancie la classe 'AIMDController'.
+
+        :param ceiling: la limite max d'hosts en parallèle
+        :param floor: la limite min d'hosts en parallèle
+        :param target_latency: la latence (s) au dessus de laquelle la
+            limite diminue
+        :param increase: l'augmentation de la limite par succès
+        :param decrease: le facteur de diminution
+        :param cooldown: le délai min (s) entre deux diminutions
+        :param name: le nom du controller pour les logs
+        """
+        self.ceiling: int = max(1, ceiling)
+        self.floor: int = max(1, min(floor, self.ceiling))
+        self._limit: float = float(max(self.floor, self.ceiling // 2))
+        self._target: float = target_latency
+        self._increase: float = increase
+        self._decrease: float = decrease
+        self._cooldown: float = cooldown
+        self._last_decrease: float = 0.0
+        self._in_flight: int = 0
+        self._cond: Condition = Condition()
+        self.name: str = name
+
+    @classmethod
+    def get(cls, site: Optional[str], kind: str) -> "AIMDController":
+        """
+        Cette fonction retourne le controller du site pour 'kind'
+        ('discovery' ou 'ssh'), la limite apprise est gardée entre les runs.
+
+        :param site: le site ('France' / 'US' ...)
+        :param kind: 'discovery' ou 'ssh'
+        :return: l'instance de AIMDController
+        """
+        with cls._lock:
+            if not (controller := cls._instance.get((site, kind))):
+                conf = {
+                    **CONCURRENCY[kind],
+                    **SITE_CONCURRENCY.get(site, {}).get(kind, {}),
+                }
+                controller = cls(**conf, name=f"{kind} {site or ''}".strip())
+                cls._instance[(site, kind)] = controller
+            return controller
+
+    @property
+    def limit(self) -> int:
+        """Retourne la limite actuelle d'hosts en parallèle."""
+        return int(self._limit)
+
+    def acquire(self) -> None:
+        """
+        Cette fonction attend qu'une place soit libre, puis la prend.
+
+        :return: None
+        """
+        with self._cond:
+            while self._in_flight >= self.limit:
+                self._cond.wait()
+            self._in_flight += 1
+
+    def try_acquire(self) -> bool:
+        """
+        Cette fonction prend une place si elle est libre, sans attendre
+        (voir executor.py).
+
+        :return: True si la place est prise, sinon False
+        """
+        with self._cond:
+            if self._in_flight >= self.limit:
+                return False
+            self._in_flight += 1
+            return True
+
+    def release(self, outcome: str, latency: Optional[float] = None) -> None:
+        """
+        Cette fonction libère la place et ajuste la limite en fonction du
+        résultat de l'host.
+
+        :param outcome: le résultat, voir la classe Outcome
+        :param latency: la latence de connexion observée (s), None si aucune
+            connexion n'a été mesurée (ex : session réutilisée), le résultat
+            ne compte alors pas pour la limite
+        :return: None
+        """
+        with self._cond:
+            self._in_flight -= 1
+            if outcome in (Outcome.TIMEOUT, Outcome.AUTH) or (
+                outcome == Outcome.SUCCESS
+                and latency is not None
+                and latency > self._target
+            ):
+                self._shrink(outcome)
+            elif outcome == Outcome.SUCCESS and latency is not None:
+                self._limit = min(self.ceiling, self._limit + self._increase)
+            self._cond.notify_all()
+
+    def _shrink(self, outcome: str) -> None:
+        """
+        Cette fonction divise la limite, au plus une fois par 'cooldown'.
+
+        :param outcome: le résultat ayant provoqué la diminution
+        :return: None
+        """
+        now = monotonic()
+        if now - self._last_decrease < self._cooldown:
+            return
+        self._last_decrease = now
+        self._limit = max(self.floor, self._limit * self._decrease)
+        _log.debug(f"Controller {self.name} : {outcome}, limite -> {self.limit}")
+
+
+if __name__ == "__main__":
+    pass
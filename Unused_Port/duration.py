@@ -0,0 +1,67 @@
+import re
+import sys
+from typing import Optional
+
+MINUTE: int = 60
+HOUR: int = 60 * MINUTE
+DAY: int = 24 * HOUR
+WEEK: int = 7 * DAY
+YEAR: int = 365 * DAY
+
+# 'never' est plus grand que toutes les durées, les comparaisons restent des int
+NEVER: int = sys.maxsize
+
+_UNITS: dict[str, int] = {
+    "y": YEAR,
+    "w": WEEK,
+    "d": DAY,
+    "h": HOUR,
+    "m": MINUTE,
+    "s": 1,
+}
+
+_duration_compile = re.compile(r"(\d+)\s*([ywdhms])[a-z()]*", re.IGNORECASE)
+_clock_compile = re.compile(r"^(\d+):(\d{2}):(\d{2})$")
+
+
+def parse_duration(value: str) -> Optional[int]:
+    """
+    Cette fonction convertit une durée Cisco en secondes.
+
+    Formats acceptés : 'never', '00:01:02', '3d04h', '5w2d', '1y2w',
+    '1 year, 2 weeks, 3 days, 4 hours, 5 minutes' ou
+    '10 day(s), 3 hour(s)' (NX-OS).
+
+    :param value: la durée telle qu'affichée par le switch
+    :return: la durée en secondes (NEVER pour 'never'), None si le format
+        est inconnu
+    """
+    value = value.strip().rstrip(",")
+    if value == "never":
+        return NEVER
+    if match := _clock_compile.match(value):
+        hours, minutes, seconds = (int(group) for group in match.groups())
+        return hours * HOUR + minutes * MINUTE + seconds
+    units = _duration_compile.findall(value)
+    if not units:
+        return None
+    return sum(int(number) * _UNITS[unit.lower()] for number, unit in units)
+
+
+def format_weeks(seconds: int) -> str:
+    """
+    Cette fonction formate une durée en années / semaines, comme affiché
+    dans les sorties (excel, txt).
+
+    :param seconds: la durée en secondes
+    :return: ex : '1 year, 2 week(s)', '5 week(s)', '< 1 week'
+    """
+    years, rest = divmod(seconds, YEAR)
+    weeks = rest // WEEK
+    if years:
+        return f"{years} year, {weeks} week(s)"
+    return f"{weeks} week(s)" if weeks else "< 1 week"
+
+
+if __name__ == "__main__":
+    pass
@@ -17,10 +17,22 @@ class UPC_VALIDATION_ERROR(UPC_ERROR):
     """Erreur lors de la validation de la data reçue."""
 
 
+class UPC_NON_CISCO_ERROR(UPC_VALIDATION_ERROR):
+    """Sortie recue mais non comprise, l'appareil n'est pas un cisco."""
+
+
 class UPC_SSH_CONNEXION_ERROR(UPC_ERROR):
     """Erreur lors de la connexion au switch."""
 
 
+class UPC_AUTH_ERROR(UPC_SSH_CONNEXION_ERROR):
+    """Erreur d'authentification lors de la connexion au switch."""
+
+
+class UPC_TIMEOUT_ERROR(UPC_SSH_CONNEXION_ERROR):
+    """Timeout lors de la connexion au switch."""
+
+
 class UPC_UNKNOWN_ERROR(UPC_ERROR):
     """Erreur inconnue."""
 
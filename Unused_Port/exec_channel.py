@@ -0,0 +1,120 @@
+import logging
+import os
+from threading import Lock, Thread
+from typing import Any, Callable, Optional
+
+from Unused_Port.recv_buffer import RecvBuffer
+
+_log = logging.getLogger(__name__)
+
+try:
+    from paramiko import SSHException, Transport
+except ImportError:
+    _log.warning("Installation de paramiko en cours ...")
+    os.system("pip install paramiko -q -q -q")
+    from paramiko import SSHException, Transport
+
+
+class ExecChannelPool:
+    """
+    Threaded Exec Channels.
+
+    Cette classe execute des commandes sur plusieurs channels 'exec' ouverts
+    en parallèle sur le transport SSH deja authentifié, sans nouvelle
+    connexion (ni nouveau login) au switch.
+    """
+
+    def __init__(
+        self,
+        transport: Optional["Transport"],
+        size: int,
+        *,
+        timeout: float = 30,
+        throttle: Optional[Callable[[], Any]] = None,
+    ):
+        """
+        Instancie la classe 'ExecChannelPool'.
+
+        :param transport: le transport paramiko deja authentifié (None si
+            la connexion est fermée, aucune commande n'est alors executée)
+        :param size: le nombre de channels ouverts en meme temps
+        :param timeout: le délai max en seconde pour une commande
+        :param throttle: fonction appelée avant chaque commande (rate limit)
+        """
+        self._transport = transport
+        self._size: int = max(1, size)
+        self._timeout: float = timeout
+        self._throttle = throttle
+        self.lock: Lock = Lock()
+        self.disabled: bool = transport is None or not transport.is_active()
+
+    def run(self, cmds: list[str]) -> list[Optional[str]]:
+        """
+        Point d'entrée de la classe, execute toutes les commandes sur
+        'size' channels en parallèle.
+
+        :param cmds: la liste des commandes a executer
+        :return: la sortie de chaque commande, dans l'ordre de 'cmds'
+            (None si la commande n'a pas pu etre executée)
+        """
+        results: list[Optional[str]] = [None] * len(cmds)
+        if self.disabled:
+            _log.debug("Transport SSH fermé, aucun channel exec")
+            return results
+        index = iter(range(len(cmds)))
+
+        def _worker() -> None:
+            while not self.disabled:
+                with self.lock:
+                    i = next(index, None)
+                if i is None:
+                    return
+                results[i] = self._exec(cmds[i])
+
+        threads = [
+            Thread(target=_worker, args=()) for _ in range(min(self._size, len(cmds)))
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results
+
+    def _exec(self, cmd: str) -> Optional[str]:
+        """
+        Cette fonction ouvre un channel 'exec', execute la commande et lit
+        sa sortie jusqu'a la fermeture du channel par le switch.
+
+        Si le switch refuse les channels 'exec', le pool est désactivé.
+
+        :param cmd: la commande a executer
+        :return: la sortie de la commande, None si erreur
+        """
+        if self._throttle:
+            self._throttle()
+        try:
+            channel = self._transport.open_session(timeout=self._timeout)  # type: ignore
+        except (SSHException, OSError, EOFError) as e:
+            _log.warning(f"Channels exec refusés, désactivation du pool : {e}")
+            self.disabled = True
+            return None
+
+        buffer = RecvBuffer()
+        lines: list[str] = []
+        try:
+            channel.settimeout(self._timeout)
+            channel.set_combine_stderr(True)
+            channel.exec_command(cmd)
+            while data := channel.recv(65535):
+                lines += buffer.feed(data)
+            lines.append(buffer.tail())
+            return "\n".join(lines)
+        except (SSHException, OSError, EOFError) as e:
+            _log.debug(f"Erreur lors de la commande {cmd} sur un channel exec : {e}")
+            return None
+        finally:
+            channel.close()
+
+
+if __name__ == "__main__":
+    pass
@@ -0,0 +1,250 @@
+import logging
+from collections import deque
+from concurrent.futures import Future
+from queue import SimpleQueue
+from threading import Condition, Thread
+from time import monotonic
+from typing import Any, Callable, Iterable, Optional
+
+from Unused_Port.concurrency import AIMDController, Outcome
+from Unused_Port.static import EXECUTOR_IDLE_TIMEOUT, EXECUTOR_MAX_WORKERS
+
+_log = logging.getLogger(__name__)
+
+# (future, fonction, argument, controller)
+_Task = tuple[Future, Callable, Any, Optional[AIMDController]]
+
+
+class SharedExecutor:
+    """
+    Pool de threads unique du process, partagé par tous les sites et par
+    tous les runs (--schedule / service), a la place des threads crées puis
+    joins par chaque SocketWorker / SSHWorker.
+
+    Chaque site a sa propre file de taches, les threads prennent les taches
+    des sites a tour de role (round-robin), et un site ne peut pas occuper
+    plus de sa part des threads (max_workers / nombre de sites actifs).
+    Une tache avec un AIMDController (voir concurrency.py) ne démarre que si
+    le controller a une place libre, sans bloquer de thread ni les taches
+    suivantes du site qui ont un autre controller (découverte / SSH).
+
+    Les threads sont crées a la demande (tant que les taches en attente sont
+    plus nombreuses que les threads libres), et s'arretent après
+    'idle_timeout' secondes sans tache.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = EXECUTOR_MAX_WORKERS,
+        *,
+        idle_timeout: float = EXECUTOR_IDLE_TIMEOUT,
+    ):
+        """
+        Instancie la classe 'SharedExecutor'.
+
+        :param max_workers: le nombre max de threads
+        :param idle_timeout: le délai (s) sans tache avant l'arret d'un thread
+        """
+        self.max_workers: int = max(1, max_workers)
+        self._idle_timeout: float = idle_timeout
+        self._tasks: dict[Optional[str], deque[_Task]] = {}
+        self._running: dict[Optional[str], int] = {}
+        self._order: deque[Optional[str]] = deque()
+        self._threads: int = 0
+        self._idle: int = 0
+        self._cond: Condition = Condition()
+
+    def submit(
+        self,
+        fn: Callable,
+        arg: Any,
+        *,
+        site: Optional[str] = None,
+        controller: Optional[AIMDController] = None,
+    ) -> Future:
+        """
+        Cette fonction ajoute la tache fn(arg) a la file du site.
+
+        :param fn: la fonction, si 'controller' est donné elle doit
+            retourner (résultat, latence), voir AIMDController.release()
+        :param arg: l'argument de la fonction (une ip)
+        :param site: le site ('France' / 'US' ...)
+        :param controller: le controller qui limite les taches en parallèle
+        :return: le Future de la tache
+        """
+        future: Future = Future()
+        with self._cond:
+            if site not in self._tasks:
+                self._tasks[site] = deque()
+                self._running.setdefault(site, 0)
+                self._order.append(site)
+            self._tasks[site].append((future, fn, arg, controller))
+            queued = sum(len(tasks) for tasks in self._tasks.values())
+            if queued > self._idle and self._threads < self.max_workers:
+                self._threads += 1
+                Thread(target=self._work, name="executor", daemon=True).start()
+            self._cond.notify()
+        return future
+
+    def run(
+        self,
+        fn: Callable,
+        items: Iterable,
+        *,
+        site: Optional[str] = None,
+        controller: Optional[AIMDController] = None,
+        on_result: Optional[Callable[[Any, Any], None]] = None,
+    ) -> None:
+        """
+        Cette fonction execute fn(item) pour chaque item et attend la fin de
+        toutes les taches. Les items sont lus au fur et a mesure (au plus
+        'controller.ceiling' taches en attente), ils peuvent donc venir d'un
+        Generator / IPSet / Queue sans etre tous chargés.
+
+        :param fn: la fonction, voir submit()
+        :param items: les arguments (ips)
+        :param site: le site ('France' / 'US' ...)
+        :param controller: le controller qui limite les taches en parallèle
+        :param on_result: appelée avec (item, résultat) de chaque tache dans
+            le thread appelant, elle peut donc bloquer sans bloquer le pool
+        :return: None
+        """
+        done: SimpleQueue = SimpleQueue()
+        window = controller.ceiling if controller else self.max_workers
+        in_flight = 0
+        for item in items:
+            while in_flight >= window:
+                self._collect(*done.get(), on_result)
+                in_flight -= 1
+            future = self.submit(fn, item, site=site, controller=controller)
+            future.add_done_callback(lambda f, item=item: done.put((item, f)))
+            in_flight += 1
+        for _ in range(in_flight):
+            self._collect(*done.get(), on_result)
+
+    @staticmethod
+    def _collect(
+        item: Any, future: Future, on_result: Optional[Callable[[Any, Any], None]]
+    ) -> None:
+        """
+        Cette fonction traite une tache terminée de run().
+
+        :param item: l'argument de la tache
+        :param future: le Future de la tache
+        :param on_result: voir run()
+        :return: None
+        """
+        if error := future.exception():
+            _log.error(f"Erreur lors du traitement de {item} : {error}")
+        elif on_result:
+            on_result(item, future.result())
+
+    def _next(self) -> Optional[tuple[Optional[str], _Task]]:
+        """
+        Cette fonction choisit la prochaine tache (appelée avec self._cond) :
+        le premier site dans l'ordre du round-robin qui est sous sa part des
+        threads et qui a une tache dont le controller a une place libre (la
+        premiere de sa file qui peut démarrer).
+
+        :return: (site, tache), None si aucune tache ne peut démarrer
+        """
+        active = sum(
+            1 for site in self._order if self._tasks[site] or self._running[site]
+        )
+        share = max(1, self.max_workers // max(1, active))
+        for _ in range(len(self._order)):
+            site = self._order[0]
+            self._order.rotate(-1)
+            tasks = self._tasks[site]
+            if not tasks or self._running[site] >= share:
+                continue
+            if (i := self._startable(tasks)) is None:
+                continue
+            task = tasks[i]
+            del tasks[i]
+            self._running[site] += 1
+            return site, task
+        return None
+
+    @staticmethod
+    def _startable(tasks: deque[_Task]) -> Optional[int]:
+        """
+        Cette fonction cherche la premiere tache de la file qui peut démarrer
+        (sans controller, ou dont le controller a une place libre, la place
+        est alors prise).
+
+        :param tasks: la file de taches d'un site
+        :return: l'index de la tache, None si aucune ne peut démarrer
+        """
+        full: list[AIMDController] = []
+        for i, (_, _, _, controller) in enumerate(tasks):
+            if controller is None:
+                return i
+            if any(controller is other for other in full):
+                continue
+            if controller.try_acquire():
+                return i
+            full.append(controller)
+        return None
+
+    def _work(self) -> None:
+        """
+        Boucle de chaque thread : prend la prochaine tache et l'execute,
+        s'arrete après 'idle_timeout' secondes sans tache.
+
+        :return: None
+        """
+        while True:
+            with self._cond:
+                idle_since = monotonic()
+                while not (picked := self._next()):
+                    if monotonic() - idle_since >= self._idle_timeout:
+                        self._threads -= 1
+                        return
+                    self._idle += 1
+                    self._cond.wait(timeout=1.0)
+                    self._idle -= 1
+            site, task = picked
+            self._execute(site, *task)
+
+    def _execute(
+        self,
+        site: Optional[str],
+        future: Future,
+        fn: Callable,
+        arg: Any,
+        controller: Optional[AIMDController],
+    ) -> None:
+        """
+        Cette fonction execute une tache, libère la place du controller et
+        réveille les threads en attente.
+
+        :param site: le site de la tache
+        :param future: le Future de la tache
+        :param fn: la fonction
+        :param arg: l'argument
+        :param controller: le controller de la tache
+        :return: None
+        """
+        result, error = None, None
+        if future.set_running_or_notify_cancel():
+            try:
+                result = fn(arg)
+            except Exception as e:
+                error = e
+        if controller:
+            controller.release(*(result or (Outcome.ERROR, None)))
+        with self._cond:
+            self._running[site] -= 1
+            self._cond.notify_all()
+        if error is not None:
+            future.set_exception(error)
+        elif future.running():
+            future.set_result(result)
+
+
+executor = SharedExecutor()
+
+
+if __name__ == "__main__":
+    pass
@@ -0,0 +1,234 @@
+import csv
+import json
+import logging
+import os
+import tempfile
+from itertools import islice
+from pathlib import Path
+from threading import Lock
+from typing import IO, Any, Iterable, Optional
+
+from Unused_Port.helper import now
+from Unused_Port.static import DIRS, EXPORT, EXPORT_ROW_GROUP
+
+_log = logging.getLogger(__name__)
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # optionnel, seulement pour le format parquet
+    pa = pq = None
+
+COLUMNS: tuple[str, ...] = (
+    "site",
+    "ip",
+    "hostname",
+    "interface",
+    "last_input",
+    "uptime",
+)
+
+
+class Exporter:
+    """
+    Export de toutes les interfaces non utilisées du run dans un seul
+    fichier (csv, jsonl ou parquet), une ligne par interface avec les
+    colonnes de COLUMNS.
+
+    Les lignes sont écrites des qu'un switch est terminé, dans un fichier
+    temporaire renommé a la fin du run (voir begin() / end()).
+
+    Dans un process worker (shard, voir process_runner.py), chaque morceau
+    d'ips écrit ses lignes dans son propre fichier csv temporaire, recopié
+    dans le fichier d'export par le process parent (voir merge()).
+    """
+
+    def __init__(self, fmt: Optional[str] = EXPORT):
+        """
+        Instancie la classe 'Exporter'.
+
+        :param fmt: 'csv', 'jsonl' ou 'parquet', None pour ne pas exporter
+        """
+        self.fmt: Optional[str] = fmt
+        self.shard: bool = False
+        self._rows: list[tuple] = []
+        self._path: Optional[Path] = None
+        self._tmp: Optional[Path] = None
+        self._file: Optional[IO] = None
+        self._csv: Any = None
+        self._parquet: Any = None
+        self._count: int = 0
+        self.lock: Lock = Lock()
+
+    def begin(self) -> bool:
+        """
+        Cette fonction ouvre le fichier d'export du run, si l'export est
+        activé et qu'aucun run n'est en cours (start() est appelé pour chaque
+        site dans le meme run).
+
+        :return: True si le fichier est ouvert par cet appel, l'appelant
+            doit alors appeler end()
+        """
+        with self.lock:
+            if not self.fmt or self._tmp:
+                return False
+            fmt = self.fmt
+            if self.shard:
+                fmt = "csv"  # relu par le process parent, voir merge()
+            elif fmt == "parquet" and pa is None:
+                _log.warning("pyarrow n'est pas installé, export en csv")
+                fmt = "csv"
+            folder = Path(DIRS.get("export"))
+            folder.mkdir(parents=True, exist_ok=True)
+            if self.shard:
+                fd, name = tempfile.mkstemp(".part", "~ports_", folder)
+                os.close(fd)
+                self._path = self._tmp = Path(name)
+            else:
+                self._path = folder / f"ports_{now()}.{fmt}"
+                self._tmp = self._path.with_name(f"~{self._path.name}.tmp")
+            self._count = 0
+            if fmt == "parquet":
+                schema = pa.schema([(column, pa.string()) for column in COLUMNS])
+                self._parquet = pq.ParquetWriter(self._tmp, schema)
+                return True
+            self._file = open(self._tmp, "w", newline="", encoding="utf-8")
+            if fmt == "csv":
+                self._csv = csv.writer(self._file)
+                if not self.shard:
+                    self._csv.writerow(COLUMNS)
+            return True
+
+    def write(
+        self,
+        output: list[tuple[str, str]],
+        *,
+        site: Optional[str],
+        ip: str,
+        hostname: str,
+        uptime: str,
+    ) -> None:
+        """
+        Cette fonction ajoute les interfaces d'un switch a l'export.
+
+        :param output: Une liste de tuples(interface, last input), ex
+            [(gi1/0/2, 12w), (gi1/0/3, never)]
+        :param site: le site 'France' ...
+        :param ip: l'ip du switch
+        :param hostname: l'hostname du switch
+        :param uptime: l'uptime du switch
+        :return: None
+        """
+        if not self.fmt:
+            return
+        self.write_rows(
+            (site or "", ip, hostname, interface, last_input, uptime)
+            for interface, last_input in output
+        )
+
+    def write_rows(self, rows: Iterable[tuple]) -> None:
+        """
+        Cette fonction écrit des lignes dans le fichier d'export.
+
+        :param rows: les lignes, dans l'ordre de COLUMNS
+        :return: None
+        """
+        with self.lock:
+            if not self._tmp:
+                return
+            try:
+                self._write(list(rows))
+            except (OSError, ValueError) as e:
+                _log.error(f"Erreur lors de l'export dans {self._tmp} : {e}")
+
+    def _write(self, rows: list[tuple]) -> None:
+        """
+        Cette fonction écrit les lignes au format du fichier (appelée avec
+        self.lock), en parquet les lignes sont écrites par groupe de
+        EXPORT_ROW_GROUP lignes.
+
+        :param rows: les lignes, dans l'ordre de COLUMNS
+        :return: None
+        """
+        self._count += len(rows)
+        if self._parquet is not None:
+            self._rows.extend(rows)
+            if len(self._rows) >= EXPORT_ROW_GROUP:
+                self._flush_parquet()
+            return
+        if self._csv is not None:
+            self._csv.writerows(rows)
+        else:
+            for row in rows:
+                self._file.write(json.dumps(dict(zip(COLUMNS, row))) + "\n")  # type: ignore
+        self._file.flush()  # type: ignore
+
+    def _flush_parquet(self) -> None:
+        """
+        Cette fonction écrit les lignes en attente dans un row group parquet.
+
+        :return: None
+        """
+        if not self._rows:
+            return
+        columns = list(zip(*self._rows))
+        table = pa.table(
+            {column: list(values) for column, values in zip(COLUMNS, columns)}
+        )
+        self._parquet.write_table(table)
+        self._rows = []
+
+    def merge(self, part: Optional[Path]) -> None:
+        """
+        Cette fonction recopie dans le fichier d'export les lignes d'un
+        morceau d'ips executé dans un process worker, par paquets de
+        EXPORT_ROW_GROUP lignes, puis supprime le fichier du morceau.
+
+        :param part: le fichier du morceau, retourné par end() dans le process
+            worker, None si rien n'a été exporté
+        :return: None
+        """
+        if part is None:
+            return
+        try:
+            with open(part, newline="", encoding="utf-8") as file:
+                reader = csv.reader(file)
+                while rows := [tuple(row) for row in islice(reader, EXPORT_ROW_GROUP)]:
+                    self.write_rows(rows)
+            part.unlink()
+        except OSError as e:
+            _log.error(f"Erreur lors de la lecture de {part} : {e}")
+
+    def end(self) -> Optional[Path]:
+        """
+        Cette fonction ferme le fichier d'export et le renomme (os.replace),
+        dans un process worker le fichier du morceau n'est pas renommé.
+
+        :return: le fichier d'export (ou du morceau), None si erreur
+        """
+        with self.lock:
+            tmp, path = self._tmp, self._path
+            try:
+                if self._parquet is not None:
+                    self._flush_parquet()
+                    self._parquet.close()
+                elif self._file:
+                    self._file.close()
+                if not self.shard:
+                    os.replace(tmp, path)  # type: ignore
+            except (OSError, ValueError) as e:
+                _log.error(f"Erreur lors de l'export dans {path} : {e}")
+                path = None
+            finally:
+                self._tmp = self._file = self._csv = self._parquet = None
+                self._rows = []
+        if path and not self.shard:
+            _log.info(f"{self._count} interfaces exportées dans {path}")
+        return path
+
+
+exporter = Exporter()
+
+
+if __name__ == "__main__":
+    pass
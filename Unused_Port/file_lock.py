@@ -0,0 +1,51 @@
+import sys
+from contextlib import contextmanager
+from pathlib import Path
+from typing import IO, Iterator
+
+if sys.platform == "win32":
+    import msvcrt
+
+    def _lock(file: IO) -> None:
+        while True:
+            try:
+                msvcrt.locking(file.fileno(), msvcrt.LK_LOCK, 1)
+                return
+            except OSError:  # LK_LOCK abandonne après 10s, on réessaye
+                continue
+
+    def _unlock(file: IO) -> None:
+        msvcrt.locking(file.fileno(), msvcrt.LK_UNLCK, 1)
+
+else:
+    import fcntl
+
+    def _lock(file: IO) -> None:
+        fcntl.flock(file.fileno(), fcntl.LOCK_EX)
+
+    def _unlock(file: IO) -> None:
+        fcntl.flock(file.fileno(), fcntl.LOCK_UN)
+
+
+@contextmanager
+def file_lock(path: Path) -> Iterator[None]:
+    """
+    Ce context manager prend un verrou exclusif entre process sur le fichier
+    'path' (via le fichier 'path.lock' a coté), utilisé pour que deux process
+    (--workers) ne lisent / réécrivent pas le meme fichier json en meme temps.
+
+    :param path: le fichier a protéger
+    :return: None
+    """
+    with open(path.with_name(f"{path.name}.lock"), "a+b") as file:
+        file.seek(0)
+        _lock(file)
+        try:
+            yield
+        finally:
+            file.seek(0)
+            _unlock(file)
+
+
+if __name__ == "__main__":
+    pass
@@ -0,0 +1,103 @@
+import logging
+import socket
+from threading import Lock
+from time import monotonic
+from typing import Iterable, Optional
+
+from Unused_Port.static import HANDOFF_MAX_AGE, HANDOFF_MAX_SOCKETS, REUSE_DISCOVERY
+
+_log = logging.getLogger(__name__)
+
+
+class SocketHandoff:
+    """
+    Registre des sockets ouverts lors de la découverte (Sweep /
+    SocketWorker), gardés ouverts pour etre donnés a paramiko (sock=) lors de
+    la connexion SSH : un seul handshake TCP par host au lieu de deux.
+
+    Un socket plus vieux que 'max_age' secondes n'est pas utilisé (le switch
+    a pu fermer la connexion), BaseConnexion ouvre alors une nouvelle
+    connexion.
+    """
+
+    def __init__(
+        self,
+        max_sockets: int = HANDOFF_MAX_SOCKETS,
+        *,
+        max_age: float = HANDOFF_MAX_AGE,
+        enabled: bool = REUSE_DISCOVERY,
+    ):
+        """
+        Instancie la classe 'SocketHandoff'.
+
+        :param max_sockets: le nombre max de sockets gardés
+        :param max_age: l'age max (s) d'un socket avant d'etre utilisé
+        :param enabled: False pour fermer les sockets de la découverte
+        """
+        self.max_sockets: int = max_sockets
+        self.max_age: float = max_age
+        self.enabled: bool = enabled
+        self._sockets: dict[str, tuple[socket.socket, float]] = {}
+        self.lock: Lock = Lock()
+
+    def keep(self, host: str, sock: socket.socket) -> bool:
+        """
+        Cette fonction garde le socket connecté de l'host.
+
+        :param host: ipv4
+        :param sock: le socket connecté au port 22 de l'host
+        :return: True si le socket est gardé, sinon False (l'appelant doit
+            le fermer)
+        """
+        if not self.enabled:
+            return False
+        with self.lock:
+            if len(self._sockets) >= self.max_sockets or host in self._sockets:
+                return False
+            sock.setblocking(True)
+            self._sockets[host] = (sock, monotonic())
+        return True
+
+    def pop(self, host: str) -> Optional[socket.socket]:
+        """
+        Cette fonction retire le socket de l'host du registre.
+
+        :param host: ipv4
+        :return: le socket, None si aucun socket ou si il est trop vieux
+        """
+        with self.lock:
+            sock, created = self._sockets.pop(host, (None, 0.0))
+        if sock is None:
+            return None
+        if monotonic() - created > self.max_age:
+            _log.debug(f"Socket de découverte de {host} trop vieux, fermeture")
+            sock.close()
+            return None
+        return sock
+
+    def close_all(self, hosts: Optional[Iterable[str]] = None) -> None:
+        """
+        Cette fonction ferme les sockets non utilisés (fin du run).
+
+        :param hosts: les hosts dont les sockets sont fermés (fin du run d'un
+            site, les autres sites tournent en meme temps), tous si None
+        :return: None
+        """
+        with self.lock:
+            if hosts is None:
+                sockets, self._sockets = self._sockets, {}
+            else:
+                sockets = {
+                    host: self._sockets.pop(host)
+                    for host in hosts
+                    if host in self._sockets
+                }
+        for sock, _ in sockets.values():
+            sock.close()
+
+
+socket_handoff = SocketHandoff()
+
+
+if __name__ == "__main__":
+    pass
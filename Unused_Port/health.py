@@ -0,0 +1,209 @@
+import json
+import logging
+import os
+from datetime import datetime
+from pathlib import Path
+from threading import Lock
+from typing import Generator, Iterable, Optional
+
+from Unused_Port.concurrency import Outcome
+from Unused_Port.file_lock import file_lock
+from Unused_Port.inventory import inventory
+from Unused_Port.static import DIRS, HEALTH_COOLDOWN, HEALTH_THRESHOLD
+
+_log = logging.getLogger(__name__)
+
+
+class HealthStore:
+    """
+    Store de l'état des hosts, enregistré sur le disque (json) entre les
+    runs (--schedule / service).
+
+    Pour chaque ip, il garde la classe du dernier échec (voir
+    concurrency.Outcome) et le nombre d'échecs consécutifs. Après
+    HEALTH_THRESHOLD échecs, le circuit de l'host est ouvert : l'host est
+    ignoré pendant HEALTH_COOLDOWN jours, puis réessayé une fois en fin de
+    run (half-open), un succès le remet a zéro.
+
+    Les hosts non joignables ne sont gardés que si ils ont deja été vus
+    joignables (voir inventory.py), le store ne grossit donc pas avec les
+    ips vides des subnets balayés. Le store est enregistré une fois a la fin
+    du run (voir begin() / end()).
+    """
+
+    def __init__(self, path: Optional[Path] = None):
+        """
+        Instancie la classe 'HealthStore'.
+
+        :param path: le fichier json, DIRS.get("state")/health.json par défaut
+        """
+        self._path: Optional[Path] = path
+        self._hosts: dict[str, dict] = {}
+        self._changed: dict[str, Optional[dict]] = {}
+        self._loaded: bool = False
+        self._runs: int = 0
+        self.lock: Lock = Lock()
+
+    @property
+    def path(self) -> Path:
+        """Retourne le fichier json du store."""
+        return self._path or Path(DIRS.get("state"), "health.json")
+
+    def load(self) -> None:
+        """
+        Cette fonction charge le store depuis le disque, si il n'est pas
+        deja chargé.
+
+        :return: None
+        """
+        with self.lock:
+            if self._loaded:
+                return
+            self._loaded = True
+            self._hosts = self._read()
+
+    def _read(self) -> dict[str, dict]:
+        """
+        Cette fonction lit le fichier json du store.
+
+        :return: le dictionnaire {ip: état}, vide si le fichier n'existe pas
+        """
+        try:
+            return json.loads(self.path.read_text())
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            _log.warning(f"Store de santé des hosts illisible ({e}), ignoré")
+            return {}
+
+    def record(self, ip: str, failure: Optional[str]) -> None:
+        """
+        Cette fonction enregistre le résultat du check d'un host.
+
+        :param ip: ipv4
+        :param failure: la classe de l'échec (voir concurrency.Outcome),
+            None si le check a réussi
+        :return: None
+        """
+        self.load()
+        if (
+            failure == Outcome.DOWN
+            and ip not in self._hosts
+            and not inventory.known(ip)
+        ):
+            return  # jamais vu joignable, rien a garder
+        with self.lock:
+            if failure is None:
+                if self._hosts.pop(ip, None):
+                    self._changed[ip] = None
+                return
+            entry = self._hosts.get(ip, {})
+            count = entry.get("count", 0) + 1 if entry.get("failure") == failure else 1
+            self._hosts[ip] = self._changed[ip] = {
+                "failure": failure,
+                "count": count,
+                "last": datetime.now().isoformat(timespec="seconds"),
+            }
+
+    def state(self, ip: str) -> str:
+        """
+        Cette fonction retourne l'état du circuit de l'host.
+
+        :param ip: ipv4
+        :return: 'closed' (host sain), 'open' (host ignoré) ou 'half_open'
+            (cooldown fini, host réessayé en dernier)
+        """
+        entry = self._hosts.get(ip)
+        if not entry or entry["count"] < HEALTH_THRESHOLD:
+            return "closed"
+        days = (datetime.now() - datetime.fromisoformat(entry["last"])).days
+        if days < HEALTH_COOLDOWN.get(entry["failure"], 0):
+            return "open"
+        return "half_open"
+
+    def filter(self, hosts: Iterable) -> Generator[str, None, None]:
+        """
+        Cette fonction filtre les hosts : les hosts sains d'abord, puis les
+        hosts en half-open, les hosts dont le circuit est ouvert sont ignorés.
+
+        :param hosts: les ips
+        :return: Generateur d'ips
+        """
+        self.load()
+        half_open: list[str] = []
+        skipped = 0
+        for host in hosts:
+            host = str(host).strip()
+            state = self.state(host)
+            if state == "closed":
+                yield host
+            elif state == "half_open":
+                half_open.append(host)
+            else:
+                skipped += 1
+        if skipped:
+            _log.info(f"{skipped} hosts ignorés (échecs répétés, voir {self.path})")
+        yield from half_open
+
+    def begin(self) -> None:
+        """
+        Cette fonction marque le début d'un run (start() est appelé pour
+        chaque site dans le meme run).
+
+        :return: None
+        """
+        with self.lock:
+            self._runs += 1
+
+    def end(self) -> None:
+        """
+        Cette fonction marque la fin d'un run, le store est enregistré a la
+        fin du dernier run en cours.
+
+        :return: None
+        """
+        with self.lock:
+            self._runs -= 1
+            if self._runs:
+                return
+        self.save()
+
+    def save(self) -> None:
+        """
+        Cette fonction enregistre le store sur le disque (fichier temporaire
+        puis os.replace, le fichier n'est jamais a moitié écrit).
+
+        Seuls les hosts modifiés par ce process sont écrits par dessus le
+        fichier actuel, relu sous un verrou entre process (voir
+        file_lock.py) : les autres process (--workers) ne sont pas écrasés.
+        En cas d'erreur, les modifications sont gardées pour le prochain
+        enregistrement.
+
+        :return: None
+        """
+        with self.lock:
+            if not self._changed:
+                return
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                with file_lock(self.path):
+                    hosts = self._read()
+                    for ip, entry in self._changed.items():
+                        if entry is None:
+                            hosts.pop(ip, None)
+                        else:
+                            hosts[ip] = entry
+                    tmp = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+                    tmp.write_text(json.dumps(hosts, indent=1, sort_keys=True))
+                    os.replace(tmp, self.path)
+            except OSError as e:
+                _log.warning(f"Erreur lors de l'enregistrement de {self.path} : {e}")
+                return
+            self._hosts, self._changed = hosts, {}
+
+
+health_store = HealthStore()
+
+
+if __name__ == "__main__":
+    pass
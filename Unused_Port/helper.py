@@ -2,20 +2,21 @@ import ipaddress
 import logging
 import os
 import sys
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import suppress
 from datetime import datetime, timedelta
-from functools import lru_cache
+from functools import lru_cache, partial
+from io import BytesIO
 from pathlib import Path
+from random import randint
+from threading import get_ident
 from time import sleep
-from typing import Any, Callable, Optional, Union
+from typing import Optional, Union
 
 import schedule
 import servicemanager
 
-from Unused_Port.errors import (
-    UPC_RETRY_ERROR,
-    UPC_SSH_CONNEXION_ERROR,
-    UPC_VALIDATION_ERROR,
-)
+from Unused_Port.retry import retry
 from Unused_Port.shared_folder import Shared_Folder
 from Unused_Port.static import DELETE_AFTER, DIRS, DOSSIER_PARTAGE_SITE
 
@@ -29,46 +30,6 @@ except ImportError:
     from openpyxl import Workbook
 
 
-def retry(max_retries, delay=0.5) -> Callable:
-    """
-    Décorateur permettant de retry une fonction X fois, tant que celle çi
-    raise une erreur, sinon return son résultat.
-
-    :param max_retries: Le nombre max d'essais avant de renvoyer
-        l'erreur
-    :param delay: le délai en seconde entre chaque essai
-    :return: Le resultat de la fonction / sinon l'erreur
-    """
-
-    def decorator(func: Callable):
-        def wrapper(*args, **kwargs) -> Any:
-            result = None
-            for _ in range(max_retries):
-                try:
-                    result = func(*args, **kwargs)
-                except (
-                    UPC_RETRY_ERROR,
-                    UPC_SSH_CONNEXION_ERROR,
-                    UPC_VALIDATION_ERROR,
-                ) as e:
-                    _log.warning(f"{e}, RETRYING {func.__name__}({args}, {kwargs})")
-                    sleep(delay)
-                except Exception as e:
-                    _log.warning(
-                        f"{e.__class__.__name__}, RETRYING {func.__name__}"
-                        f"({args}, {kwargs})"
-                    )
-                    sleep(delay)
-                else:
-                    return result
-            _log.warning(f"Max Retry {func.__name__}({args}, {kwargs})")
-            return result
-
-        return wrapper
-
-    return decorator
-
-
 def recurse_folder_creator(
     path: Union[Path, str],
     checker=1,
@@ -241,71 +202,118 @@ def _exit(e):
     sys.exit(0)
 
 
+def _serialize_wb(_workbook: Workbook, sort: bool = False) -> bytes:
+    """
+    Cette fonction enregistre le workbook en mémoire, une seule fois (un
+    workbook 'write_only' ne peut etre enregistré qu'une fois), les octets
+    sont ensuite écrits dans chaque fichier.
+
+    :param _workbook: La classe Workbook permettant de save un excel
+    :param sort: True pour trier les pages par ip
+    :return: le contenu du fichier excel
+    """
+    if sort:
+        _workbook._sheets.sort(key=lambda ws: ipaddress.IPv4Address(ws.title))  # type: ignore
+    buffer = BytesIO()
+    _workbook.save(buffer)
+    return buffer.getvalue()
+
+
 def save_wb(
-    _workbook: Workbook,
+    _workbook: Union[Workbook, bytes],
     *,
     _now: Optional[str] = None,
     site: Optional[str] = None,
     hostname: str = "error",
-    new_name: bool = False,
 ) -> bool:
     """
     Cette fonction est utilisée pour save un fichier excel.
 
-    :param _workbook: La classe Workbook permettant de save un excel
+    L'excel est enregistré une seule fois en mémoire, puis écrit en parallèle
+    dans chaque dossier du site (voir _write_xl()).
+
+    :param _workbook: La classe Workbook permettant de save un excel, ou
+        son contenu deja enregistré (voir _serialize_wb())
     :param _now: la date d'aujourd'hui formattée
     :param site: le site 'France' ...
     :param hostname: L'hostname du switch (et non son ip)
-    :param new_name: le nouveau nom si cette fonction rencontre une erreur
-    (le fichier ne peut pas etre ecrasé car qq l'a ouvert)
-    :return: False si aucune erreur sinon récursion sur elle meme pour gerer l'erreur
+    :return: True si l'excel est enregistré dans tous les dossiers
     """
     if not _now:
         _now = now()
     try:
-        from random import randint
-
+        if not isinstance(_workbook, bytes):
+            _workbook = _serialize_wb(_workbook, sort=not site)
         if not site:
-            location = (
-                os.path.join(DIRS.get("excel_output"), f"{hostname}_{_now}")
-                if not new_name
-                else os.path.join(
-                    DIRS.get("excel_output"),
-                    f"{hostname}_{_now}_{randint(100, 999)}",
-                )
-            )
-            _workbook._sheets.sort(key=lambda ws: ipaddress.IPv4Address(ws.title))  # type: ignore
-            _workbook.save(f"{location}.xlsx")
-            _log.info(f"Excel bien enregisté sous le nom de : {location}.xlsx")
+            paths = [Path(DIRS.get("excel_output"), f"{hostname}_{_now}.xlsx")]
         else:
             l_path = site_folder_manager(site)
             if not l_path:
                 return False
-
-            location = (
-                f"/{hostname}" if not new_name else f"/{hostname}_{randint(100, 999)}"
-            )
-
-            for path in l_path:
-                path = str(path) + location + ".xlsx"
-                _workbook.save(f"{path}")
-                _log.info(f"Excel bien enregisté sous le nom de : {path}")
-        sleep(5)
-        return True
-    except OSError as e:  # Ouvert par qq d'autre
-        if e.winerror == 2:
-            err = generate_base_folder()
-            if err:
-                _exit(err)
-        _log.warning(
-            f"{hostname}.xlsx est ouvert par quelqu'un d'autre, "
-            f"enregistrement sous avec 3 chiffres random a la fin, {e}"
-        )
-        return save_wb(_workbook, site=site, hostname=hostname, new_name=True)
+            if isinstance(l_path, Path):  # local_save()
+                l_path = [l_path]
+            paths = [Path(path, f"{hostname}.xlsx") for path in l_path]
     except Exception as e:
         _log.error(e)
         return False
 
+    if len(paths) == 1:
+        return _write_xl(_workbook, paths[0])
+    with ThreadPoolExecutor(max_workers=len(paths)) as pool:
+        return all(pool.map(partial(_write_xl, _workbook), paths))
+
+
+def _write_xl(data: bytes, path: Path, create: bool = True) -> bool:
+    """
+    Cette fonction écrit l'excel dans un fichier temporaire du meme dossier,
+    puis le renomme (os.replace) : le fichier n'est jamais lu a moitié
+    écrit. Si le fichier est ouvert par quelqu'un d'autre, l'excel est
+    enregistré avec 3 chiffres random a la fin. En cas d'erreur, le fichier
+    temporaire est toujours supprimé.
+
+    :param data: le contenu du fichier excel
+    :param path: le fichier excel
+    :param create: True pour créer le dossier si il n'existe pas
+    :return: True si l'excel est enregistré
+    """
+    tmp = path.with_name(f"~{path.stem}.{os.getpid()}.{get_ident()}.tmp")
+    saved = False
+    try:
+        tmp.write_bytes(data)
+        try:
+            os.replace(tmp, path)
+        except PermissionError as e:  # Ouvert par qq d'autre
+            _log.warning(
+                f"{path.name} est ouvert par quelqu'un d'autre, "
+                f"enregistrement sous avec 3 chiffres random a la fin, {e}"
+            )
+            path = path.with_name(f"{path.stem}_{randint(100, 999)}{path.suffix}")
+            os.replace(tmp, path)
+        saved = True
+    except FileNotFoundError as e:  # dossier supprimé entre temps
+        if not create:
+            _log.error(f"Erreur lors de l'enregistrement de {path} : {e}")
+            return False
+    except OSError as e:
+        _log.error(f"Erreur lors de l'enregistrement de {path} : {e}")
+        return False
+    finally:
+        if not saved:
+            with suppress(OSError):
+                tmp.unlink(missing_ok=True)
+    if not saved:
+        _log.warning(f"Le dossier {path.parent} n'existe pas, création")
+        if err := generate_base_folder():
+            _exit(err)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+        except OSError as e:
+            _log.error(f"Erreur lors de la création de {path.parent} : {e}")
+            return False
+        return _write_xl(data, path, create=False)
+    _log.info(f"Excel bien enregisté sous le nom de : {path}")
+    return True
+
 
 def now() -> str:
     """Cette fonction crée le formattage de la date d'aujourd'hui."""
@@ -0,0 +1,173 @@
+import json
+import logging
+import os
+from datetime import datetime, timedelta
+from pathlib import Path
+from threading import Lock
+from typing import Generator, Iterable, Iterator, Optional
+
+from Unused_Port.file_lock import file_lock
+from Unused_Port.ip_set import IPSet
+from Unused_Port.static import DIRS, INVENTORY_FULL_SWEEP, INVENTORY_TTL
+
+_log = logging.getLogger(__name__)
+
+
+class Inventory:
+    """
+    Inventaire des hosts joignables, enregistré sur le disque (json) entre
+    les runs (--schedule / service).
+
+    Les hosts vus joignables depuis moins de INVENTORY_TTL jours sont testés
+    (découverte + SSH) en premier. Le reste des ips n'est balayé que tous les
+    INVENTORY_FULL_SWEEP jours par site, après les hosts connus.
+    """
+
+    def __init__(self, path: Optional[Path] = None):
+        """
+        Instancie la classe 'Inventory'.
+
+        :param path: le fichier json, DIRS.get("state")/inventory.json par défaut
+        """
+        self._path: Optional[Path] = path
+        self._data: dict[str, dict[str, str]] = {"hosts": {}, "sweeps": {}}
+        self._changed: dict[str, dict[str, str]] = {"hosts": {}, "sweeps": {}}
+        self._loaded: bool = False
+        self.lock: Lock = Lock()
+
+    @property
+    def path(self) -> Path:
+        """Retourne le fichier json de l'inventaire."""
+        return self._path or Path(DIRS.get("state"), "inventory.json")
+
+    def load(self) -> None:
+        """
+        Cette fonction charge l'inventaire depuis le disque, si il n'est pas
+        deja chargé.
+
+        :return: None
+        """
+        with self.lock:
+            if self._loaded:
+                return
+            self._loaded = True
+            self._data = self._read()
+
+    def _read(self) -> dict[str, dict[str, str]]:
+        """
+        Cette fonction lit le fichier json de l'inventaire, les hosts plus
+        vieux que INVENTORY_TTL jours sont retirés.
+
+        :return: {"hosts": {ip: vu le}, "sweeps": {site: balayé le}}
+        """
+        try:
+            data = json.loads(self.path.read_text())
+        except FileNotFoundError:
+            data = {}
+        except (OSError, ValueError) as e:
+            _log.warning(f"Inventaire illisible ({e}), ignoré")
+            data = {}
+        limit = (datetime.now() - timedelta(days=INVENTORY_TTL)).isoformat()
+        return {
+            "hosts": {
+                ip: seen for ip, seen in data.get("hosts", {}).items() if seen >= limit
+            },
+            "sweeps": data.get("sweeps", {}),
+        }
+
+    def split(
+        self, hosts: Iterable, site: Optional[str] = None
+    ) -> tuple[list[str], Optional[Generator[str, None, None]]]:
+        """
+        Cette fonction sépare les hosts connus joignables du reste des ips.
+
+        :param hosts: les ips
+        :param site: le site ('France' / 'US' ...)
+        :return: (les hosts connus, le reste des ips si le balayage complet
+            du site est du, sinon None)
+        """
+        self.load()
+        if isinstance(hosts, IPSet):  # les ips ne sont pas parcourues
+            known = [ip for ip in self._data["hosts"] if ip in hosts]
+        else:
+            if isinstance(hosts, Iterator):  # parcouru deux fois
+                hosts = list(hosts)
+            known = [str(host) for host in hosts if str(host) in self._data["hosts"]]
+        last = self._data["sweeps"].get(str(site))
+        limit = (datetime.now() - timedelta(days=INVENTORY_FULL_SWEEP)).isoformat()
+        if last and last >= limit:
+            _log.info(
+                f"{len(known)} hosts connus pour le site {site}, prochain "
+                f"balayage complet {INVENTORY_FULL_SWEEP} jours après le {last[:10]}"
+            )
+            return known, None
+        _log.info(f"{len(known)} hosts connus pour le site {site}, balayage complet")
+        if isinstance(hosts, IPSet):
+            return known, (ip for ip in hosts - IPSet(known))
+        known_set = set(known)
+        return known, (str(host) for host in hosts if str(host) not in known_set)
+
+    def known(self, ip: str) -> bool:
+        """
+        Cette fonction check si l'host a été vu joignable depuis moins de
+        INVENTORY_TTL jours.
+
+        :param ip: ipv4
+        :return: True si l'host est dans l'inventaire, sinon False
+        """
+        self.load()
+        return ip in self._data["hosts"]
+
+    def update(
+        self, valid: Iterable[str], site: Optional[str] = None, *, full: bool = False
+    ) -> None:
+        """
+        Cette fonction enregistre les hosts joignables.
+
+        :param valid: les ips valides du run
+        :param site: le site ('France' / 'US' ...)
+        :param full: True si toutes les ips du site ont été balayées
+        :return: None
+        """
+        self.load()
+        seen = datetime.now().isoformat(timespec="seconds")
+        with self.lock:
+            for ip in valid:
+                self._data["hosts"][ip] = self._changed["hosts"][ip] = seen
+            if full:
+                self._data["sweeps"][str(site)] = seen
+                self._changed["sweeps"][str(site)] = seen
+
+    def save(self) -> None:
+        """
+        Cette fonction enregistre l'inventaire sur le disque (fichier
+        temporaire puis os.replace), seuls les hosts modifiés par ce process
+        sont écrits par dessus le fichier actuel, relu sous un verrou entre
+        process (voir file_lock.py). En cas d'erreur, les modifications sont
+        gardées pour le prochain enregistrement.
+
+        :return: None
+        """
+        with self.lock:
+            if not any(self._changed.values()):
+                return
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                with file_lock(self.path):
+                    data = self._read()
+                    for section, changed in self._changed.items():
+                        data[section].update(changed)
+                    tmp = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+                    tmp.write_text(json.dumps(data, indent=1, sort_keys=True))
+                    os.replace(tmp, self.path)
+            except OSError as e:
+                _log.warning(f"Erreur lors de l'enregistrement de {self.path} : {e}")
+                return
+            self._data, self._changed = data, {"hosts": {}, "sweeps": {}}
+
+
+inventory = Inventory()
+
+
+if __name__ == "__main__":
+    pass
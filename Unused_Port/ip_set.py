@@ -0,0 +1,178 @@
+from bisect import bisect_right
+from ipaddress import IPv4Address, IPv4Network, ip_network
+from typing import Iterable, Iterator, Union
+
+_Item = Union[str, int, IPv4Address, IPv4Network, tuple[int, int]]
+
+
+class IPSet:
+    """
+    Ensemble d'ipv4 stocké sous forme d'intervalles d'entiers [début, fin]
+    triés et fusionnés : un /12 coute quelques octets au lieu d'un million
+    d'objets IPv4Address.
+
+    Les ips sont générées a la demande lors de l'itération (str), 'in' et
+    len() ne parcourent pas les ips.
+    """
+
+    __slots__ = ("_intervals", "_starts")
+
+    def __init__(self, items: Iterable[_Item] = (), *, hosts: bool = False):
+        """
+        Instancie la classe 'IPSet'.
+
+        :param items: des ips / ranges ('192.168.1.1-192.168.1.10') /
+            réseaux ('192.168.1.0/24') / intervalles d'entiers (début, fin)
+        :param hosts: si True, les adresses réseau et broadcast des réseaux
+            sont retirées (comme ip_network().hosts())
+        """
+        intervals = [self._parse(item, hosts) for item in items]
+        self._intervals: tuple[tuple[int, int], ...] = self._merge(intervals)
+        self._starts: list[int] = [start for start, _ in self._intervals]
+
+    @staticmethod
+    def _parse(item: _Item, hosts: bool) -> tuple[int, int]:
+        """
+        Cette fonction convertit une ip / range / réseau en intervalle.
+
+        :param item: voir __init__()
+        :param hosts: voir __init__()
+        :return: (début, fin) en entiers, fin incluse
+        """
+        if isinstance(item, tuple):
+            return item
+        if isinstance(item, (int, IPv4Address)):
+            return int(item), int(item)
+        if isinstance(item, str) and "-" in item:
+            start, end = item.split("-")
+            return int(IPv4Address(start.strip())), int(IPv4Address(end.strip()))
+        network = ip_network(item, strict=False)
+        start, end = int(network.network_address), int(network.broadcast_address)
+        if hosts and network.prefixlen < 31:
+            return start + 1, end - 1
+        return start, end
+
+    @staticmethod
+    def _merge(intervals: list[tuple[int, int]]) -> tuple[tuple[int, int], ...]:
+        """
+        Cette fonction trie et fusionne les intervalles qui se chevauchent ou
+        se suivent.
+
+        :param intervals: les intervalles
+        :return: les intervalles fusionnés
+        """
+        merged: list[tuple[int, int]] = []
+        for start, end in sorted(
+            interval for interval in intervals if interval[0] <= interval[1]
+        ):
+            if merged and start <= merged[-1][1] + 1:
+                merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+            else:
+                merged.append((start, end))
+        return tuple(merged)
+
+    @property
+    def intervals(self) -> tuple[tuple[int, int], ...]:
+        """Retourne les intervalles (début, fin) en entiers."""
+        return self._intervals
+
+    def __or__(self, other: "IPSet") -> "IPSet":
+        """Retourne l'union des deux ensembles (fusion)."""
+        return IPSet(self._intervals + other.intervals)
+
+    def __sub__(self, other: "IPSet") -> "IPSet":
+        """Retourne les ips de self qui ne sont pas dans other."""
+        result: list[tuple[int, int]] = []
+        excluded = other.intervals
+        i = 0
+        for start, end in self._intervals:
+            while i < len(excluded) and excluded[i][1] < start:
+                i += 1
+            j = i
+            while j < len(excluded) and excluded[j][0] <= end:
+                if excluded[j][0] > start:
+                    result.append((start, excluded[j][0] - 1))
+                start = max(start, excluded[j][1] + 1)
+                j += 1
+            if start <= end:
+                result.append((start, end))
+        return IPSet(result)
+
+    def __contains__(self, ip: object) -> bool:
+        """Check si l'ip (str / IPv4Address / int) est dans l'ensemble."""
+        try:
+            value = int(IPv4Address(ip))  # type: ignore
+        except ValueError:
+            return False
+        i = bisect_right(self._starts, value) - 1
+        return i >= 0 and value <= self._intervals[i][1]
+
+    def __iter__(self) -> Iterator[str]:
+        """Génère les ips (str) a la demande, dans l'ordre."""
+        for start, end in self._intervals:
+            for value in range(start, end + 1):
+                yield str(IPv4Address(value))
+
+    def __len__(self) -> int:
+        """Retourne le nombre d'ips de l'ensemble."""
+        return sum(end - start + 1 for start, end in self._intervals)
+
+    def __bool__(self) -> bool:
+        """Retourne True si l'ensemble n'est pas vide."""
+        return bool(self._intervals)
+
+    def __eq__(self, other: object) -> bool:
+        """Deux ensembles sont égaux si ils ont les memes intervalles."""
+        return isinstance(other, IPSet) and self._intervals == other.intervals
+
+    def __hash__(self) -> int:
+        """Hash des intervalles."""
+        return hash(self._intervals)
+
+    def __getstate__(self) -> tuple[tuple[int, int], ...]:
+        """Seuls les intervalles sont picklés (envoi aux process workers)."""
+        return self._intervals
+
+    def __setstate__(self, state: tuple[tuple[int, int], ...]) -> None:
+        """Recrée l'ensemble depuis les intervalles picklés."""
+        self._intervals = state
+        self._starts = [start for start, _ in state]
+
+    def split(self, parts: int) -> list["IPSet"]:
+        """
+        Cette fonction découpe l'ensemble en 'parts' ensembles contigus de
+        meme taille (a une ip près), utilisé pour répartir les ips sur les
+        process (voir process_runner.py).
+
+        :param parts: le nombre de morceaux
+        :return: la liste des morceaux non vides
+        """
+        size, extra = divmod(len(self), max(1, parts))
+        chunks: list[IPSet] = []
+        intervals = iter(self._intervals)
+        current: list[tuple[int, int]] = []
+        start, end = next(intervals, (1, 0))
+        for n in range(max(1, parts)):
+            wanted = size + (1 if n < extra else 0)
+            while wanted and start <= end:
+                take = min(wanted, end - start + 1)
+                current.append((start, start + take - 1))
+                start += take
+                wanted -= take
+                if start > end:
+                    start, end = next(intervals, (1, 0))
+            if current:
+                chunks.append(IPSet(current))
+            current = []
+        return chunks
+
+    def __repr__(self) -> str:
+        """Retourne les intervalles sous forme de ranges d'ips."""
+        ranges = ", ".join(
+            f"{IPv4Address(start)}-{IPv4Address(end)}" for start, end in self._intervals
+        )
+        return f"IPSet([{ranges}], {len(self)} ips)"
+
+
+if __name__ == "__main__":
+    pass
@@ -0,0 +1,79 @@
+import logging
+from queue import Queue
+from threading import Lock, Thread
+from typing import Any, Optional
+
+from Unused_Port.helper import save_wb
+from Unused_Port.static import OUTPUT_QUEUE_SIZE
+
+_log = logging.getLogger(__name__)
+
+
+class OutputQueue:
+    """
+    Write-behind des excels : les workers SSH ajoutent le workbook a une
+    queue bornée et retournent tout de suite sur les switchs, un thread
+    d'écriture enregistre les excels en arrière plan, un par un dans l'ordre
+    de la queue (voir helper.save_wb()), rien n'est regroupé : chaque excel
+    reste un fichier par switch.
+
+    La fin du run attend que la queue soit vide (flush()).
+    """
+
+    def __init__(self, max_size: int = OUTPUT_QUEUE_SIZE):
+        """
+        Instancie la classe 'OutputQueue'.
+
+        :param max_size: le nombre max d'excels en attente, les workers SSH
+            attendent quand la queue est pleine
+        """
+        self._queue: Queue = Queue(maxsize=max_size)
+        self._writer: Optional[Thread] = None
+        self.lock: Lock = Lock()
+
+    def put(self, workbook: Any, *, site: Optional[str] = None, hostname: str) -> None:
+        """
+        Cette fonction ajoute un excel a enregistrer, et démarre le thread
+        d'écriture si il ne tourne pas.
+
+        :param workbook: le Workbook
+        :param site: le site 'France' ...
+        :param hostname: L'hostname du switch (et non son ip)
+        :return: None
+        """
+        with self.lock:
+            if not (self._writer and self._writer.is_alive()):
+                self._writer = Thread(target=self._write, name="output", daemon=True)
+                self._writer.start()
+        self._queue.put((workbook, site, hostname))
+
+    def flush(self) -> None:
+        """
+        Cette fonction attend que tous les excels en attente soient
+        enregistrés (fin du run).
+
+        :return: None
+        """
+        self._queue.join()
+
+    def _write(self) -> None:
+        """
+        Boucle du thread d'écriture : enregistre les excels en attente.
+
+        :return: None
+        """
+        while True:
+            workbook, site, hostname = self._queue.get()
+            try:
+                save_wb(workbook, site=site, hostname=hostname)
+            except (Exception, SystemExit) as e:  # le thread ne doit pas s'arreter
+                _log.error(f"Erreur lors de l'enregistrement de {hostname} : {e}")
+            finally:
+                self._queue.task_done()
+
+
+output_queue = OutputQueue()
+
+
+if __name__ == "__main__":
+    pass
@@ -0,0 +1,265 @@
+import logging
+import re
+from abc import ABC, abstractmethod
+from time import perf_counter
+from typing import Callable, ClassVar, NamedTuple, Optional
+
+from Unused_Port.duration import parse_duration
+
+_log = logging.getLogger(__name__)
+
+
+# Ne pas utiliser les | include car cela ne marche pas (dans les commandes)
+
+
+class UPC_Commands:
+    """Liste des commandes utilisées par UPC, 'Unused Port Checker'."""
+
+    # SH_INT = "show int status | i notconnect"
+    # SH_LAST_INT = "show int {} | i Last input"
+    SH_INT = "show int status"
+    SH_LAST_INT = "show int {}"
+    SH_ALL_INT = "show interfaces"
+    SH_VERSION = "show version"
+    TERM_LEN = "terminal length 0"
+    TERM_WIDTH = "terminal width 512"
+
+
+class UPC_Regex:
+    """Liste des regex utilisés par UPC, 'Unused Port Checker'."""
+
+    # La description peut contenir 'connected' ... : le statut est le dernier
+    # mot suivi des colonnes Vlan, Duplex et Speed
+    INT_REGEX = (
+        r"^([a-zA-Z]{1,4}[0-9]/[0-9]{1,2}(?:/[0-9]{1,2})?)\s+(?:.*\s)?"
+        r"(connected|notconnect|disabled)\s+(\S+)\s+\S+\s+(\S+)"
+    )
+    LAST_REGEX = r"Last input (\S+),"
+    HOSTNAME_ON_UPTIME_REGEX = r"(\S+)?\s?uptime is (.*)$"
+    MODEL_REGEX = r"^(?:Model [Nn]umber\s*:\s*(\S+)|[Cc]isco (\S+) \(.*\) processor)"
+    INT_HEADER_REGEX = (
+        r"^([a-zA-Z-]+[0-9]+(?:/[0-9]+)*(?:\.[0-9]+)?) is "
+        r"(?:up|down|administratively down)"
+    )
+    INT_NAME_REGEX = r"^([a-zA-Z-]+)([0-9].*)$"
+    GENERIC_PROMPT_REGEX = r"(?:^|[\r\n])([^\s#>()]+)(?:\([^)]*\))?[>#]\s*$"
+    PROMPT_REGEX = r"(?:^|[\r\n]){}(?:\([^)]*\))?[>#]\s*$"
+    ECHO_REGEX = r"^{}(?:\([^)]*\))?[>#]\s*\S"
+    MORE_REGEX = r" ?--More-- ?|[\x08]+ *[\x08]*"
+
+
+# Abréviations utilisées par 'sh int status' -> nom complet de 'sh interfaces'
+INT_ABBREVIATIONS: dict[str, str] = {
+    "fa": "fastethernet",
+    "gi": "gigabitethernet",
+    "te": "tengigabitethernet",
+    "tw": "twogigabitethernet",
+    "twe": "twentyfivegige",
+    "fi": "fivegigabitethernet",
+    "fo": "fortygigabitethernet",
+    "hu": "hundredgige",
+    "ap": "appgigabitethernet",
+    "po": "port-channel",
+    "et": "ethernet",
+    "eth": "ethernet",
+}
+
+_name_compile = re.compile(UPC_Regex.INT_NAME_REGEX)
+
+
+def int_key(_int: str) -> str:
+    """
+    Cette fonction normalise le nom d'une interface, pour que 'Gi1/0/2'
+    et 'GigabitEthernet1/0/2' aient la meme clé.
+
+    :param _int: l'interface (ex : gi1/0/2)
+    :return: l'interface normalisée (ex : gigabitethernet1/0/2)
+    """
+    match = _name_compile.match(_int)
+    if not match:
+        return _int.lower()
+    prefix, numbers = match.groups()
+    prefix = prefix.lower()
+    return INT_ABBREVIATIONS.get(prefix, prefix) + numbers
+
+
+class IntStatusRow(NamedTuple):
+    """Ligne de 'sh int status'."""
+
+    interface: str
+    status: str
+    vlan: str
+    speed: str
+
+
+class IntRow(NamedTuple):
+    """Last input d'une interface de 'sh interfaces' / 'sh int X'."""
+
+    interface: str
+    last_input: str
+    seconds: Optional[int]
+
+
+class VersionRow(NamedTuple):
+    """Informations de 'sh version'."""
+
+    hostname: str
+    uptime: str
+    model: str
+    seconds: Optional[int]
+
+
+class UPC_Parser(ABC):
+    """
+    Parser de base, une instance par commande executée.
+
+    Chaque ligne est donnée a feed() dès sa réception, le parser ne garde
+    que les lignes typées dans 'rows' : le parsing est fait en un seul
+    passage, et son cout (nombre de lignes, temps) est mesuré.
+    """
+
+    def __init__(self):
+        """Instancie le parser avec une liste de lignes typées vide."""
+        self.rows: list = []
+        self.lines: int = 0
+        self.elapsed: float = 0.0
+
+    def feed(self, line: str) -> None:
+        """
+        Cette fonction parse une ligne de la sortie de la commande.
+
+        :param line: une ligne complète recue du switch
+        :return: None
+        """
+        start = perf_counter()
+        self.lines += 1
+        self._parse(line)
+        self.elapsed += perf_counter() - start
+
+    @abstractmethod
+    def _parse(self, line: str) -> None:
+        """Méthode a implémenter par chaque parser."""
+
+    def stats(self) -> str:
+        """Retourne le cout du parsing, pour les logs."""
+        return (
+            f"{self.__class__.__name__}: {self.lines} lignes, {len(self.rows)} "
+            f"résultats en {self.elapsed * 1000:.2f}ms"
+        )
+
+
+PARSERS: dict[str, type[UPC_Parser]] = {}
+
+
+def register(*commands: str) -> Callable:
+    """
+    Décorateur permettant d'enregistrer un parser pour une ou plusieurs
+    commandes de UPC_Commands.
+
+    :param commands: les commandes parsées par la classe
+    :return: la classe décorée
+    """
+
+    def decorator(cls: type[UPC_Parser]) -> type[UPC_Parser]:
+        for command in commands:
+            PARSERS[command] = cls
+        return cls
+
+    return decorator
+
+
+def get_parser(command: str) -> UPC_Parser:
+    """
+    Cette fonction retourne une nouvelle instance du parser enregistré
+    pour la commande.
+
+    :param command: la commande (ex : UPC_Commands.SH_LAST_INT)
+    :return: une instance de parser
+    """
+    return PARSERS[command]()
+
+
+def parse(command: str, data: str) -> UPC_Parser:
+    """
+    Cette fonction parse une sortie deja complète (channels exec, pipeline).
+
+    :param command: la commande (ex : UPC_Commands.SH_LAST_INT)
+    :param data: la sortie de la commande
+    :return: le parser avec ses lignes typées
+    """
+    parser = get_parser(command)
+    for line in data.splitlines():
+        parser.feed(line)
+    return parser
+
+
+@register(UPC_Commands.SH_INT)
+class IntStatusParser(UPC_Parser):
+    """Parser de 'sh int status', une IntStatusRow par interface."""
+
+    _compile: ClassVar[re.Pattern] = re.compile(UPC_Regex.INT_REGEX)
+
+    def _parse(self, line: str) -> None:
+        if "connect" not in line and "disabled" not in line:
+            return
+        if match := self._compile.match(line):
+            self.rows.append(IntStatusRow(*match.groups()))
+
+
+@register(UPC_Commands.SH_ALL_INT, UPC_Commands.SH_LAST_INT)
+class LastInputParser(UPC_Parser):
+    """Parser de 'sh interfaces' / 'sh int X', une IntRow par interface."""
+
+    _header_compile: ClassVar[re.Pattern] = re.compile(UPC_Regex.INT_HEADER_REGEX)
+    _last_compile: ClassVar[re.Pattern] = re.compile(UPC_Regex.LAST_REGEX)
+
+    def __init__(self):
+        super().__init__()
+        self._current = ""
+
+    def _parse(self, line: str) -> None:
+        if line.find(" is ") > 0 and (match := self._header_compile.match(line)):
+            self._current = match.group(1)
+        elif self._current and line.find("Last input") >= 0:
+            if match := self._last_compile.search(line):
+                last_input = match.group(1)
+                self.rows.append(
+                    IntRow(self._current, last_input, parse_duration(last_input))
+                )
+                self._current = ""
+
+
+@register(UPC_Commands.SH_VERSION)
+class VersionParser(UPC_Parser):
+    """Parser de 'sh version', une seule VersionRow."""
+
+    _uptime_compile: ClassVar[re.Pattern] = re.compile(
+        UPC_Regex.HOSTNAME_ON_UPTIME_REGEX
+    )
+    _model_compile: ClassVar[re.Pattern] = re.compile(UPC_Regex.MODEL_REGEX)
+
+    def __init__(self):
+        super().__init__()
+        self._model = ""
+
+    def _parse(self, line: str) -> None:
+        if line.find("uptime is") >= 0 and not self.rows:
+            if match := self._uptime_compile.search(line):
+                hostname, uptime = match.groups()
+                uptime = uptime.strip()
+                self.rows.append(
+                    VersionRow(hostname or "", uptime, "", parse_duration(uptime))
+                )
+        elif not self._model and (line.find("odel") >= 0 or "processor" in line):
+            if match := self._model_compile.match(line.strip()):
+                self._model = match.group(1) or match.group(2)
+        if self.rows and self._model and not self.rows[0].model:
+            self.rows[0] = self.rows[0]._replace(model=self._model)
+
+    def result(self) -> Optional[VersionRow]:
+        """Retourne la VersionRow, None si 'uptime is' n'a pas été trouvé."""
+        return self.rows[0] if self.rows else None
+
+
+if __name__ == "__main__":
+    pass
@@ -1,18 +1,46 @@
 import logging
 import os
 import re
-from time import sleep
-from typing import ClassVar, Optional, Union
+import socket
+from time import monotonic
+from typing import Any, Callable, ClassVar, Optional, Union
 
 from Unused_Port.base import BaseConnexion
+from Unused_Port.duration import WEEK, format_weeks
 from Unused_Port.errors import (
+    UPC_NON_CISCO_ERROR,
+    UPC_RETRY_ERROR,
     UPC_SSH_CONNEXION_ERROR,
+    UPC_TIMEOUT_ERROR,
     UPC_UNKNOWN_ERROR,
     UPC_UP_TIME_ERROR,
     UPC_VALIDATION_ERROR,
 )
-from Unused_Port.helper import now, retry
-from Unused_Port.static import UPTIME_MIN_WEEK
+from Unused_Port.exec_channel import ExecChannelPool
+from Unused_Port.export import exporter
+from Unused_Port.helper import now
+from Unused_Port.parsers import (
+    IntRow,
+    UPC_Commands,
+    UPC_Parser,
+    UPC_Regex,
+    VersionRow,
+    get_parser,
+    int_key,
+    parse,
+)
+from Unused_Port.ratelimit import throttle
+from Unused_Port.recv_buffer import RecvBuffer
+from Unused_Port.retry import NON_RETRYABLE, retry
+from Unused_Port.static import (
+    BULK_LAST_INPUT,
+    EXEC_CHANNELS,
+    EXEC_MAX_TIMEOUT,
+    EXEC_TIMEOUT,
+    PIPELINE_BATCH,
+    PROMPT_TIMEOUT,
+    UPTIME_MIN_WEEK,
+)
 from Unused_Port.stdout import Stdout
 
 _log = logging.getLogger(__name__)
@@ -32,32 +60,6 @@ except ImportError:
     from openpyxl import Workbook
 
 
-# Ne pas utiliser les | include car cela ne marche pas (dans les commandes)
-
-
-class UPC_Commands:
-    """Liste des commandes utilisées par UPC, 'Unused Port Checker'."""
-
-    # SH_INT = "show int status | i notconnect"
-    # SH_LAST_INT = "show int {} | i Last input"
-    SH_INT = "show int status"
-    SH_LAST_INT = "show int {}"
-    SH_VERSION = "show version"
-
-
-class UPC_Regex:
-    """Liste des regex utilisés par UPC, 'Unused Port Checker'."""
-
-    INT_REGEX = (
-        r"^([a-zA-Z]{1,4}[0-9]/[0-9]{1,2}(?:/[0-9]{1,2})"
-        r"?)\s+\S*\s+(connected|notconnect|disabled)"
-    )
-    LAST_REGEX = r"Last input (\S+),"
-    UPTIME_REGEX = r"uptime is(?: (\d+) year(?:s)?,)?(?: (\d+) week(?:s)?)?(?:$|,)"
-    HOSTNAME_ON_UPTIME_REGEX = r"(\S+)?\s?uptime is"
-    VALIDATOR_UPTIME = r"uptime is"
-
-
 class UnusedPortChecker(BaseConnexion):
     """
     Classe héritante de la classe BaseConnexion.
@@ -74,6 +76,9 @@ class UnusedPortChecker(BaseConnexion):
         self,
         workbook: Optional["Workbook"] = None,
         stdout: str = "default",
+        bulk: bool = BULK_LAST_INPUT,
+        channels: int = EXEC_CHANNELS,
+        batch: int = PIPELINE_BATCH,
         **kwargs,
     ):
         """
@@ -84,7 +89,19 @@ class UnusedPortChecker(BaseConnexion):
         ne marche pas, essayerai la deuxieme ...
 
         :param workbook: Choix ou non de mettre un Workbook,
-        ceci permet de mettre tous les switch dans un meme fichier excel
+        ceci permet de mettre tous les switch dans un meme fichier excel,
+        sinon un Workbook 'write_only' est crée seulement si l'excel est
+        généré (voir Stdout.to_xl())
+
+        :param bulk: Si True, le last input de toutes les interfaces est
+        récupéré avec un seul 'sh interfaces' au lieu d'un 'sh int X' par port
+
+        :param channels: Nombre de channels 'exec' utilisés en parallèle pour
+        les 'sh int X' (1 pour tout faire dans le shell interactif)
+
+        :param batch: Nombre de 'sh int X' envoyés d'un coup dans le shell
+        interactif quand les channels 'exec' ne sont pas disponibles (1 pour
+        une commande a la fois)
 
         :param kwargs: Permet de remplir les requirements
         de la methode __new__ de la classe parent
@@ -93,20 +110,23 @@ class UnusedPortChecker(BaseConnexion):
             _log.warning(f"stdout '{stdout}' n'existe pas, utilisation de 'default'")
             self.stdout = "default"
 
-        if not workbook:
-            workbook = Workbook()
+        self.workbook: Optional[Workbook] = workbook
 
-        self.workbook = workbook
-
-        self._comp = re.compile(UPC_Regex.LAST_REGEX)
-        self._upcompile = re.compile(UPC_Regex.UPTIME_REGEX)
-        self._valicompile = re.compile(UPC_Regex.VALIDATOR_UPTIME)
-        self._hostcompile = re.compile(UPC_Regex.HOSTNAME_ON_UPTIME_REGEX)
+        self._morecompile = re.compile(UPC_Regex.MORE_REGEX)
+        self._promptcompile = re.compile(UPC_Regex.GENERIC_PROMPT_REGEX)
+        self._prompt = ""
+        self._echocompile: Optional[re.Pattern] = None
 
+        self.bulk = bulk
+        self.channels = channels
+        self.batch = batch
         self.stdout = stdout
         self._output: list[tuple[str, str]] = []
         self._uptime = "(surement appareil non cisco)"
         self.real_hostname = ""
+        self.model = ""
+        self.non_cisco = False
+        self._version_rejected = False
         self._now = now()
 
         super().__init__(**kwargs)
@@ -125,6 +145,8 @@ class UnusedPortChecker(BaseConnexion):
         self.set_missing_host_key_policy(AutoAddPolicy)
         exc = self._connect()
         if exc is None:
+            if self.error:
+                raise self.error
             raise UPC_SSH_CONNEXION_ERROR(
                 f"Erreur lors de la connexion SSH au switch : {self._hostname}"
             )
@@ -146,6 +168,9 @@ class UnusedPortChecker(BaseConnexion):
                 f" {self._uptime}"
             )
             return False
+        except UPC_TIMEOUT_ERROR:
+            self.valid = False
+            raise
         except Exception as e:
             _log.error(f"Erreur lors de la vérification des ports non utilisés : {e}")
             self.valid = False
@@ -166,9 +191,13 @@ class UnusedPortChecker(BaseConnexion):
             f"Récuperation des interfaces pour l'host : "
             f"(ip: {self._hostname}, hostname: {self.real_hostname})"
         )
-        raw_int = self._exec_command(UPC_Commands.SH_INT)
-        ints = self._list_int(raw_int)
-        return ints
+        parser = self._run_parser(UPC_Commands.SH_INT)
+        if not parser.rows:
+            raise UPC_VALIDATION_ERROR(
+                f"_get_int(), data incomplete "
+                f"(ip: {self._hostname}, hostname: {self.real_hostname})"
+            )
+        return [row.interface for row in parser.rows if row.status == "notconnect"]
 
     def _check(self):
         """
@@ -180,10 +209,16 @@ class UnusedPortChecker(BaseConnexion):
 
         :return: raise une erreur si un probleme est trouvé
         """
-        self._shell = self.invoke_shell(width=1000, height=1000)
-        self._shell.set_combine_stderr(True)
+        self._open_shell()
 
         valid = self._uptime_checker()
+        if valid is None and not self._version_rejected:  # abandon du retry
+            raise UPC_TIMEOUT_ERROR(
+                f"'{UPC_Commands.SH_VERSION}' sans réponse valide "
+                f"(ip: {self._hostname}, hostname: {self.real_hostname})"
+            )
+        if valid is None:  # 'sh version' recu mais jamais compris
+            self.non_cisco = True
         if not valid:
             raise UPC_UP_TIME_ERROR(
                 f"Uptime minimum est de {UPTIME_MIN_WEEK} weeks, "
@@ -212,10 +247,17 @@ class UnusedPortChecker(BaseConnexion):
             f"ints {ints} pour (ip: {self._hostname}, hostname: {self.real_hostname})"
         )
 
+        ints = [_int for _int in ints if self._int_value_pass(_int=_int)]
+        table: dict[str, IntRow] = {}
+        if self.bulk:
+            table = self._get_last_inputs() or {}
+        if self.channels > 1:
+            table.update(self._channels_last_inputs(ints, table))
+        if self.batch > 1:
+            table.update(self._batch_last_inputs(ints, table))
+
         for _int in ints:
-            if not self._int_value_pass(_int=_int):
-                continue
-            last_input = self._int_checker(_int=_int)
+            last_input = self._bulk_last_input(table, _int)
             if last_input:
                 self._output.append((_int, last_input))
                 _log.debug(
@@ -228,57 +270,60 @@ class UnusedPortChecker(BaseConnexion):
             f"{self._hostname}, hostname: {self.real_hostname})"
         )
 
-    def _uptime_validator(self, data: str) -> Optional[bool]:
+    def _uptime_validator(self, version: Optional[VersionRow]) -> Optional[bool]:
         """
-        Cette fonction recupere la data d'une commande.
+        Cette fonction recupere le résultat parsé de 'sh version'.
 
         Retourne True si l'uptime du switch concorde avec
         les attentes de 'UPTIME_MIN_WEEK' dans static.py,
         en week sinon False.
 
-        :param data: Résultat d'une commande
-        :return: True si l'uptime est bon, False sinon
+        :param version: Résultat parsé de 'sh version'
+        :return: True si l'uptime est bon, False sinon, raise
+            UPC_NON_CISCO_ERROR si la sortie n'est pas celle d'un cisco
         """
         _log.debug(
             f"Validation de l'uptime pour l'host : "
             f"{self._hostname} et recupération de l'hostname"
         )
-        match = self._valicompile.search(data)
-        if not match:  # Signifie que la data que l'on recoit n'est pas bonne / pas un appareil cisco (palo ne comprend pas 'sh ver')
-            raise UPC_VALIDATION_ERROR("_uptime_validator(), data incomplete")
+        if not version:  # Signifie que la data que l'on recoit n'est pas bonne / pas un appareil cisco (palo ne comprend pas 'sh ver')
+            raise UPC_NON_CISCO_ERROR(
+                f"_uptime_validator(), 'uptime is' absent "
+                f"(ip: {self._hostname}, hostname: {self.real_hostname})"
+            )
 
-        match = self._hostcompile.search(data)
-        if not match:
-            return False
-        hostname = match.group(1)
+        if version.model:
+            self.model = version.model
+        hostname = version.hostname
         if hostname and not self.real_hostname:
             self.real_hostname = hostname
+            if not self._prompt:
+                self._learn_prompt(hostname)
 
-        match = self._upcompile.search(data)
         self._uptime = "< 1 week"
-        if not match:
-            return False
-        year, week = match.groups()
-        self._uptime = f"{year} year, {week} week(s)" if year else f"{week} week(s)"
-        if not week:
+        if version.seconds is None:
             return False
-        if int(week) < UPTIME_MIN_WEEK and not year:
-            return False
-        else:
-            return True
+        self._uptime = format_weeks(version.seconds)
+        return version.seconds >= UPTIME_MIN_WEEK * WEEK
 
-    @retry(max_retries=5, delay=0.5)
+    @retry(max_retries=5, delay=0.5, give_up_on=(*NON_RETRYABLE, UPC_NON_CISCO_ERROR))
     def _uptime_checker(self) -> Optional[bool]:
         """
         Cette fonction gere la vérification de l'uptime, avec un retry si
-        la data n'est pas entiere.
+        la commande n'a pas abouti (timeout ...). Une sortie recue mais non
+        comprise n'est pas réessayée.
 
         :return: True / False si l'uptime est bon , None si aucun uptime
-            trouvé
+            trouvé, dans ce cas self._version_rejected indique si la
+            derniere sortie recue a été rejetée par le parser (pas un
+            appareil cisco) ou si la commande n'a pas abouti (timeout ...)
         """
         _log.debug(f"Verification de l'uptime pour l'host : {self._hostname}")
-        uptime_raw = self._exec_command(UPC_Commands.SH_VERSION, delay=0.5)
-        valid = self._uptime_validator(uptime_raw)
+        self._version_rejected = False
+        parser = self._run_parser(UPC_Commands.SH_VERSION)
+        version = parser.result()
+        self._version_rejected = version is None
+        valid = self._uptime_validator(version)
         return valid
 
     def _int_value_pass(self, _int: str):
@@ -315,112 +360,396 @@ class UnusedPortChecker(BaseConnexion):
             f"{_int} de l'host : (ip: {self._hostname}, "
             f"hostname: {self.real_hostname})"
         )
-        last_input_raw = self._exec_command(UPC_Commands.SH_LAST_INT.format(_int))
-        last_input = self._last_input_checker(last_input_raw)
+        parser = self._run_parser(
+            UPC_Commands.SH_LAST_INT, UPC_Commands.SH_LAST_INT.format(_int)
+        )
+        if not parser.rows:
+            raise UPC_VALIDATION_ERROR(
+                f"_int_checker(), data incomplete "
+                f"(ip: {self._hostname}, hostname: {self.real_hostname})"
+            )
+        last_input = self._last_input_checker(self._match_row(_int, parser.rows[0]))
         return last_input
 
+    @retry(max_retries=3, delay=0.3)
+    def _get_last_inputs(self) -> dict[str, IntRow]:
+        """
+        Cette fonction recupere en une seule commande 'sh interfaces' le
+        last input de chaque interface du switch, la sortie est parsée
+        ligne par ligne pendant la lecture.
+
+        :return: un dictionnaire {interface normalisée: IntRow}
+        """
+        _log.debug(
+            f"Récuperation du last input de toutes les interfaces pour "
+            f"l'host : (ip: {self._hostname}, hostname: {self.real_hostname})"
+        )
+        parser = self._run_parser(UPC_Commands.SH_ALL_INT)
+        if not parser.rows:
+            raise UPC_VALIDATION_ERROR(
+                f"_get_last_inputs(), data incomplete "
+                f"(ip: {self._hostname}, hostname: {self.real_hostname})"
+            )
+        return {int_key(row.interface): row for row in parser.rows}
+
+    def _run_parser(self, command: str, cmd: Optional[str] = None) -> UPC_Parser:
+        """
+        Cette fonction execute une commande en donnant chaque ligne recue au
+        parser enregistré pour cette commande.
+
+        :param command: la commande de UPC_Commands (ex : SH_LAST_INT)
+        :param cmd: la commande réelle si 'command' est un template
+        :return: le parser avec ses lignes typées
+        """
+        parser = get_parser(command)
+        self._exec_command(cmd or command, on_line=parser.feed)
+        _log.debug(f"{parser.stats()} (ip: {self._hostname})")
+        return parser
+
+    def _parse_last_inputs(
+        self, ints: list[str], outputs: list[Optional[str]]
+    ) -> dict[str, IntRow]:
+        """
+        Cette fonction parse les sorties de 'sh int X' recues en une fois
+        (channels exec, pipeline).
+
+        :param ints: la liste des interfaces
+        :param outputs: la sortie de 'sh int X' de chaque interface
+        :return: un dictionnaire {interface normalisée: IntRow}, raise
+            UPC_VALIDATION_ERROR si une sortie n'est pas celle de son interface
+        """
+        result: dict[str, IntRow] = {}
+        for _int, output in zip(ints, outputs):
+            if not output:
+                continue
+            if rows := parse(UPC_Commands.SH_LAST_INT, output).rows:
+                result[int_key(_int)] = self._match_row(_int, rows[0])
+        return result
+
+    def _match_row(self, _int: str, row: IntRow) -> IntRow:
+        """
+        Cette fonction check que la sortie parsée est bien celle de
+        l'interface demandée (sortie décalée d'un lot, écho perdu ...).
+
+        :param _int: l'interface demandée (ex : gi1/0/2)
+        :param row: la ligne parsée de 'sh int X'
+        :return: la ligne, raise UPC_VALIDATION_ERROR si l'interface diffère
+        """
+        if int_key(row.interface) != int_key(_int):
+            raise UPC_VALIDATION_ERROR(
+                f"Sortie de {row.interface} recue pour {_int} "
+                f"(ip: {self._hostname}, hostname: {self.real_hostname})"
+            )
+        return row
+
+    def _channels_last_inputs(
+        self, ints: list[str], table: dict[str, IntRow]
+    ) -> dict[str, IntRow]:
+        """
+        Cette fonction execute les 'sh int X' des interfaces absentes de
+        'table' sur plusieurs channels 'exec' en parallèle.
+
+        :param ints: la liste des interfaces
+        :param table: la table deja connue (ex : depuis 'sh interfaces')
+        :return: un dictionnaire {interface normalisée: IntRow}
+        """
+        pending = [_int for _int in ints if int_key(_int) not in table]
+        if not pending:
+            return {}
+        _log.debug(
+            f"Récuperation du last input de {len(pending)} interfaces sur "
+            f"{self.channels} channels (ip: {self._hostname}, "
+            f"hostname: {self.real_hostname})"
+        )
+        pool = ExecChannelPool(
+            self.get_transport(),
+            self.channels,
+            timeout=EXEC_TIMEOUT,
+            throttle=lambda: throttle(self._site, "command"),
+        )
+        outputs = pool.run([UPC_Commands.SH_LAST_INT.format(_int) for _int in pending])
+        try:
+            return self._parse_last_inputs(pending, outputs)
+        except UPC_VALIDATION_ERROR as e:
+            _log.debug(f"{e}, utilisation de 'sh int X' une par une")
+            return {}
+
+    def _batch_last_inputs(
+        self, ints: list[str], table: dict[str, IntRow]
+    ) -> dict[str, IntRow]:
+        """
+        Cette fonction execute les 'sh int X' des interfaces absentes de
+        'table' par lots de 'self.batch' commandes dans le shell interactif.
+
+        :param ints: la liste des interfaces
+        :param table: la table deja connue (ex : depuis les channels exec)
+        :return: un dictionnaire {interface normalisée: IntRow}
+        """
+        pending = [_int for _int in ints if int_key(_int) not in table]
+        if not pending or not self._echocompile:
+            return {}
+        result: dict[str, IntRow] = {}
+        for i in range(0, len(pending), self.batch):
+            chunk = pending[i : i + self.batch]
+            try:
+                outputs = self._exec_batch(
+                    [UPC_Commands.SH_LAST_INT.format(_int) for _int in chunk]
+                )
+                result.update(self._parse_last_inputs(chunk, outputs))
+            except (UPC_RETRY_ERROR, UPC_VALIDATION_ERROR) as e:
+                _log.debug(f"{e}, utilisation de 'sh int X' une par une")
+                self._reopen_shell()
+        return result
+
+    def _bulk_last_input(
+        self, table: dict[str, IntRow], _int: str
+    ) -> Optional[Union[str, bool]]:
+        """
+        Cette fonction recupere le last input de l'interface '_int' depuis la
+        table de 'sh interfaces' / des channels exec / du pipeline, et
+        repasse par 'sh int X' si l'interface n'y est pas.
+
+        :param table: la table retournée par _get_last_inputs()
+        :param _int: l'interface (ex : gi1/0/2)
+        :return: retourne le last input si celui ci est bon, sinon False
+            / None
+        """
+        if row := table.get(int_key(_int)):
+            return self._last_input_checker(row)
+        return self._int_checker(_int=_int)
+
     def stop(self) -> None:
         """
         Cette fonction est utilisée pour stopper l'instance en cours, en.
 
-        appelant la fonction 'close()' de SSHClient et '_stop()' de
-        base.py.
+        fermant le shell, en rendant la session SSH a la pool de sessions
+        avec '_release_session()' et en appelant '_stop()' de base.py.
 
         :return:
         """
-        self.close()
+        if shell := getattr(self, "_shell", None):
+            shell.close()
+        self._release_session()
         self._stop()
         _log.debug("UnusedPortChecker arrêté.")
 
-    def _exec_command(self, cmd, *, delay: float = 0.2) -> str:
+    def _open_shell(self) -> None:
+        """
+        Cette fonction ouvre le shell interactif, apprend le prompt du switch
+        depuis la bannière, puis désactive la pagination et fixe la largeur
+        du terminal (une seule fois par session).
+
+        :return: None
+        """
+        self._shell = self.invoke_shell(width=1000, height=1000)
+        self._shell.set_combine_stderr(True)
+        self._buffer = RecvBuffer()
+        try:
+            banner = self._read_until_prompt(timeout=PROMPT_TIMEOUT)
+        except UPC_RETRY_ERROR:
+            self._shell.sendall("\r\n")
+            banner = self._read_until_prompt(timeout=PROMPT_TIMEOUT)
+        if not self._prompt and (match := self._promptcompile.search(banner)):
+            self._learn_prompt(match.group(1))
+
+        for cmd in (UPC_Commands.TERM_LEN, UPC_Commands.TERM_WIDTH):
+            self._exec_command(cmd)
+
+    def _reopen_shell(self) -> None:
+        """
+        Cette fonction ferme et réouvre le shell interactif après un lot en
+        erreur : les sorties encore en attente du lot sont perdues avec
+        l'ancien shell, les commandes suivantes ne sont donc pas décalées.
+
+        :return: None
+        """
+        _log.debug(
+            f"Réouverture du shell (ip: {self._hostname}, "
+            f"hostname: {self.real_hostname})"
+        )
+        self._shell.close()
+        self._open_shell()
+
+    def _learn_prompt(self, hostname: str) -> None:
+        """
+        Cette fonction enregistre le prompt du switch, utilisé par
+        _read_until_prompt() pour savoir quand une commande est terminée.
+
+        :param hostname: l'hostname affiché dans le prompt (ex : SW1 pour SW1#)
+        :return: None
+        """
+        self._prompt = hostname
+        self._promptcompile = re.compile(
+            UPC_Regex.PROMPT_REGEX.format(re.escape(hostname))
+        )
+        self._echocompile = re.compile(UPC_Regex.ECHO_REGEX.format(re.escape(hostname)))
+        _log.debug(f"Prompt appris pour l'host {self._hostname} : {hostname}")
+
+    def _read_until_prompt(
+        self,
+        *,
+        timeout: float = EXEC_TIMEOUT,
+        on_line: Optional[Callable[[str], Any]] = None,
+        prompts: int = 1,
+    ) -> str:
+        """
+        Cette fonction lit le shell jusqu'a ce que le prompt du switch
+        réapparaisse, en passant les pages '--More--' si la pagination est
+        encore active.
+
+        Pour un lot de commandes, le prompt doit réapparaitre 'prompts' fois,
+        les prompts intermédiaires étant suivis de l'écho de la commande.
+
+        Chaque ligne complète est donnée a 'on_line' dès sa réception, sans
+        etre gardée en mémoire, sinon les lignes sont retournées.
+
+        :param timeout: le délai max en seconde sans data recue, repoussé a
+            chaque réception (la lecture est coupée après EXEC_MAX_TIMEOUT)
+        :param on_line: fonction appelée avec chaque ligne recue
+        :param prompts: le nombre de commandes envoyées d'un coup
+        :return: la data recue (vide si on_line), sans les marqueurs '--More--'
+        """
+        lines: list[str] = []
+        consume = on_line or lines.append
+        echoes = 0
+        limit = monotonic() + EXEC_MAX_TIMEOUT
+        while True:
+            data = self._recv(min(monotonic() + timeout, limit))
+            for line in self._buffer.feed(data):
+                if "\x08" in line or "--More--" in line:
+                    line = self._morecompile.sub("", line)
+                if prompts > 1 and self._is_echo(line):
+                    echoes += 1
+                consume(line)
+            tail = self._buffer.tail()
+            if "--More--" in tail:
+                self._buffer.discard_tail()
+                self._shell.sendall(" ")
+                continue
+            if echoes >= prompts - 1 and self._promptcompile.search(tail):
+                self._buffer.clear()
+                if not on_line:
+                    lines.append(tail)
+                return "\n".join(lines)
+
+    def _recv(self, deadline: float) -> bytes:
+        """
+        Cette fonction attend la prochaine data du shell, au plus tard
+        jusqu'a 'deadline'.
+
+        :param deadline: l'instant (time.monotonic) max de réception
+        :return: la data recue, raise UPC_RETRY_ERROR si le délai est dépassé
+        """
+        while (remaining := deadline - monotonic()) > 0:
+            self._shell.settimeout(remaining)
+            try:
+                data = self._shell.recv(65535)
+            except socket.timeout:
+                continue
+            if not data:
+                raise UPC_SSH_CONNEXION_ERROR(
+                    f"Shell fermé par l'host (ip: {self._hostname}, "
+                    f"hostname: {self.real_hostname})"
+                )
+            return data
+        self._buffer.clear()
+        raise UPC_RETRY_ERROR(
+            f"Prompt non recu dans le délai (ip: {self._hostname}, "
+            f"hostname: {self.real_hostname})"
+        )
+
+    def _exec_command(
+        self,
+        cmd,
+        *,
+        timeout: float = EXEC_TIMEOUT,
+        on_line: Optional[Callable[[str], Any]] = None,
+    ) -> str:
         """
         Cette fonction est utilisée pour executer les commandes.
 
-        Elle attend 'delay' en secondes, puis lit la data dans son buffer,
-        la decode puis la return.
+        Elle envoie la commande puis lit la data jusqu'au retour du prompt,
+        la latence de chaque commande est donc celle du switch.
 
         :param cmd: la commande a envoyer
-        :param delay: le delais en seconde
+        :param timeout: le délai max en seconde pour recevoir la sortie
+        :param on_line: fonction appelée avec chaque ligne recue (parsing
+            pendant la lecture), voir _read_until_prompt()
         :return: Le resultat de la commande
         """
         _log.debug(
             f"Exécution de la commande : {cmd} sur "
             f"(ip: {self._hostname}, hostname: {self.real_hostname})"
         )
+        throttle(self._site, "command")
         self._shell.sendall(cmd + "\r\n")
-        while not self._shell.recv_ready():
-            sleep(0.1)
-        sleep(delay)
-        # Sans ce délai , le shell renvoie son buffer meme si il n'a pas encore tout recu -> perte de data
-        stdout = self._shell.recv(65535).decode("utf-8")
-        return stdout
+        return self._read_until_prompt(timeout=timeout, on_line=on_line)
 
-    def _list_int(self, raw_int: str) -> Optional[list]:
+    def _is_echo(self, line: str) -> bool:
         """
-        Cette fonction check si la data reçu est bonne et entiere,
-        sinon raise une erreur.
+        Cette fonction check si une ligne est l'écho d'une commande précédé
+        du prompt (ex : 'SW1#show int gi1/0/2').
 
-        Puis check pour chaque interface si celle çi
-        est 'notconnect', si c'est le cas, elle l'ajoute a la liste
-        retournée.
+        :param line: une ligne recue du shell
+        :return: True si c'est un écho, sinon False
+        """
+        return bool(
+            self._echocompile
+            and line.startswith(self._prompt)
+            and self._echocompile.match(line)
+        )
+
+    def _exec_batch(self, cmds: list[str]) -> list[str]:
+        """
+        Cette fonction envoie un lot de commandes en un seul 'sendall' dans le
+        shell interactif, puis découpe la sortie commune par commande en
+        utilisant l'écho du prompt comme délimiteur.
 
-        :param raw_int: La data de la commande 'sh int status'
-        :return: une liste d'interfaces 'notconnect'
+        :param cmds: la liste des commandes a envoyer
+        :return: la sortie de chaque commande, dans l'ordre de 'cmds'
         """
         _log.debug(
-            f"Récuperation des interfaces 'notconnect' "
-            f"pour l'host : (ip: {self._hostname}, hostname: {self.real_hostname})"
+            f"Exécution de {len(cmds)} commandes en pipeline sur "
+            f"(ip: {self._hostname}, hostname: {self.real_hostname})"
+        )
+        sections: list[list[str]] = [[]]
+
+        def _on_line(line: str) -> None:
+            if self._is_echo(line):
+                sections.append([])
+            sections[-1].append(line)
+
+        throttle(self._site, "command", len(cmds))
+        self._shell.sendall("".join(cmd + "\r\n" for cmd in cmds))
+        self._read_until_prompt(
+            timeout=EXEC_TIMEOUT + len(cmds), on_line=_on_line, prompts=len(cmds)
         )
-        result: list[str] = []
-        if not re.search(UPC_Regex.INT_REGEX, raw_int, re.MULTILINE):
+        if len(sections) != len(cmds):
             raise UPC_VALIDATION_ERROR(
-                f"_list_int(), data incomplete "
-                f"(ip: {self._hostname}, hostname: {self.real_hostname})"
+                f"_exec_batch(), {len(sections)} sorties pour {len(cmds)} "
+                f"commandes (ip: {self._hostname}, hostname: {self.real_hostname})"
             )
-        for match in re.finditer(UPC_Regex.INT_REGEX, raw_int, re.MULTILINE):
-            interface, status = match.groups()
-            if status == "notconnect":
-                result.append(interface)
-        return result
+        return ["\n".join(section) for section in sections]
 
-    def _last_input_checker(self, _input: str) -> Optional[Union[bool, str]]:
+    def _last_input_checker(self, row: IntRow) -> Optional[Union[bool, str]]:
         """
-        Cette fonction est utilisée pour sortir le last input du résultat
-        de la commande 'sh int X'.
+        Cette fonction est utilisée pour valider le last input parsé de la
+        commande 'sh int X' / 'sh interfaces'.
+
+        Le last input est déja converti en secondes par le parser, la
+        comparaison avec 'UPTIME_MIN_WEEK' se fait en semaines entières.
 
-        :param _input: La data de la commande 'sh int X'
+        :param row: La ligne parsée (ex : last input 13w2d, never)
         :return: False si le last input convient pas, le last input si
-            c'est bon, sinon raise une erreur si data incomplete
+            c'est bon
         """
-        raw_last_input = self._comp.search(_input)
-        try:
-            assert raw_last_input
-            last_input = raw_last_input.group(1)
-        except (AttributeError, AssertionError) as e:
-            raise UPC_VALIDATION_ERROR(
-                f"_last_input_checker(), data incomplete "
+        if row.seconds is None:
+            _log.debug(
+                f"Format de last input inconnu {row.last_input} pour {row.interface} "
                 f"(ip: {self._hostname}, hostname: {self.real_hostname})"
-            ) from e
-        except Exception as e:
-            raise UPC_VALIDATION_ERROR(
-                f"_last_input_checker(), {e} (ip: "
-                f"{self._hostname}, hostname: {self.real_hostname})"
-            ) from e
-        if last_input == "never":
-            return last_input
-
-        if "w" not in last_input:
-            return False
-        try:
-            tps = int(last_input.split("w")[0])
-        except TypeError:
+            )
             return False
-        except Exception as e:
-            raise UPC_UNKNOWN_ERROR(
-                f"{e!s} (ip: {self._hostname}, hostname: {self.real_hostname})"
-            ) from e
-
-        return last_input if tps > UPTIME_MIN_WEEK else False
+        return row.last_input if row.seconds // WEEK > UPTIME_MIN_WEEK else False
 
     def get_stdout(self) -> Optional["Workbook"]:
         """
@@ -467,6 +796,22 @@ class UnusedPortChecker(BaseConnexion):
             return None
         return None
 
+    def export(self, site: Optional[str] = None) -> None:
+        """
+        Cette fonction ajoute les interfaces non utilisées de l'host a
+        l'export du run (voir export.py), si l'export est activé.
+
+        :param site: le site 'France' ...
+        :return: None
+        """
+        exporter.write(
+            self._output,
+            site=site,
+            ip=self._hostname,
+            hostname=self.real_hostname or self._hostname,
+            uptime=self._uptime,
+        )
+
     def __repr__(self):
         """Affichage de la classe."""
         return f"UnusedPortChecker({self._hostname=}, {self._username=}, {self.stdout=}"
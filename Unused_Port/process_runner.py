@@ -0,0 +1,151 @@
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from logging.handlers import QueueHandler, QueueListener
+from pathlib import Path
+from typing import Iterable, Optional, Union
+
+from Unused_Port.export import exporter
+from Unused_Port.ip_set import IPSet
+from Unused_Port.static import DIRS, ENGINE
+
+_log = logging.getLogger(__name__)
+
+
+def _shard(
+    ip: dict[Optional[str], Iterable], workers: int
+) -> list[tuple[Optional[str], Union[list[str], IPSet]]]:
+    """
+    Cette fonction découpe les ips de chaque site en 'workers' morceaux
+    (répartition round-robin pour équilibrer les morceaux).
+
+    :param ip: un dictionnaire {site: ips}
+    :param workers: le nombre de process
+    :return: une liste de (site, ips du morceau), un IPSet est découpé en
+        intervalles contigus sans générer ses ips
+    """
+    shards: list[tuple[Optional[str], Union[list[str], IPSet]]] = []
+    for site, ips in ip.items():
+        if isinstance(ips, IPSet):
+            shards += [(site, chunk) for chunk in ips.split(workers)]
+            continue
+        chunks: list[list[str]] = [[] for _ in range(workers)]
+        for i, host in enumerate(ips):
+            chunks[i % workers].append(str(host))
+        shards += [(site, chunk) for chunk in chunks if chunk]
+    return shards
+
+
+def _init_worker(
+    queue: "multiprocessing.Queue",
+    level: int,
+    service: bool,
+    export: Optional[str] = None,
+):
+    """
+    Cette fonction initialise chaque process : ses logs sont envoyés au
+    process parent via 'queue', DIRS.service est recopié, et chaque morceau
+    d'ips exporte ses lignes dans son propre fichier (voir export.py).
+
+    :param queue: la queue de logs partagée avec le process parent
+    :param level: le niveau de log du process parent
+    :param service: la valeur de DIRS.service du process parent
+    :param export: le format d'export du process parent (voir export.py)
+    :return: None
+    """
+    DIRS.service = service
+    exporter.fmt, exporter.shard = export, True
+    logger = logging.getLogger()
+    for handler in logger.handlers[:]:
+        logger.removeHandler(handler)
+    logger.addHandler(QueueHandler(queue))
+    logger.setLevel(level)
+
+
+def _run_shard(
+    site: Optional[str], ips: Union[list[str], IPSet], engine: str
+) -> tuple[Optional[str], int, list[str], Optional[Path]]:
+    """
+    Cette fonction est executée dans chaque process, elle lance la
+    découverte et les workers SSH sur son morceau d'ips.
+
+    :param site: le site ('France' / 'US' ...)
+    :param ips: le morceau d'ips de ce process
+    :param engine: 'thread' ou 'asyncio'
+    :return: (site, nombre d'ips du morceau, ips valides, fichier d'export
+        du morceau a recopier par le process parent, voir Exporter.merge())
+    """
+    from Unused_Port.starter import start
+
+    exporting = exporter.begin()  # start() ne ferme pas ce fichier
+    try:
+        valid = start(ips, False, site, engine, workers=1)  # pas de process imbriqués
+    except BaseException:
+        if exporting and (part := exporter.end()):
+            part.unlink(missing_ok=True)
+        raise
+    return site, len(ips), valid, exporter.end() if exporting else None
+
+
+def start_processes(
+    ip: Union[dict[str, IPSet], IPSet, list],
+    workers: int,
+    *,
+    engine: str = ENGINE,
+) -> list[str]:
+    """
+    Cette fonction répartit les ips de tous les sites sur 'workers' process,
+    chaque process executant la découverte et les workers SSH sur son morceau.
+
+    Les logs des process sont regroupés dans les handlers du process parent,
+    et le nombre d'hosts valides est regroupé par site.
+
+    :param ip: Un dictionnaire {site: ips}, ou une liste d'ips
+    :param workers: le nombre de process
+    :param engine: 'thread' ou 'asyncio', voir static.ENGINES
+    :return: la liste des ips valides de tous les process
+    """
+    if not isinstance(ip, dict):
+        ip = {None: ip}  # type: ignore
+    shards = _shard(ip, workers)  # type: ignore
+    _log.info(f"Lancement de {len(shards)} morceaux d'ips sur {workers} process")
+
+    root = logging.getLogger()
+    queue: multiprocessing.Queue = multiprocessing.Queue()
+    listener = QueueListener(queue, *root.handlers, respect_handler_level=True)
+    listener.start()
+
+    valid: list[str] = []
+    per_site: dict[Optional[str], int] = {}
+    try:
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(queue, root.level, DIRS.service, exporter.fmt),
+        ) as pool:
+            futures = [
+                pool.submit(_run_shard, site, ips, engine) for site, ips in shards
+            ]
+            for future in as_completed(futures):
+                try:
+                    site, size, shard_valid, part = future.result()
+                except Exception as e:
+                    _log.error(f"Erreur dans un process : {e}")
+                    continue
+                exporter.merge(part)
+                valid += shard_valid
+                per_site[site] = per_site.get(site, 0) + len(shard_valid)
+                _log.debug(
+                    f"Morceau de {size} ips terminé pour le site {site}, "
+                    f"{len(shard_valid)} hosts valides"
+                )
+    finally:
+        listener.stop()
+
+    for site, count in per_site.items():
+        _log.info(f"{count} Hosts valides pour le site {site}")
+    return valid
+
+
+if __name__ == "__main__":
+    pass
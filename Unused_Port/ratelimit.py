@@ -0,0 +1,107 @@
+import logging
+from threading import Lock
+from time import monotonic, sleep
+from typing import ClassVar, Optional
+
+from Unused_Port.static import AAA_DOMAINS, AAA_RATE_LIMITS, RATE_LIMITS
+
+_log = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """
+    Token bucket partagé par tous les threads du process.
+
+    'rate' jetons sont ajoutés par seconde, jusqu'a 'burst' jetons, chaque
+    login / commande consomme un jeton et attend si le bucket est vide.
+    """
+
+    _instance: ClassVar[dict[tuple[Optional[str], str], "TokenBucket"]] = {}
+    _lock: ClassVar[Lock] = Lock()
+
+    def __init__(self, rate: float, burst: float, *, name: str = ""):
+        """
+        Instancie la classe 'TokenBucket'.
+
+        :param rate: le nombre de jetons ajoutés par seconde
+        :param burst: le nombre max de jetons dans le bucket
+        :param name: le nom du bucket pour les logs
+        """
+        self.rate: float = rate
+        self.burst: float = max(1.0, burst)
+        self._tokens: float = self.burst
+        self._last: float = monotonic()
+        self.lock: Lock = Lock()
+        self.name: str = name
+
+    @classmethod
+    def get(cls, scope: Optional[str], kind: str) -> Optional["TokenBucket"]:
+        """
+        Cette fonction retourne le bucket de 'scope' (un site ou un domaine
+        AAA) pour 'kind' ('login' ou 'command').
+
+        :param scope: le site ('France' / 'US' ...) ou le domaine AAA
+        :param kind: 'login' ou 'command'
+        :return: l'instance de TokenBucket, None si aucune limite
+        """
+        with cls._lock:
+            if (scope, kind) not in cls._instance:
+                if scope in AAA_RATE_LIMITS or scope in AAA_DOMAINS.values():
+                    conf = AAA_RATE_LIMITS.get(scope, {}).get(kind, {})
+                else:
+                    conf = {
+                        **RATE_LIMITS[None].get(kind, {}),
+                        **RATE_LIMITS.get(scope, {}).get(kind, {}),
+                    }
+                cls._instance[(scope, kind)] = (
+                    cls(**conf, name=f"{kind} {scope or ''}".strip())
+                    if conf.get("rate")
+                    else None
+                )
+            return cls._instance[(scope, kind)]
+
+    def acquire(self, tokens: float = 1) -> float:
+        """
+        Cette fonction prend 'tokens' jetons, et attend le temps nécessaire
+        si le bucket n'en a pas assez (les jetons sont réservés avant
+        d'attendre, les threads passent donc dans l'ordre d'arrivée).
+
+        :param tokens: le nombre de jetons a prendre
+        :return: le temps attendu (s)
+        """
+        with self.lock:
+            now = monotonic()
+            self._tokens = min(
+                self.burst, self._tokens + (now - self._last) * self.rate
+            )
+            self._last = now
+            self._tokens -= tokens
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if wait:
+            _log.debug(f"Rate limit {self.name} : attente de {wait:.2f}s")
+            sleep(wait)
+        return wait
+
+
+def throttle(site: Optional[str], kind: str, tokens: float = 1) -> float:
+    """
+    Cette fonction attend les jetons du site et du domaine AAA du site
+    (voir static.RATE_LIMITS / static.AAA_DOMAINS).
+
+    :param site: le site ('France' / 'US' ...), None si --auto non utilisé
+    :param kind: 'login' ou 'command'
+    :param tokens: le nombre de jetons a prendre
+    :return: le temps attendu (s)
+    """
+    scopes = [site]
+    if domain := AAA_DOMAINS.get(site):
+        scopes.append(domain)
+    waited = 0.0
+    for scope in scopes:
+        if bucket := TokenBucket.get(scope, kind):
+            waited += bucket.acquire(tokens)
+    return waited
+
+
+if __name__ == "__main__":
+    pass
@@ -0,0 +1,68 @@
+import codecs
+import logging
+
+_log = logging.getLogger(__name__)
+
+
+class RecvBuffer:
+    """
+    Buffer de réception d'un channel SSH.
+
+    La data recue est ajoutée dans un bytearray, seules les lignes
+    complètes sont décodées (en remplaçant les octets invalides au lieu de
+    raise) puis retirées du buffer, la mémoire reste donc constante quelle
+    que soit la taille de la sortie d'une commande.
+    """
+
+    def __init__(self):
+        """Instancie la classe 'RecvBuffer' avec un décodeur utf-8 incrémental."""
+        self._buf: bytearray = bytearray()
+        self._decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+
+    def feed(self, data: bytes) -> list[str]:
+        """
+        Cette fonction ajoute la data recue au buffer et retourne les
+        lignes complètes.
+
+        :param data: la data recue par le channel
+        :return: la liste des lignes complètes décodées, sans fin de ligne
+        """
+        self._buf += data
+        end = self._buf.rfind(b"\n")
+        if end < 0:
+            return []
+        with memoryview(self._buf) as view:
+            text = self._decoder.decode(view[: end + 1])
+        del self._buf[: end + 1]
+        return text.splitlines()
+
+    def tail(self) -> str:
+        """
+        Cette fonction retourne la ligne incomplète en attente (le prompt
+        du switch par exemple), sans la retirer du buffer.
+
+        :return: la ligne en attente décodée
+        """
+        return self._buf.decode("utf-8", errors="replace")
+
+    def discard_tail(self) -> None:
+        """
+        Cette fonction supprime la ligne incomplète en attente (utilisé
+        pour retirer un marqueur '--More--').
+
+        :return: None
+        """
+        self._buf.clear()
+
+    def clear(self) -> None:
+        """
+        Cette fonction vide le buffer et remet le décodeur a zéro.
+
+        :return: None
+        """
+        self._buf.clear()
+        self._decoder.reset()
+
+
+if __name__ == "__main__":
+    pass
@@ -0,0 +1,201 @@
+import logging
+import random
+from threading import Lock
+from time import monotonic, sleep
+from typing import Any, Callable, ClassVar, Optional
+
+from Unused_Port.errors import UPC_AUTH_ERROR, UPC_ERROR
+from Unused_Port.static import (
+    RETRY_BACKOFF,
+    RETRY_HOST_BUDGET,
+    RETRY_HOST_SECONDS,
+    RETRY_JITTER,
+    RETRY_MAX_DELAY,
+)
+
+_log = logging.getLogger(__name__)
+
+# Erreurs qui ne changeront pas en réessayant (ex : mauvais mot de passe)
+NON_RETRYABLE: tuple[type[Exception], ...] = (UPC_AUTH_ERROR,)
+
+
+class RetryBudget:
+    """
+    Budget de retries d'un host, partagé par toutes les methodes décorées
+    avec @retry (connexion, uptime, interfaces ...).
+
+    Le budget commence au premier retry de l'host et s'arrete après
+    'retries' retries ou 'seconds' secondes.
+    """
+
+    _instance: ClassVar[dict[str, "RetryBudget"]] = {}
+    _lock: ClassVar[Lock] = Lock()
+
+    def __init__(self, retries: int, seconds: float):
+        """
+        Instancie la classe 'RetryBudget'.
+
+        :param retries: le nombre max de retries de l'host
+        :param seconds: le temps max (s) de retries de l'host
+        """
+        self.retries: int = retries
+        self.deadline: float = monotonic() + seconds
+        self.lock: Lock = Lock()
+
+    @classmethod
+    def get(cls, host: str) -> "RetryBudget":
+        """
+        Cette fonction retourne le budget de l'host, crée au premier retry.
+
+        :param host: l'hostname / ip de l'host
+        :return: l'instance de RetryBudget
+        """
+        with cls._lock:
+            if not (budget := cls._instance.get(host)):
+                budget = cls(RETRY_HOST_BUDGET, RETRY_HOST_SECONDS)
+                cls._instance[host] = budget
+            return budget
+
+    @classmethod
+    def reset(cls, host: str) -> None:
+        """
+        Cette fonction supprime le budget de l'host, utilisé a la fin du
+        check de l'host (le prochain check a un nouveau budget).
+
+        :param host: l'hostname / ip de l'host
+        :return: None
+        """
+        with cls._lock:
+            cls._instance.pop(host, None)
+
+    def spend(self, delay: float) -> bool:
+        """
+        Cette fonction prend un retry du budget, si il en reste un et que le
+        délai avant le retry ne dépasse pas le temps restant.
+
+        :param delay: le délai (s) avant le retry
+        :return: True si le retry est autorisé, sinon False
+        """
+        with self.lock:
+            if self.retries <= 0 or monotonic() + delay > self.deadline:
+                return False
+            self.retries -= 1
+            return True
+
+
+class RetryStats:
+    """Compteurs des retries par fonction, pour voir ce qu'ils coutent."""
+
+    _stats: ClassVar[dict[str, list]] = {}
+    _lock: ClassVar[Lock] = Lock()
+
+    @classmethod
+    def add(cls, name: str, *, delay: float = 0.0, gave_up: bool = False) -> None:
+        """
+        Cette fonction compte un retry (ou un abandon) de la fonction 'name'.
+
+        :param name: le nom de la fonction décorée
+        :param delay: le délai (s) attendu avant le retry
+        :param gave_up: True si la fonction a abandonné (max / budget /
+            erreur non retryable)
+        :return: None
+        """
+        with cls._lock:
+            stats = cls._stats.setdefault(name, [0, 0.0, 0])
+            if gave_up:
+                stats[2] += 1
+            else:
+                stats[0] += 1
+                stats[1] += delay
+
+    @classmethod
+    def log(cls) -> None:
+        """
+        Cette fonction log les compteurs puis les remet a zéro (un log par
+        run, voir SSHWorker.start()).
+
+        :return: None
+        """
+        with cls._lock:
+            stats, cls._stats = cls._stats, {}
+        for name, (retries, delay, gave_up) in sorted(stats.items()):
+            _log.info(
+                f"Retry {name} : {retries} retries ({delay:.1f}s d'attente), "
+                f"{gave_up} abandons"
+            )
+
+
+def _backoff(delay: float, attempt: int, max_delay: float) -> float:
+    """
+    Cette fonction calcule le délai avant le retry 'attempt' : backoff
+    exponentiel, plafonné a 'max_delay', avec une part aléatoire (jitter)
+    pour que les threads ne réessayent pas tous en meme temps.
+
+    :param delay: le délai du premier retry
+    :param attempt: le numéro du retry (0 pour le premier)
+    :param max_delay: le délai max
+    :return: le délai en secondes
+    """
+    base = min(max_delay, delay * RETRY_BACKOFF**attempt)
+    return random.uniform(base * (1 - RETRY_JITTER), base)
+
+
+def retry(
+    max_retries,
+    delay=0.5,
+    *,
+    max_delay: float = RETRY_MAX_DELAY,
+    give_up_on: tuple[type[Exception], ...] = NON_RETRYABLE,
+) -> Callable:
+    """
+    Décorateur permettant de retry une fonction X fois, tant que celle çi
+    raise une erreur, sinon return son résultat.
+
+    Le délai augmente a chaque essai (backoff exponentiel + jitter), les
+    erreurs de 'give_up_on' ne sont pas réessayées, et pour les methodes
+    d'une connexion (args[0]._hostname) les retries sont pris sur le budget
+    de l'host (voir RetryBudget).
+
+    :param max_retries: Le nombre max d'essais avant de renvoyer
+        l'erreur
+    :param delay: le délai en seconde avant le premier retry
+    :param max_delay: le délai max en seconde entre deux essais
+    :param give_up_on: les erreurs a ne pas réessayer
+    :return: Le resultat de la fonction / sinon None
+    """
+
+    def decorator(func: Callable):
+        def wrapper(*args, **kwargs) -> Any:
+            result = None
+            host: Optional[str] = getattr(args[0], "_hostname", None) if args else None
+            for attempt in range(max_retries):
+                try:
+                    result = func(*args, **kwargs)
+                except give_up_on as e:
+                    _log.warning(f"{e}, pas de retry pour {func.__name__}({args})")
+                    RetryStats.add(func.__name__, gave_up=True)
+                    return None
+                except Exception as e:
+                    error = e if isinstance(e, UPC_ERROR) else e.__class__.__name__
+                    _log.warning(f"{error}, RETRYING {func.__name__}({args}, {kwargs})")
+                    if attempt == max_retries - 1:
+                        break
+                    wait = _backoff(delay, attempt, max_delay)
+                    if host and not RetryBudget.get(host).spend(wait):
+                        _log.warning(f"Budget de retry épuisé pour l'host {host}")
+                        break
+                    RetryStats.add(func.__name__, delay=wait)
+                    sleep(wait)
+                else:
+                    return result
+            _log.warning(f"Max Retry {func.__name__}({args}, {kwargs})")
+            RetryStats.add(func.__name__, gave_up=True)
+            return None
+
+        return wrapper
+
+    return decorator
+
+
+if __name__ == "__main__":
+    pass
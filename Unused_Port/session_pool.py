@@ -0,0 +1,166 @@
+import logging
+import os
+from threading import Lock, Thread
+from time import monotonic, sleep
+from typing import Optional
+
+from Unused_Port.static import (
+    SESSION_IDLE_TIMEOUT,
+    SESSION_KEEPALIVE,
+    SESSION_POOL_MAX,
+)
+
+_log = logging.getLogger(__name__)
+
+try:
+    from paramiko import SSHException, Transport
+except ImportError:
+    _log.warning("Installation de paramiko en cours ...")
+    os.system("pip install paramiko -q -q -q")
+    from paramiko import SSHException, Transport
+
+
+class SessionPool:
+    """
+    Pool de sessions SSH authentifiées.
+
+    Cette classe garde les transports paramiko des switchs deja checkés,
+    pour qu'un nouveau check du meme switch (meme compte) n'ait pas a
+    refaire l'échange de clés et le login. Les sessions gardées envoient un
+    keepalive, sont fermées après 'idle_timeout' secondes sans utilisation,
+    et leur nombre est limité a 'max_sessions'.
+    """
+
+    def __init__(
+        self,
+        max_sessions: int = SESSION_POOL_MAX,
+        *,
+        idle_timeout: float = SESSION_IDLE_TIMEOUT,
+        keepalive: int = SESSION_KEEPALIVE,
+    ):
+        """
+        Instancie la classe 'SessionPool'.
+
+        :param max_sessions: le nombre max de sessions gardées (0 = désactivé)
+        :param idle_timeout: le délai (s) avant de fermer une session inutilisée
+        :param keepalive: l'intervalle (s) des keepalives SSH
+        """
+        self.max_sessions: int = max_sessions
+        self.idle_timeout: float = idle_timeout
+        self.keepalive: int = keepalive
+        self._sessions: dict[tuple[str, str, str], tuple[Transport, float]] = {}
+        self.lock: Lock = Lock()
+        self._reaper: Optional[Thread] = None
+
+    def get(self, key: tuple[str, str, str]) -> Optional["Transport"]:
+        """
+        Cette fonction retire la session de 'key' de la pool, si elle est
+        encore utilisable.
+
+        :param key: (hostname, username, password)
+        :return: le transport authentifié, None si aucune session valide
+        """
+        with self.lock:
+            transport, _ = self._sessions.pop(key, (None, 0.0))
+        if transport is None:
+            return None
+        if not self._healthy(transport):
+            _log.debug(f"Session SSH de {key[0]} expirée, fermeture")
+            transport.close()
+            return None
+        _log.debug(f"Réutilisation de la session SSH de {key[0]}")
+        return transport
+
+    def put(self, key: tuple[str, str, str], transport: Optional["Transport"]) -> bool:
+        """
+        Cette fonction garde la session de 'key' dans la pool, la session la
+        plus ancienne est fermée si la pool est pleine.
+
+        :param key: (hostname, username, password)
+        :param transport: le transport authentifié
+        :return: True si la session est gardée, sinon False (l'appelant doit
+            la fermer)
+        """
+        if not self.max_sessions or not transport or not self._healthy(transport):
+            return False
+        transport.set_keepalive(self.keepalive)
+        evicted: list[Transport] = []
+        with self.lock:
+            if (old := self._sessions.pop(key, None)) and old[0] is not transport:
+                evicted.append(old[0])
+            self._sessions[key] = (transport, monotonic())
+            while len(self._sessions) > self.max_sessions:
+                oldest = next(iter(self._sessions))
+                evicted.append(self._sessions.pop(oldest)[0])
+            if not self._reaper:
+                self._reaper = Thread(target=self._reap, daemon=True)
+                self._reaper.start()
+        for old_transport in evicted:
+            old_transport.close()
+        return True
+
+    def evict(self, idle_timeout: Optional[float] = None) -> int:
+        """
+        Cette fonction ferme les sessions inutilisées depuis plus de
+        'idle_timeout' secondes.
+
+        :param idle_timeout: le délai (s), self.idle_timeout par défaut
+            (0 pour fermer toutes les sessions)
+        :return: le nombre de sessions fermées
+        """
+        if idle_timeout is None:
+            idle_timeout = self.idle_timeout
+        limit = monotonic() - idle_timeout
+        with self.lock:
+            expired = [
+                key for key, (_, last) in self._sessions.items() if last <= limit
+            ]
+            transports = [self._sessions.pop(key)[0] for key in expired]
+        for transport in transports:
+            transport.close()
+        if transports:
+            _log.debug(f"{len(transports)} sessions SSH inutilisées fermées")
+        return len(transports)
+
+    def close_all(self) -> None:
+        """
+        Cette fonction ferme toutes les sessions de la pool.
+
+        :return: None
+        """
+        self.evict(0)
+
+    def _reap(self) -> None:
+        """
+        Cette fonction est executée dans un thread daemon, elle ferme les
+        sessions inutilisées toutes les 'keepalive' secondes.
+
+        :return: None
+        """
+        while True:
+            sleep(max(1, self.keepalive))
+            self.evict()
+
+    @staticmethod
+    def _healthy(transport: "Transport") -> bool:
+        """
+        Cette fonction check si le transport est encore connecté et
+        authentifié, en envoyant un message SSH 'ignore' au switch.
+
+        :param transport: le transport paramiko
+        :return: True si la session est utilisable, sinon False
+        """
+        if not transport.is_active() or not transport.is_authenticated():
+            return False
+        try:
+            transport.send_ignore()
+        except (SSHException, OSError, EOFError):
+            return False
+        return True
+
+
+session_pool = SessionPool()
+
+
+if __name__ == "__main__":
+    pass
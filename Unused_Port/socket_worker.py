@@ -1,7 +1,17 @@
 import logging
 import socket
-from threading import Lock, Thread
-from typing import FrozenSet, Generator, Union
+from queue import Queue
+from threading import Lock
+from time import monotonic
+from typing import FrozenSet, Generator, Optional, Union
+
+from Unused_Port.banner import classify, is_dropped, peek_banner
+from Unused_Port.concurrency import AIMDController, Outcome
+from Unused_Port.executor import executor
+from Unused_Port.handoff import socket_handoff
+from Unused_Port.health import health_store
+from Unused_Port.ip_set import IPSet
+from Unused_Port.static import BANNER_CHECK, BANNER_TIMEOUT
 
 _log = logging.getLogger(__name__)
 
@@ -11,10 +21,22 @@ class SocketWorker:
     Threaded Socket Worker.
 
     Cette classe ouvre un socket avec tous les hosts d'une liste, sur le
-    port 22, pour verifier si celui ci est up
+    port 22, pour verifier si celui ci est up, dans les threads du pool
+    partagé (voir executor.py), le nombre de connexions en parallèle est
+    ajusté par un AIMDController (voir concurrency.py), et
+    classe l'host depuis sa bannière SSH (voir banner.py)
+
+    Si une Queue est donnée, chaque host valide y est ajouté des qu'il est
+    détecté (voir starter._run_pipeline()), la découverte attend quand la
+    queue est pleine.
     """
 
-    def __init__(self, l_hosts: Union[list, set, Generator, FrozenSet]):
+    def __init__(
+        self,
+        l_hosts: Union[list, set, Generator, FrozenSet, IPSet],
+        site=None,
+        queue: Optional[Queue] = None,
+    ):
         """
         Instancie la classe 'SocketWorker' et crée un generateur avec les.
 
@@ -22,16 +44,22 @@ class SocketWorker:
         threads.
 
         :param l_hosts: Une 'liste' d'une ou plusieurs ipv4
+        :param site: le site 'France', 'Paris' ...
+        :param queue: la Queue des workers SSH, optionnel
         """
         if not isinstance(l_hosts, Generator):
             l_hosts = self._create_gen(l_hosts)
 
         self._hosts: Generator = l_hosts
+        self._site = site
         self.lock: Lock = Lock()
-        self.threads: list[Thread] = []
         self.valid: list[str] = []
+        self.banners: dict[str, str] = {}
+        self.kinds: dict[str, str] = {}
+        self._queue: Optional[Queue] = queue
+        self.controller: AIMDController = AIMDController.get(site, "discovery")
 
-    def _create_gen(self, iterable: Union[list, set, FrozenSet]) -> Generator:
+    def _create_gen(self, iterable: Union[list, set, FrozenSet, IPSet]) -> Generator:
         """
         Cette fonction permet de crée le generateur d'ips, permettant une
         execution plus rapide pour un grand nombre d'ips comparé a une
@@ -57,26 +85,20 @@ class SocketWorker:
     def start(self) -> Union[bool, list]:
         """
         Point d'entrée pour chaque instance de classe 'SocketWorker', cette
-        fonction crée les threads et les lance.
+        fonction envoie chaque host au pool de threads partagé (voir
+        executor.py) et attend la fin.
 
         :return: une liste d'ips valides si aucune erreur
         """
         try:
             _log.info("Debut du check des ips")
-            for _i in range(0, 50):
-                t = Thread(target=self._check, args=())
-                self.threads.append(t)
-            for thread in self.threads:
-                thread.start()
-            for thread in self.threads:
-                thread.join()
-            alive_thread = []
-            for thread in self.threads:
-                if thread.is_alive():
-                    _log.debug(f"{thread} is alive")
-                    alive_thread.append(thread)
-            _log.debug(f"{alive_thread=}")
-            self.threads = alive_thread
+            executor.run(
+                self._check,
+                (str(host).strip() for host in self._hosts),
+                site=self._site,
+                controller=self.controller,
+                on_result=self._add_valid,
+            )
             _log.info("Check des ips fini")
             _log.info(f"{len(self.valid)} Hosts détectés")
             return self.valid
@@ -84,59 +106,72 @@ class SocketWorker:
             _log.error(e)
             return False
 
-    def _check(self) -> None:
+    def _check(self, host: str) -> tuple[str, Optional[float]]:
         """
-        Cette fonction est utilisé dans chaque thread, pour recuperer la
-        prochaine valeur du generateur crée préalablement, check si cet
-        host est 'up' puis ajoute l'host dans une liste d'hosts valides.
+        Cette fonction est executée dans un thread du pool pour chaque host,
+        elle check si l'host est 'up' et enregistre le résultat dans le store
+        de santé des hosts.
 
+        :param host: ipv4
+        :return: (le résultat, le temps de connexion (s)) pour le controller
+        """
+        latency = self._check_host(host)
+        if latency is None:
+            health_store.record(host, Outcome.DOWN)
+            return Outcome.DOWN, None
+        if is_dropped(self.kinds.get(host, "unknown")):
+            health_store.record(host, Outcome.NON_CISCO)
+        return Outcome.SUCCESS, latency
+
+    def _add_valid(self, host: str, result: tuple[str, Optional[float]]) -> None:
+        """
+        Cette fonction ajoute l'host up aux hosts valides, et a la Queue des
+        workers SSH si elle est donnée (attend si la queue est pleine, sans
+        bloquer les threads du pool).
+
+        :param host: ipv4
+        :param result: le résultat de _check()
         :return: None
         """
-        host = None
-        running = True
-        while running:
-            with self.lock:
-                try:
-                    if self._hosts:
-                        host = str(next(self._hosts)).strip()
-                except StopIteration:
-                    running = False
-                    host = None
-                except OSError as e:
-                    if e.winerror == 10056:  # socket deja connecté
-                        pass
-                except Exception as e:
-                    _log.error(e)
-
-            if host:
-                valid = self._check_host(host)
-
-                if not valid:
-                    continue
-
-                with self.lock:
-                    self.valid.append(host)
-
-    def _check_host(self, host: str) -> bool:
+        if result[0] != Outcome.SUCCESS or is_dropped(self.kinds.get(host, "unknown")):
+            return
+        with self.lock:
+            self.valid.append(host)
+        if self._queue is not None:
+            self._queue.put(host)
+
+    def _check_host(self, host: str) -> Optional[float]:
         """
         Cette fonction essaye de connecter le socket creé vers l'host
         donné, si un timeout ou une erreur ce produit, l'host est down,
         sinon il est up.
 
         :param host: ipv4
-        :return: True si l'host est up, sinon False
+        :return: le temps de connexion (s) si l'host est up, sinon None
         """
         try:
             s = self._get_new_socket()
             _log.debug(f"Essai de connexion vers l'host {host}.")
+            start = monotonic()
             s.connect((host, 22))
         except TimeoutError:
             _log.debug(f"Connexion vers l'host {host} timed out.")
-            return False
+            return None
         except Exception as e:
             _log.debug(f"Erreur lors de la connexion vers l'host {host}: {e}")
-            return False
+            return None
         else:
             _log.debug(f"Succes lors de la connexion vers l'host {host}.")
-            s.close()
-            return True
+            latency = monotonic() - start
+            if BANNER_CHECK:
+                s.settimeout(BANNER_TIMEOUT)
+                banner = peek_banner(s) or ""
+                self.banners[host] = banner
+                self.kinds[host] = classify(banner) if banner else "unknown"
+                if is_dropped(self.kinds[host]):
+                    _log.debug(f"Host {host} ignoré, équipement {self.kinds[host]}")
+                    s.close()
+                    return latency
+            if not socket_handoff.keep(host, s):
+                s.close()
+            return latency
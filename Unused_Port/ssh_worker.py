@@ -1,8 +1,16 @@
 import logging
-from threading import Lock, Thread
-
-from Unused_Port.helper import _exit, save_wb
+from queue import Queue
+from threading import Lock
+from typing import Optional, Union
+
+from Unused_Port.concurrency import AIMDController, Outcome
+from Unused_Port.errors import UPC_AUTH_ERROR, UPC_TIMEOUT_ERROR
+from Unused_Port.executor import executor
+from Unused_Port.health import health_store
+from Unused_Port.helper import _exit
+from Unused_Port.output import output_queue
 from Unused_Port.port_checker import UnusedPortChecker
+from Unused_Port.retry import RetryStats
 
 _log = logging.getLogger(__name__)
 
@@ -23,14 +31,19 @@ def _check(**kwargs) -> UnusedPortChecker:
 
 class SSHWorker:
     """
-    Threaded SSH Worker, cette classe utilise les threads pour instancier
-    simultanément 'Unused Port Checker' avec des ips différentes, et s'occupe
-    de crée l'excel si l'host est valide.
+    Threaded SSH Worker, cette classe utilise les threads du pool partagé
+    (voir executor.py) pour instancier simultanément 'Unused Port Checker'
+    avec des ips différentes, et s'occupe de crée l'excel si l'host est
+    valide. Le nombre de sessions SSH en parallèle est ajusté par un
+    AIMDController (voir concurrency.py).
+
+    Les ips sont une liste, ou une Queue remplie par la découverte en meme
+    temps (voir starter._run_pipeline()), terminée par None.
     """
 
     def __init__(
         self,
-        ip_l: list[str],
+        ip_l: Union[list[str], Queue],
         *,
         username: str,
         password: str,
@@ -40,85 +53,87 @@ class SSHWorker:
         """
         Instancie la classe 'SSHWorker' et crée une Lock pour les threads.
 
-        :param ip_l: une liste d'ip
+        :param ip_l: une liste d'ip, ou une Queue d'ips terminée par None
         :param username: l'username du compte
         :param password: le password du compte
         :param stdout: la sortie voulu 'excel', 'console', 'txt'
         :param site: le site 'France', 'Paris' ...
         """
-        self._ip_l: list[str] = ip_l
+        self._ip_l: Union[list[str], Queue] = ip_l
         self._username: str = username
         self._password: str = password
         self._stdout: str = stdout
         self._site = site
         self.lock: Lock = Lock()
-        self.threads: list[Thread] = []
+        self.controller: AIMDController = AIMDController.get(site, "ssh")
 
     def start(self) -> None:
         """
-        Point d'entrée pour les instances de cette classe, crée les threads
-        et les starts.
+        Point d'entrée pour les instances de cette classe, envoie chaque ip
+        au pool de threads partagé (_validate_host(ip)) et attend la fin.
 
         :return: None
         """
         try:
-            _log.info("Debut du processus, generation des workers SSH")
-            for _i in range(0, 50):
-                t = Thread(target=self._start, args=())
-                self.threads.append(t)
-            for thread in self.threads:
-                thread.start()
-            for thread in self.threads:
-                thread.join()
-            alive_thread = []
-            for thread in self.threads:
-                if thread.is_alive():
-                    _log.debug(f"{thread} is alive")
-                    alive_thread.append(thread)
-            _log.debug(f"{alive_thread=}")
-            self.threads = alive_thread
+            _log.info("Debut du processus, envoi des ips aux workers SSH")
+            executor.run(
+                self._validate_host,
+                iter(self._next_ip, None),
+                site=self._site,
+                controller=self.controller,
+            )
+            RetryStats.log()
         except Exception as e:
             _exit(e)
 
-    def _start(self) -> None:
+    def _next_ip(self) -> Optional[str]:
         """
-        Pour chaque ip dans self._ip_l, cette fonction va recuperer la
-        premiere valeur de la liste (une ip) et va appeler la fonction
-        _validate_ip(ip).
+        Cette fonction récupère la prochaine ip de la liste, ou attend la
+        prochaine ip de la Queue.
 
-        :return: None
+        :return: l'ip, None si il n'y a plus d'ips
+        """
+        if isinstance(self._ip_l, Queue):
+            return self._ip_l.get()
+        with self.lock:
+            return self._ip_l.pop() if self._ip_l else None
+
+    def _validate_host(self, ip: str) -> tuple[str, Optional[float]]:
+        """
+        Cette fonction appelle _validate(ip), classe le résultat (voir
+        concurrency.Outcome) et l'enregistre dans le store de santé des hosts.
+
+        :param ip: une ipv4
+        :return: (le résultat, le temps de connexion SSH (s))
         """
-        ip = None
-        running = True
-        while running:
-            with self.lock:
-                try:
-                    if self._ip_l:
-                        ip = self._ip_l.pop()
-                    else:
-                        running = False
-                        ip = None
-                except Exception as e:
-                    _log.error(e)
-
-            if ip:
-                try:
-                    self._validate(ip)
-                except Exception as e:
-                    _log.error(e)
-
-    def _validate(self, ip: str) -> None:
+        outcome, latency = Outcome.ERROR, None
+        try:
+            upc = self._validate(ip)
+            latency = upc.latency
+            outcome = Outcome.NON_CISCO if upc.non_cisco else Outcome.SUCCESS
+        except UPC_AUTH_ERROR as e:
+            outcome = Outcome.AUTH
+            _log.error(e)
+        except UPC_TIMEOUT_ERROR as e:
+            outcome = Outcome.TIMEOUT
+            _log.error(e)
+        except Exception as e:
+            _log.error(e)
+        health_store.record(ip, None if outcome == Outcome.SUCCESS else outcome)
+        return outcome, latency
+
+    def _validate(self, ip: str) -> UnusedPortChecker:
         """
         Cette fonction est utilisée pour valider une ip, elle prend une ipv4
         en parametre, crée recupere une instance d'upc avec la fonction
         _check(), verifie que upc.valid est True (ce qui signifie qu'une sortie
-        standard est disponible) puis genere le fichier excel en supprimant la
-        premiere page de l'excel (c'est une page non nécessaire, uniquement la
-        pour que l'excel soit généré avec forcement une page).
+        standard est disponible) puis genere le fichier excel (workbook
+        'write_only', sans page par défaut), enregistré en arrière plan
+        (voir output.py).
 
         Cette fonction ensuite stop l'instance de classe avec upc.stop()
         :param ip: une ipv4
-        :return: None
+        :return: l'instance d'upc
         """
         _log.debug(f"SSHWorker check l'ip {ip}")
         self.hostname = ip
@@ -127,21 +142,24 @@ class SSHWorker:
             username=self._username,
             password=self._password,
             stdout=self._stdout,
+            site=self._site,
         )
         if upc.valid:
+            upc.export(self._site)
             wb = upc.get_stdout()
             if wb:
-                del wb[wb.sheetnames[0]]
                 if wb.worksheets:
-                    save_wb(wb, site=self._site, hostname=upc.real_hostname or ip)
+                    output_queue.put(
+                        wb, site=self._site, hostname=upc.real_hostname or ip
+                    )
                 else:
                     _log.warning(
-                        f"Attention, l'excel est vide pour la liste "
-                        f"d'ip(s) : {self._ip_l} "
-                        f"(sans doute que les/l' ip(s) données ont toutes un uptime "
-                        f"inférieur a 3 mois / Equipement non Cisco),"
+                        f"Attention, l'excel est vide pour l'ip {ip} "
+                        f"(sans doute un uptime inférieur a 3 mois / "
+                        f"Equipement non Cisco), "
                         f"aucun enregistrement sera effectué"
                     )
+        return upc
 
 
 if __name__ == "__main__":
@@ -1,20 +1,42 @@
 import logging
 import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from queue import Queue
+from threading import Thread
 from time import sleep
-from typing import FrozenSet, Generator, Union
+from typing import FrozenSet, Generator, Optional, Union
 
+from Unused_Port.async_worker import AsyncWorker
+from Unused_Port.banner import filter_host_keys
+from Unused_Port.export import exporter
+from Unused_Port.handoff import socket_handoff
+from Unused_Port.health import health_store
+from Unused_Port.inventory import inventory
+from Unused_Port.ip_set import IPSet
+from Unused_Port.output import output_queue
+from Unused_Port.process_runner import start_processes
 from Unused_Port.secrets import password, username
 from Unused_Port.socket_worker import SocketWorker
 from Unused_Port.ssh_worker import SSHWorker
+from Unused_Port.static import (
+    BANNER_HOST_KEY,
+    DISCOVERY,
+    ENGINE,
+    PIPELINE,
+    PIPELINE_QUEUE_SIZE,
+    WORKERS,
+)
+from Unused_Port.sweep import Sweep
 
 _log = logging.getLogger(__name__)
 
 
-def start_ssh_worker(ip: list[str], site=None):
+def start_ssh_worker(ip: Union[list[str], Queue], site=None):
     """
     Cette fonction lance la classe SSHWorker.
 
-    :param ip: liste d'une ou plusieurs ips
+    :param ip: liste d'une ou plusieurs ips, ou une Queue d'ips terminée par
+        None (voir _run_pipeline())
     :param site: le site ('France' / 'US' ...)
     si il est fournis ( arg --auto utilisé)
     :return: None
@@ -23,7 +45,31 @@ def start_ssh_worker(ip: list[str], site=None):
     worker.start()
 
 
-def start(ip: Union[str, dict[str, FrozenSet], FrozenSet], exit=True, site=None):
+def start_async_worker(
+    ip: Union[list, set, Generator, FrozenSet, IPSet, str], site=None
+) -> list[str]:
+    """
+    Cette fonction lance la classe AsyncWorker (découverte et SSH dans une
+    meme boucle asyncio).
+
+    :param ip: liste d'une ou plusieurs ips
+    :param site: le site ('France' / 'US' ...)
+    si il est fournis ( arg --auto utilisé)
+    :return: la liste des ips valides
+    """
+    if isinstance(ip, str):
+        ip = [ip]
+    worker = AsyncWorker(ip, username=username, password=password, site=site)
+    return worker.start()
+
+
+def start(
+    ip: Union[str, dict[str, IPSet], IPSet],
+    exit=True,
+    site=None,
+    engine: str = ENGINE,
+    workers: int = WORKERS,
+) -> list[str]:
     """
     Cette fonction est utilisée plusieurs fois si le --schedule est activé,.
 
@@ -32,51 +78,211 @@ def start(ip: Union[str, dict[str, FrozenSet], FrozenSet], exit=True, site=None)
     quelqu'un a supprimer les dossiers sur le commun, le script les recréera).
     Il check si 'ip' est un dictionnaire, ce qui signifie qu'il faut l'unpack
     (site: list[ip]), puis utilise la récursion avec la liste d'ip unpack du
-    dictionnaire. Il valide ensuite les ips, recupère seulement celles qui sont
-    valides, puis lance le main. Si aucune ip n'est valide, le script est exit.
+    dictionnaire, les sites tournant en meme temps (voir _run_sites()). Il
+    valide ensuite les ips, recupère seulement celles qui sont valides, puis
+    lance le main. Si aucune ip n'est valide, le script est exit.
+    Les hosts connus joignables (voir inventory.py) sont testés en premier,
+    les hosts en échec répété (voir health.py) sont ignorés ou testés en
+    dernier, sauf si une seule ip est donnée. Si l'export est activé, toutes
+    les interfaces du run sont exportées dans un seul fichier (voir
+    export.py).
 
     :param ip: Un dictionnaire avec le site et l'ip a unpack, ou une liste d'une
     ou plusieurs ips contenu dans un Generator/ liste/ set, ou une ip seule
     :param exit: Si le script doit exit, False si --schedule, sinon True
     :param site: 'France' ... non obligatoire si la personne utilise pas --auto
-    :return: None
+    :param engine: 'thread' ou 'asyncio', voir static.ENGINES
+    :param workers: le nombre de process, si > 1 les ips sont réparties sur
+    plusieurs process (voir process_runner.py)
+    :return: la liste des ips valides
+    """
+    exporting = exporter.begin()
+    health_store.begin()
+    try:
+        return _start(ip, exit, site, engine, workers)
+    finally:
+        health_store.end()
+        if exporting:
+            exporter.end()
+
+
+def _start(
+    ip: Union[str, dict[str, IPSet], IPSet],
+    exit: bool,
+    site,
+    engine: str,
+    workers: int,
+) -> list[str]:
+    """
+    Cette fonction lance le run, voir start().
+
+    :param ip: voir start()
+    :param exit: voir start()
+    :param site: voir start()
+    :param engine: voir start()
+    :param workers: voir start()
+    :return: la liste des ips valides
     """
+    if workers > 1 and not isinstance(ip, str):
+        valid = start_processes(ip, workers, engine=engine)
+        if exit and not valid:
+            _exit("Exit aucun host valide")
+        return valid
     if isinstance(ip, dict):
-        for site, ips in ip.items():
-            start(ips, exit, site)
-        return
+        valid = _run_sites(ip, engine)
+    elif isinstance(ip, str):
+        valid = _run(ip, site, engine)
+    else:
+        valid = _run_inventory(ip, site, engine)
+
+    if exit and not valid:
+        _exit("Exit aucun host valide")
+    return valid
+
+
+def _run_sites(ip: dict[str, IPSet], engine: str = ENGINE) -> list[str]:
+    """
+    Cette fonction lance start() sur chaque site en meme temps, un thread
+    par site qui envoie ses hosts au pool de threads partagé (voir
+    executor.py), chaque site ayant sa part des threads du pool.
+
+    :param ip: un dictionnaire {site: ips}
+    :param engine: 'thread' ou 'asyncio', voir static.ENGINES
+    :return: la liste des ips valides de tous les sites
+    """
+    valid: list[str] = []
+    with ThreadPoolExecutor(max_workers=len(ip), thread_name_prefix="site") as sites:
+        futures = {
+            sites.submit(start, ips, False, site, engine): site
+            for site, ips in ip.items()
+        }
+        for future in as_completed(futures):
+            try:
+                valid += future.result()
+            except Exception as e:
+                _log.error(f"Erreur sur le site {futures[future]} : {e}")
+    return valid
+
+
+def _run_inventory(
+    ip: Union[list, set, Generator, FrozenSet, IPSet], site=None, engine: str = ENGINE
+) -> list[str]:
+    """
+    Cette fonction lance _run() sur les hosts connus joignables, puis sur le
+    reste des ips si le balayage complet du site est du (voir inventory.py),
+    les hosts en échec répété (voir health.py) sont ignorés / testés en
+    dernier.
+
+    :param ip: une liste d'ips contenu dans un Generator/ liste/ set
+    :param site: 'France' ... non obligatoire si la personne utilise pas --auto
+    :param engine: 'thread' ou 'asyncio', voir static.ENGINES
+    :return: la liste des ips valides
+    """
+    known, rest = inventory.split(ip, site)
+    valid = _run(health_store.filter(known), site, engine) if known else []
+    if rest is not None:
+        valid += _run(health_store.filter(rest), site, engine)
+    inventory.update(valid, site, full=rest is not None)
+    inventory.save()
+    return valid
+
+
+def _run(
+    ip: Union[list, set, Generator, FrozenSet, IPSet, str],
+    site=None,
+    engine: str = ENGINE,
+) -> list[str]:
+    """
+    Cette fonction valide les ips puis lance les workers SSH sur les ips
+    valides (ou le worker asyncio qui fait les deux), en meme temps si
+    static.PIPELINE (voir _run_pipeline()).
+
+    :param ip: une liste d'ips contenu dans un Generator/ liste/ set, ou une
+    ip seule
+    :param site: 'France' ... non obligatoire si la personne utilise pas --auto
+    :param engine: 'thread' ou 'asyncio', voir static.ENGINES
+    :return: la liste des ips valides
+    """
+    if engine == "asyncio":
+        valid = start_async_worker(ip, site)
+        output_queue.flush()
+        return valid
     _log.info(
         "Validation de(s) ip(s) donnée(s) {}...".format(
             f"pour le site {site}" if site else ""
         )
     )
-    valid = validate_ip(ip)
+    if PIPELINE and not BANNER_HOST_KEY:
+        valid = _run_pipeline(ip, site)
+    else:
+        valid = validate_ip(ip, site) or []
+        if valid:
+            _log.debug(f"Les ips valides sont {valid}, start du Worker SSH sur ces ips")
+            start_ssh_worker(list(valid), site)
+    socket_handoff.close_all(valid)
+    output_queue.flush()
 
     if not valid:
         _log.error("Host not available ... Exiting")
+    return valid
 
-    if exit and not valid:
-        _exit("Exit aucun host valide")
 
-    _log.debug(f"Les ips valides sont {valid}, start du Worker SSH sur ces ips")
-    start_ssh_worker(valid, site)  # type: ignore
+def _run_pipeline(
+    ip: Union[list, set, Generator, FrozenSet, IPSet, str], site=None
+) -> list[str]:
+    """
+    Cette fonction lance la découverte et les workers SSH en meme temps :
+    chaque host valide est donné aux workers SSH via une Queue bornée
+    (static.PIPELINE_QUEUE_SIZE), la découverte attend quand la queue est
+    pleine au lieu de prendre de l'avance sur les workers SSH.
 
+    :param ip: une liste d'ips contenu dans un Generator/ liste/ set, ou une
+    ip seule
+    :param site: 'France' ... non obligatoire si la personne utilise pas --auto
+    :return: la liste des ips valides
+    """
+    queue: Queue = Queue(maxsize=PIPELINE_QUEUE_SIZE)
+    ssh = Thread(target=start_ssh_worker, args=(queue, site), name="ssh-pipeline")
+    ssh.start()
+    try:
+        valid = validate_ip(ip, site, queue) or []
+    finally:
+        queue.put(None)  # fin de la découverte
+        ssh.join()
+    return valid
 
-def validate_ip(ip: Union[list, set, Generator, FrozenSet, str]) -> Union[bool, list]:
+
+def validate_ip(
+    ip: Union[list, set, Generator, FrozenSet, IPSet, str],
+    site=None,
+    queue: Optional[Queue] = None,
+) -> Union[bool, list]:
     """
-    Cette fonction crée une instance de la classe SockerWorker avec une.
+    Cette fonction crée une instance de la classe Sweep (ou SockerWorker si
+    static.DISCOVERY vaut "thread") avec une.
 
-    liste d'ip en arguments, et lance la classe avec worker.start.
+    liste d'ip en arguments, et lance la classe avec worker.start. Les hosts
+    classés dans static.BANNER_DROP par leur bannière SSH (et leur type de
+    clé d'host si static.BANNER_HOST_KEY) ne sont pas gardés.
 
     :param ip: une ip seule / une liste d'ip dans une structure parmis
         'list , set, Generator et Frozenset'
+    :param site: le site ('France' / 'US' ...), pour la concurrence du site
+    :param queue: la Queue des workers SSH, chaque host valide y est ajouté
+        des qu'il est détecté (voir _run_pipeline())
     :return: False si l(es) ip(s) est(sont) invalide(s), sinon la liste
         de(s) ip(s) valide(s)
     """
     if isinstance(ip, str):
         ip = [ip]
-    worker = SocketWorker(ip)
-    return worker.start()
+    if DISCOVERY == "sweep":
+        worker = Sweep(ip, queue=queue)
+    else:
+        worker = SocketWorker(ip, site, queue)
+    valid = worker.start()
+    if valid and BANNER_HOST_KEY:
+        return filter_host_keys(valid, worker.banners, site)
+    return valid
 
 
 def _exit(e):
@@ -1,40 +1,9 @@
 import os
-from ipaddress import IPv4Address, ip_network
+from ipaddress import ip_network
 from pathlib import Path
-from typing import ClassVar, FrozenSet, LiteralString, Union
-
-
-def ip_split(ip: str) -> list[str]:
-    """
-    Cette fonction prend une range d'ip (192.168.1.1-192.168.1.254) et renvoie la liste
-    d'ips.
-
-    contenu dans la range [192.168.1.1,192.168.1.2,...,192.168.1.254]
-    :param ip: Une range d'ip (192.168.1.1-192.168.1.254)
-    :return: liste d'ips
-    """
-    start_ip, end_ip = ip.split("-")
-    start = IPv4Address(start_ip)
-    end = IPv4Address(end_ip)
-    return [str(IPv4Address(ip)) for ip in range(int(start), int(end) + 1)]
-
-
-def get_ip(ips: list):
-    """
-    Recupere toutes les ips d'une listes, et les combinent dans une seule
-    liste, les ranges d'ips défaites.
-
-    :param ips: une liste d'ips
-    :return: une liste d'ips
-    """
-    result = []
-    for ip in ips:
-        if "-" in ip:
-            result += ip_split(ip)
-        else:
-            result.append(ip)
-    return result
+from typing import ClassVar, LiteralString, Optional, Union
 
+from Unused_Port.ip_set import IPSet
 
 ADMIN_NETWORK: tuple = (ip_network("192.168.1.0/24"),)
 
@@ -42,19 +11,12 @@ EXCLUDE_IP_TEMP: list = [
     "192.168.1.1-192.168.1.10",
 ]
 
-EXCLUDE_IP: list = get_ip(EXCLUDE_IP_TEMP)
-
-HOSTS: dict[str, FrozenSet] = {
-    "France": frozenset(
-        host
-        for host in ip_network("192.168.1.0/24").hosts()
-        if str(host) not in EXCLUDE_IP
-    ),
-    "US": frozenset(
-        host
-        for host in ip_network("192.168.100.0/24").hosts()
-        if str(host) not in EXCLUDE_IP
-    ),
+EXCLUDE_IP: IPSet = IPSet(EXCLUDE_IP_TEMP)
+
+# intervalles d'ips (voir ip_set.py), les ips sont générées a la demande
+HOSTS: dict[str, IPSet] = {
+    "France": IPSet(["192.168.1.0/24"], hosts=True) - EXCLUDE_IP,
+    "US": IPSet(["192.168.100.0/24"], hosts=True) - EXCLUDE_IP,
 }
 
 DOSSIER_PARTAGE_SITE: dict[str, list[Path]] = {
@@ -67,6 +29,146 @@ DOSSIER_PARTAGE_SITE: dict[str, list[Path]] = {
 
 UPTIME_MIN_WEEK: int = 12
 
+# Récupère le last input de toutes les interfaces avec un seul 'sh interfaces'
+BULK_LAST_INPUT: bool = True
+
+# Délais max (secondes) sans data recue avant le prompt du switch, une longue
+# sortie qui arrive encore n'est coupée qu'après EXEC_MAX_TIMEOUT secondes
+PROMPT_TIMEOUT: int = 10
+EXEC_TIMEOUT: int = 30
+EXEC_MAX_TIMEOUT: int = 300
+
+# Nombre de channels 'exec' ouverts en parallèle pour les 'sh int X' (1 = shell)
+EXEC_CHANNELS: int = 4
+
+# Nombre de 'sh int X' envoyés d'un coup dans le shell si pas de channels exec
+PIPELINE_BATCH: int = 20
+
+# Moteur de collecte par défaut : "thread" (SocketWorker / SSHWorker) ou "asyncio"
+ENGINES: tuple = ("thread", "asyncio")
+ENGINE: str = "thread"
+ASYNC_DISCOVERY_LIMIT: int = 1000  # connexions de découverte en parallèle
+ASYNC_SSH_LIMIT: int = 200  # sessions SSH en parallèle
+
+# Découverte des hosts (port 22) : "sweep" (sockets non bloquants, un seul
+# thread, voir sweep.py) ou "thread" (SocketWorker)
+DISCOVERY_ENGINES: tuple = ("sweep", "thread")
+DISCOVERY: str = "sweep"
+SWEEP_MAX_FDS: int = 4000  # connexions en cours max (500 max sous windows)
+SWEEP_TIMEOUT: float = 1.0  # timeout max d'un host
+SWEEP_MIN_TIMEOUT: float = 0.2  # timeout min d'un host, calculé depuis le RTT
+SWEEP_RETRIES: int = 1  # nouveaux essais (timeout doublé) avant de déclarer down
+
+# Classement des hosts par leur bannière SSH lors de la découverte (voir
+# banner.py), les types de BANNER_DROP sont ignorés avant le login SSH.
+# Les règles (regex, type) sont testées sur "bannière [type de clé d'host]",
+# la premiere qui match gagne, sinon le type est 'unknown' (gardé)
+BANNER_CHECK: bool = True
+BANNER_TIMEOUT: float = 2.0  # délai max pour recevoir la bannière
+BANNER_HOST_KEY: bool = False  # récupère aussi le type de clé (1 connexion de plus)
+BANNER_RULES: list[tuple[str, str]] = [
+    (r"^SSH-[\d.]+-Cisco", "cisco_ios"),
+    (r"PaloAltoNetworks", "panos"),
+    (r"OpenSSH.*\b(Ubuntu|Debian|Raspbian|RHEL|CentOS|FreeBSD)\b", "linux"),
+    (r"^SSH-[\d.]+-OpenSSH", "openssh"),  # NX-OS, Linux non identifié ...
+]
+BANNER_DROP: tuple = ("panos", "linux")
+
+# Le socket ouvert lors de la découverte est gardé et donné a paramiko pour la
+# connexion SSH (un seul handshake TCP), si il a moins de HANDOFF_MAX_AGE s
+REUSE_DISCOVERY: bool = True
+HANDOFF_MAX_SOCKETS: int = 500
+HANDOFF_MAX_AGE: float = 30.0
+
+# La découverte et les workers SSH tournent en meme temps : chaque host valide
+# est donné aux workers SSH via une queue bornée, la découverte attend quand
+# la queue est pleine (désactivé si BANNER_HOST_KEY)
+PIPELINE: bool = True
+PIPELINE_QUEUE_SIZE: int = 100
+
+# Pool de threads partagé par tous les sites et tous les runs (voir
+# executor.py), chaque site actif a une part égale des threads
+EXECUTOR_MAX_WORKERS: int = 300
+EXECUTOR_IDLE_TIMEOUT: float = 60.0  # arret d'un thread sans tache (s)
+
+# Les excels sont enregistrés en arrière plan (voir output.py), les workers
+# SSH attendent seulement si OUTPUT_QUEUE_SIZE excels sont en attente
+OUTPUT_QUEUE_SIZE: int = 100
+
+# Export de toutes les interfaces du run dans un seul fichier (voir export.py),
+# None pour désactiver, 'parquet' nécessite pyarrow (sinon csv)
+EXPORT_FORMATS: tuple = ("csv", "jsonl", "parquet")
+EXPORT: Optional[str] = None
+EXPORT_ROW_GROUP: int = 10000  # lignes par row group parquet
+
+# Concurrence adaptative (AIMD) des workers, 'ceiling' = max d'hosts en parallèle
+CONCURRENCY: dict[str, dict] = {
+    "discovery": {"ceiling": 200, "floor": 10, "target_latency": 0.5},
+    "ssh": {"ceiling": 50, "floor": 2, "target_latency": 5.0},
+}
+
+# Limites par site, remplacent celles de CONCURRENCY (ex : sites WAN)
+SITE_CONCURRENCY: dict[str, dict[str, dict]] = {
+    "US": {"ssh": {"ceiling": 20}},
+}
+
+# Token buckets (jetons/s 'rate', max 'burst') des logins SSH et des commandes,
+# par site (None = sites non listés / sans --auto)
+RATE_LIMITS: dict[Optional[str], dict[str, dict]] = {
+    None: {
+        "login": {"rate": 5, "burst": 10},
+        "command": {"rate": 50, "burst": 100},
+    },
+    "US": {"login": {"rate": 2, "burst": 5}},
+}
+
+# Domaine AAA (serveurs TACACS+) de chaque site, partagé entre les sites
+AAA_DOMAINS: dict[str, str] = {
+    "France": "tacacs-eu",
+    "US": "tacacs-us",
+}
+
+# Token buckets par domaine AAA, en plus de ceux du site
+AAA_RATE_LIMITS: dict[str, dict[str, dict]] = {
+    "tacacs-eu": {"login": {"rate": 5, "burst": 10}},
+    "tacacs-us": {"login": {"rate": 3, "burst": 5}},
+}
+
+# Pool de sessions SSH authentifiées, réutilisées par les checks suivants du
+# meme switch (0 = désactivé), seulement en mode --interactive
+SESSION_POOL_MAX: int = 0
+SESSION_POOL_INTERACTIVE: int = 20
+SESSION_IDLE_TIMEOUT: int = 600  # secondes sans utilisation avant fermeture
+SESSION_KEEPALIVE: int = 30  # intervalle des keepalives SSH
+
+# Retries (@retry) : backoff exponentiel plafonné, avec jitter (part aléatoire)
+RETRY_BACKOFF: float = 2.0
+RETRY_MAX_DELAY: float = 10.0
+RETRY_JITTER: float = 0.5
+# Budget de retries par host, partagé par toutes les methodes d'un check
+RETRY_HOST_BUDGET: int = 10
+RETRY_HOST_SECONDS: float = 60.0
+
+# Inventaire des hosts joignables (voir inventory.py) : les hosts vus depuis
+# moins de INVENTORY_TTL jours sont testés en premier, le reste des ips n'est
+# balayé que tous les INVENTORY_FULL_SWEEP jours
+INVENTORY_TTL: int = 60
+INVENTORY_FULL_SWEEP: int = 28
+
+# Circuit breaker des hosts (voir health.py) : après HEALTH_THRESHOLD échecs
+# consécutifs, l'host est ignoré HEALTH_COOLDOWN jours selon la classe d'échec
+HEALTH_THRESHOLD: int = 3
+HEALTH_COOLDOWN: dict[str, int] = {
+    "down": 14,
+    "timeout": 14,
+    "auth": 7,
+    "non_cisco": 90,
+    "error": 7,
+}
+
+# Nombre de process entre lesquels les ips sont réparties (1 = un seul process)
+WORKERS: int = 1
+
 DAYS: dict = {
     "monday": "lundi",
     "tuesday": "mardi",
@@ -80,7 +182,7 @@ DAYS: dict = {
 INV_DAYS: dict = {k: v for v, k in DAYS.items()}
 
 FULL_PATH = os.path.join(os.environ["ALLUSERSPROFILE"], "Unused_Port")
-_DIRS = ["txt_output", "excel_output", "local_save", "logs"]
+_DIRS = ["txt_output", "excel_output", "local_save", "logs", "state", "export"]
 
 
 class DIRS:
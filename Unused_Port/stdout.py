@@ -30,19 +30,27 @@ class Stdout:
         _output: list[tuple[str, str]],
         *,
         _hostname: str,
-        _workbook: Workbook,
+        _workbook: Optional[Workbook] = None,
         _uptime: str,
     ) -> Union["Workbook", str]:
         """
         Cette fonction est utilisée pour crée l'excel.
 
+        Si aucun workbook n'est donné, un workbook 'write_only' est crée : les
+        lignes sont écrites au fur et a mesure sur le disque au lieu d'etre
+        gardées en mémoire, et il ne contient pas de page par défaut. Il ne
+        peut etre enregistré qu'une seule fois (voir helper.save_wb()).
+
         :param _output: Une liste de tuples(interface, last input), ex
             [(gi1/0/2, 12w), (gi1/0/3, never)]
         :param _hostname: l'hostname du switch et non son ip
         :param _workbook: le workbook où il faut ajouter la page excel
+            (ex : un excel pour tous les switchs), optionnel
         :param _uptime: l'uptime du switch
         :return: str() si erreur sinon l'objet 'Workbook' rempli
         """
+        if _workbook is None:
+            _workbook = Workbook(write_only=True)
         ws = _workbook.create_sheet(_hostname)
         ws.append(("UP TIME", _uptime))
         if _output:
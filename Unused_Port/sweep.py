@@ -0,0 +1,377 @@
+import errno
+import heapq
+import itertools
+import logging
+import selectors
+import socket
+import sys
+from collections import deque
+from queue import Full, Queue
+from time import monotonic
+from typing import FrozenSet, Generator, Iterator, Optional, Union
+
+from Unused_Port.banner import classify, is_dropped, peek_banner
+from Unused_Port.concurrency import Outcome
+from Unused_Port.handoff import socket_handoff
+from Unused_Port.health import health_store
+from Unused_Port.ip_set import IPSet
+from Unused_Port.static import (
+    BANNER_CHECK,
+    BANNER_TIMEOUT,
+    SWEEP_MAX_FDS,
+    SWEEP_MIN_TIMEOUT,
+    SWEEP_RETRIES,
+    SWEEP_TIMEOUT,
+)
+
+_log = logging.getLogger(__name__)
+
+# connect() non bloquant en cours (linux / windows)
+_IN_PROGRESS = {errno.EINPROGRESS, errno.EWOULDBLOCK, errno.EALREADY, 10035}
+
+
+def _fd_limit(limit: int) -> int:
+    """
+    Cette fonction borne le nombre de sockets ouverts en meme temps : 500
+    sous windows (select() limité a 512 sockets), sinon la limite de fichiers
+    ouverts du process moins une marge et les sockets gardés pour le SSH.
+
+    :param limit: la limite voulue
+    :return: la limite utilisable
+    """
+    if sys.platform == "win32":
+        return min(limit, 500)
+    try:
+        import resource
+
+        soft, _ = resource.getrlimit(resource.RLIMIT_NOFILE)
+    except (ImportError, OSError, ValueError):
+        return limit
+    if soft == resource.RLIM_INFINITY:
+        return limit
+    kept = socket_handoff.max_sockets if socket_handoff.enabled else 0
+    return max(1, min(limit, soft - 64 - kept))
+
+
+class Sweep:
+    """
+    Non-blocking Socket Sweep.
+
+    Cette classe check si le port 22 des hosts est ouvert, comme SocketWorker,
+    mais avec des sockets non bloquants dans un seul thread (selectors) :
+    des milliers de connexions sont en cours en meme temps, chacune avec sa
+    propre deadline.
+
+    Le timeout de chaque host est calculé depuis le RTT des hosts deja
+    répondus (comme TCP), entre 'min_timeout' et 'timeout'. Un SYN perdu
+    n'est pas définitif : l'host est réessayé 'retries' fois avec un
+    timeout doublé a chaque essai avant d'etre déclaré down.
+
+    Une fois connecté, la bannière SSH de l'host est lue (voir banner.py),
+    les équipements qui ne peuvent pas produire de rapport (PAN-OS, Linux
+    ...) ne sont pas gardés.
+
+    Si une Queue est donnée, chaque host valide y est ajouté des qu'il est
+    détecté (voir starter._run_pipeline()), aucune nouvelle connexion n'est
+    lancée tant que la queue est pleine.
+    """
+
+    def __init__(
+        self,
+        l_hosts: Union[list, set, Generator, FrozenSet, IPSet],
+        *,
+        max_in_flight: int = SWEEP_MAX_FDS,
+        timeout: float = SWEEP_TIMEOUT,
+        min_timeout: float = SWEEP_MIN_TIMEOUT,
+        retries: int = SWEEP_RETRIES,
+        port: int = 22,
+        banner: bool = BANNER_CHECK,
+        queue: Optional[Queue] = None,
+    ):
+        """
+        Instancie la classe 'Sweep'.
+
+        :param l_hosts: Une 'liste' d'une ou plusieurs ipv4
+        :param max_in_flight: le nombre max de connexions en cours
+        :param timeout: le timeout max (s) d'un host
+        :param min_timeout: le timeout min (s) d'un host
+        :param retries: le nombre de nouveaux essais d'un host sans réponse
+        :param port: le port a tester
+        :param banner: True pour lire et classer la bannière SSH des hosts
+        :param queue: la Queue des workers SSH, optionnel
+        """
+        self._hosts: Iterator = iter(l_hosts)
+        self._max: int = _fd_limit(max_in_flight)
+        self._timeout: float = timeout
+        self._min_timeout: float = min_timeout
+        self._retries: int = retries
+        self._port: int = port
+        self._banner: bool = banner
+        self._srtt: Optional[float] = None
+        self._rttvar: float = 0.0
+        self._selector = selectors.DefaultSelector()
+        self._deadlines: list[tuple[float, int, socket.socket]] = []
+        self._count = itertools.count()
+        self._queue: Optional[Queue] = queue
+        self._pending: deque[str] = deque()
+        self.valid: list[str] = []
+        self.banners: dict[str, str] = {}
+        self.kinds: dict[str, str] = {}
+
+    def start(self) -> list[str]:
+        """
+        Point d'entrée pour chaque instance de classe 'Sweep', lance les
+        connexions et attend les réponses jusqu'a ce que tous les hosts
+        soient testés.
+
+        :return: la liste des ips valides
+        """
+        _log.info("Debut du check des ips")
+        hosts_left = True
+        try:
+            while hosts_left or self._selector.get_map() or self._pending:
+                self._flush()
+                if hosts_left and not self._pending:
+                    hosts_left = self._fill()
+                self._wait()
+                self._expire()
+        finally:
+            for key in list(self._selector.get_map().values()):
+                self._close(key.fileobj)  # type: ignore
+            self._selector.close()
+        _log.info("Check des ips fini")
+        _log.info(f"{len(self.valid)} Hosts détectés")
+        return self.valid
+
+    def _fill(self) -> bool:
+        """
+        Cette fonction lance des connexions jusqu'a 'max_in_flight'
+        connexions en cours.
+
+        :return: False si tous les hosts ont été lancés, sinon True
+        """
+        while len(self._selector.get_map()) < self._max:
+            host = next(self._hosts, None)
+            if host is None:
+                return False
+            self._connect(str(host).strip())
+        return True
+
+    def _connect(self, host: str, attempt: int = 0) -> None:
+        """
+        Cette fonction lance la connexion non bloquante vers l'host.
+
+        :param host: ipv4
+        :param attempt: le numéro de l'essai (0 pour le premier), le timeout
+            est doublé a chaque essai (backoff de RFC 6298)
+        :return: None
+        """
+        try:
+            s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        except OSError as e:  # plus de sockets disponibles, la limite baisse
+            if not self._selector.get_map():
+                raise
+            self._max = len(self._selector.get_map())
+            _log.warning(f"{e}, limite de connexions en cours : {self._max}")
+            self._hosts = itertools.chain([host], self._hosts)
+            return
+        s.setblocking(False)
+        start = monotonic()
+        err = s.connect_ex((host, self._port))
+        if err == 0:
+            self._done(s, host, start, 0)
+        elif err in _IN_PROGRESS:
+            deadline = start + self._rto() * 2**attempt
+            self._watch(s, selectors.EVENT_WRITE, host, start, deadline, attempt)
+        else:
+            self._done(s, host, start, err)
+
+    def _watch(
+        self,
+        s: socket.socket,
+        event: int,
+        host: str,
+        start: float,
+        deadline: float,
+        attempt: int = 0,
+    ) -> None:
+        """
+        Cette fonction attend 'event' sur le socket jusqu'a 'deadline' : la
+        fin de la connexion (EVENT_WRITE) ou la bannière SSH (EVENT_READ).
+
+        :param s: le socket
+        :param event: selectors.EVENT_WRITE ou selectors.EVENT_READ
+        :param host: ipv4
+        :param start: le début de la connexion (monotonic)
+        :param deadline: la deadline (monotonic)
+        :param attempt: le numéro de l'essai de connexion, voir _connect()
+        :return: None
+        """
+        seq = next(self._count)
+        self._selector.register(s, event, (host, start, seq, attempt))
+        heapq.heappush(self._deadlines, (deadline, seq, s))
+
+    def _wait(self) -> None:
+        """
+        Cette fonction attend la fin des connexions en cours, jusqu'a la
+        prochaine deadline.
+
+        :return: None
+        """
+        if not self._selector.get_map():
+            return
+        timeout = (
+            max(0.0, self._deadlines[0][0] - monotonic()) if self._deadlines else None
+        )
+        if self._pending:  # la queue est pleine, nouvel essai dans 0.1s
+            timeout = 0.1 if timeout is None else min(timeout, 0.1)
+        for key, _ in self._selector.select(timeout):
+            s: socket.socket = key.fileobj  # type: ignore
+            host, start, _, _ = key.data
+            self._selector.unregister(s)
+            if key.events == selectors.EVENT_READ:
+                self._accept(s, host, peek_banner(s))
+            else:
+                err = s.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR)
+                self._done(s, host, start, err)
+
+    def _expire(self) -> None:
+        """
+        Cette fonction ferme les connexions dont la deadline est dépassée :
+        l'host est réessayé si il lui reste des essais, sinon il est down. Un
+        host connecté sans bannière SSH est gardé.
+
+        :return: None
+        """
+        now = monotonic()
+        while self._deadlines and self._deadlines[0][0] <= now:
+            _, seq, s = heapq.heappop(self._deadlines)
+            try:
+                key = self._selector.get_key(s)
+            except (KeyError, ValueError):
+                continue  # connexion deja terminée
+            if key.data[2] != seq:
+                continue  # deadline d'une étape précédente
+            self._selector.unregister(s)
+            if key.events == selectors.EVENT_READ:
+                self._accept(s, key.data[0], None)
+                continue
+            host, _, _, attempt = key.data
+            self._close(s)
+            if attempt < self._retries:
+                _log.debug(f"Connexion vers l'host {host} timed out, nouvel essai.")
+                self._connect(host, attempt + 1)
+                continue
+            _log.debug(f"Connexion vers l'host {host} timed out.")
+            health_store.record(host, Outcome.DOWN)
+
+    def _done(self, s: socket.socket, host: str, start: float, err: int) -> None:
+        """
+        Cette fonction traite une connexion terminée (socket désenregistré du
+        selector) : si la connexion a réussi, le RTT est mis a jour et la
+        bannière SSH est attendue (ou l'host est directement accepté, voir
+        _accept()).
+
+        :param s: le socket
+        :param host: ipv4
+        :param start: le début de la connexion (monotonic)
+        :param err: le code d'erreur de la connexion, 0 si réussie
+        :return: None
+        """
+        if err:
+            self._close(s)
+            error = errno.errorcode.get(err, err)
+            _log.debug(f"Erreur lors de la connexion vers l'host {host}: {error}")
+            health_store.record(host, Outcome.DOWN)
+            return
+        _log.debug(f"Succes lors de la connexion vers l'host {host}.")
+        self._sample(monotonic() - start)
+        if self._banner:
+            self._watch(
+                s, selectors.EVENT_READ, host, start, monotonic() + BANNER_TIMEOUT
+            )
+            return
+        self._accept(s, host, None)
+
+    def _accept(self, s: socket.socket, host: str, banner: Optional[str]) -> None:
+        """
+        Cette fonction classe l'host depuis sa bannière SSH, puis l'ajoute
+        aux ips valides (le socket est gardé pour la connexion SSH, voir
+        handoff.py) ou l'ignore si il ne peut pas produire de rapport.
+
+        :param s: le socket connecté
+        :param host: ipv4
+        :param banner: la bannière SSH, None si non lue
+        :return: None
+        """
+        self.banners[host] = banner or ""
+        kind = classify(banner) if banner else "unknown"
+        self.kinds[host] = kind
+        if is_dropped(kind):
+            _log.debug(f"Host {host} ignoré, équipement {kind} ({banner})")
+            self._close(s)
+            health_store.record(host, Outcome.NON_CISCO)
+            return
+        if not socket_handoff.keep(host, s):
+            self._close(s)
+        self.valid.append(host)
+        if self._queue is not None:
+            self._pending.append(host)
+
+    def _flush(self) -> None:
+        """
+        Cette fonction ajoute les hosts valides en attente dans la Queue des
+        workers SSH, sans bloquer les connexions en cours. Si plus aucune
+        connexion n'est en cours, elle attend qu'une place se libère.
+
+        :return: None
+        """
+        while self._pending:
+            try:
+                self._queue.put(  # type: ignore
+                    self._pending[0], block=not self._selector.get_map()
+                )
+            except Full:
+                return
+            self._pending.popleft()
+
+    def _sample(self, rtt: float) -> None:
+        """
+        Cette fonction met a jour le RTT moyen et sa variation (RFC 6298).
+
+        :param rtt: le temps de connexion (s) d'un host
+        :return: None
+        """
+        if self._srtt is None:
+            self._srtt, self._rttvar = rtt, rtt / 2
+            return
+        self._rttvar = 0.75 * self._rttvar + 0.25 * abs(self._srtt - rtt)
+        self._srtt = 0.875 * self._srtt + 0.125 * rtt
+
+    def _rto(self) -> float:
+        """
+        Cette fonction calcule le timeout d'un nouvel host depuis le RTT
+        mesuré ('timeout' tant qu'aucun host n'a répondu).
+
+        :return: le timeout en secondes
+        """
+        if self._srtt is None:
+            return self._timeout
+        rto = self._srtt + 4 * self._rttvar
+        return min(self._timeout, max(self._min_timeout, rto))
+
+    def _close(self, s: socket.socket) -> None:
+        """
+        Cette fonction ferme le socket sans erreur.
+
+        :param s: le socket
+        :return: None
+        """
+        try:
+            s.close()
+        except OSError:
+            pass
+
+
+if __name__ == "__main__":
+    pass
@@ -3,24 +3,33 @@
 
 import argparse
 import logging
+import multiprocessing
 import sys
 from ipaddress import ip_address
 from pathlib import Path
 from typing import Any, Union
 
+from Unused_Port.export import exporter
 from Unused_Port.helper import (
     _exit,
     check_path,
     now,
     run_scheduler,
 )
+from Unused_Port.session_pool import session_pool
 from Unused_Port.starter import start
 from Unused_Port.static import (
     ADMIN_NETWORK,
     DAYS,
     DOSSIER_PARTAGE_SITE,
+    ENGINE,
+    ENGINES,
+    EXPORT,
+    EXPORT_FORMATS,
     HOSTS,
     INV_DAYS,
+    SESSION_POOL_INTERACTIVE,
+    WORKERS,
 )
 
 _log = logging.getLogger(__name__)
@@ -58,21 +67,47 @@ def gen_parser():
         "--schedule",
         help="Permet lancer une plannification du lancement du script tous les X jours",
     )
+    parser.add_argument(
+        "--engine",
+        help="Moteur de collecte, 'thread' ou 'asyncio' (milliers de switchs)",
+        choices=ENGINES,
+        default=ENGINE,
+    )
+    parser.add_argument(
+        "--workers",
+        help="Nombre de process entre lesquels les ips sont réparties",
+        type=int,
+        default=WORKERS,
+    )
+    parser.add_argument(
+        "--interactive",
+        help="Redemande une ip après chaque check, les sessions SSH sont gardées",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--export",
+        help="Exporte toutes les interfaces du run dans un seul fichier",
+        choices=EXPORT_FORMATS,
+        default=EXPORT,
+    )
     return parser.parse_args()
 
 
-def get_ip_input() -> str:
+def get_ip_input(allow_empty: bool = False) -> str:
     """
     Récupère l'ip en tant qu'input si l'utilisateur n'a pas séléctionner
     --auto, puis verifie si c'est une ip et si elle est bien dans le réseau
     France, sinon redemande une ip.
 
+    :param allow_empty: si True, une ip vide est acceptée (fin de --interactive)
     :return: l'ip sous forme str()
     """
     ip = None
 
     while not ip:
         ip = str(input("Renseigner l'ip du switch : "))
+        if allow_empty and not ip:
+            return ""
         try:
             ip_address(ip)
         except ValueError:
@@ -104,6 +139,7 @@ def get_real_schedule_type(t: Union[int, str]) -> Union[int, str]:
 
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support()  # process workers avec pyinstaller
     try:
         if not (p := Path("logs")).exists():
             p.mkdir()
@@ -134,6 +170,7 @@ if __name__ == "__main__":
         exit_path: bool = check_path(DOSSIER_PARTAGE_SITE)
         if exit_path:
             _exit("Au moins 1 Path invalide detecté")
+        exporter.fmt = args.export
 
         ip: Any
         if args.auto:
@@ -156,11 +193,13 @@ if __name__ == "__main__":
                     )
 
                 getattr(schedule.every(), day or scheduled).at("18:00").do(
-                    start, ip, False
+                    start, ip, False, engine=args.engine, workers=args.workers
                 )
                 # schedule.every(1).minutes.do(start, ip, False) debug
             elif isinstance(scheduled, int):
-                schedule.every(scheduled).days.at("18:00").do(start, ip, False)
+                schedule.every(scheduled).days.at("18:00").do(
+                    start, ip, False, engine=args.engine, workers=args.workers
+                )
 
             fmt_day = "jours" if isinstance(scheduled, int) else ""
             fmt = "les ips du subnet France" if type(ip) is not str else f"l'ip {ip}"
@@ -171,8 +210,16 @@ if __name__ == "__main__":
 
             run_scheduler()
 
+        elif args.interactive and type(ip) is str:
+            _log.info("Mode interactif, entrer une ip vide pour quitter")
+            session_pool.max_sessions = SESSION_POOL_INTERACTIVE
+            while ip:
+                start(ip, False, engine=args.engine, workers=args.workers)
+                ip = get_ip_input(allow_empty=True)
+            session_pool.close_all()
+
         else:
-            start(ip)
+            start(ip, engine=args.engine, workers=args.workers)
 
     except KeyboardInterrupt:
         _exit("KeyboardInterrupt, ctrl C appuyé")
@@ -0,0 +1,5 @@
+import os
+import tempfile
+
+# static.py lit ALLUSERSPROFILE a l'import (variable Windows)
+os.environ.setdefault("ALLUSERSPROFILE", tempfile.gettempdir())
@@ -0,0 +1,55 @@
+import pytest
+
+from Unused_Port.duration import (
+    DAY,
+    HOUR,
+    MINUTE,
+    NEVER,
+    WEEK,
+    YEAR,
+    format_weeks,
+    parse_duration,
+)
+
+
+@pytest.mark.parametrize(
+    ("value", "seconds"),
+    [
+        ("never", NEVER),
+        ("00:01:02", MINUTE + 2),
+        ("123:00:00", 123 * HOUR),
+        ("3d04h", 3 * DAY + 4 * HOUR),
+        ("5w2d", 5 * WEEK + 2 * DAY),
+        ("1y2w", YEAR + 2 * WEEK),
+        (
+            "1 year, 2 weeks, 3 days, 4 hours, 5 minutes",
+            YEAR + 2 * WEEK + 3 * DAY + 4 * HOUR + 5 * MINUTE,
+        ),
+        ("10 day(s), 3 hour(s)", 10 * DAY + 3 * HOUR),
+        ("3d04h,", 3 * DAY + 4 * HOUR),
+    ],
+)
+def test_parse_duration(value, seconds):
+    assert parse_duration(value) == seconds
+
+
+@pytest.mark.parametrize("value", ["", "unknown", "1:2"])
+def test_parse_duration_unknown(value):
+    assert parse_duration(value) is None
+
+
+def test_never_is_the_longest():
+    assert parse_duration("never") > parse_duration("99y52w")  # type: ignore
+
+
+@pytest.mark.parametrize(
+    ("seconds", "text"),
+    [
+        (0, "< 1 week"),
+        (6 * DAY, "< 1 week"),
+        (5 * WEEK + DAY, "5 week(s)"),
+        (YEAR + 2 * WEEK, "1 year, 2 week(s)"),
+    ],
+)
+def test_format_weeks(seconds, text):
+    assert format_weeks(seconds) == text
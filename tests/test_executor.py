@@ -0,0 +1,68 @@
+import time
+from threading import Barrier, BrokenBarrierError, Event
+
+from Unused_Port.concurrency import AIMDController, Outcome
+from Unused_Port.executor import SharedExecutor
+
+
+def wait_idle(pool: SharedExecutor, threads: int) -> None:
+    deadline = time.monotonic() + 2
+    while time.monotonic() < deadline:
+        with pool._cond:
+            if pool._idle == threads and pool._threads == threads:
+                return
+        time.sleep(0.01)
+    raise AssertionError("le pool n'est pas inactif")
+
+
+def test_burst_after_idle_grows_the_pool():
+    pool = SharedExecutor(8, idle_timeout=30)
+    pool.submit(lambda _: None, None).result(timeout=2)
+    wait_idle(pool, 1)
+    barrier = Barrier(8, timeout=2)
+
+    def task(_):
+        try:
+            barrier.wait()
+        except BrokenBarrierError:
+            return False
+        return True
+
+    futures = [pool.submit(task, i) for i in range(8)]
+    assert all(future.result(timeout=5) for future in futures)
+    assert pool._threads == 8
+
+
+def test_full_controller_does_not_block_other_tasks():
+    pool = SharedExecutor(4, idle_timeout=30)
+    ssh = AIMDController(1, floor=1)
+    blocker, release = Event(), Event()
+
+    def slow(_):
+        blocker.set()
+        release.wait(timeout=5)
+        return Outcome.SUCCESS, None
+
+    first = pool.submit(slow, 1, site="France", controller=ssh)
+    assert blocker.wait(timeout=2)
+    stuck = pool.submit(slow, 2, site="France", controller=ssh)
+    free = pool.submit(lambda ip: ip, "10.0.0.1", site="France")
+    assert free.result(timeout=2) == "10.0.0.1"
+    assert not stuck.done()
+    release.set()
+    first.result(timeout=2)
+    stuck.result(timeout=2)
+
+
+def test_run_releases_controller():
+    pool = SharedExecutor(4, idle_timeout=30)
+    controller = AIMDController(2, floor=2)
+    results: dict[int, tuple] = {}
+    pool.run(
+        lambda i: (Outcome.SUCCESS, 0.01),
+        range(10),
+        controller=controller,
+        on_result=results.__setitem__,
+    )
+    assert len(results) == 10
+    assert controller._in_flight == 0
@@ -0,0 +1,77 @@
+import csv
+import json
+
+import pytest
+
+export = pytest.importorskip("Unused_Port.export")  # helper.py: schedule, pywin32
+
+from Unused_Port.static import DIRS  # noqa: E402
+
+ROWS = [
+    ("France", "10.0.0.1", "SW1", "Gi1/0/2", "12w", "1 year"),
+    ("France", "10.0.0.1", "SW1", "Gi1/0/3", "never", "1 year"),
+    ("", "10.0.0.2", "SW2", "Gi1/0/1", "3d", "2 weeks"),
+]
+
+
+@pytest.fixture(autouse=True)
+def folder(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(DIRS, "_values", {})  # recrées depuis tmp_path
+    return tmp_path / "export"
+
+
+def read(path):
+    if path.suffix == ".csv":
+        with open(path, newline="", encoding="utf-8") as file:
+            header, *rows = csv.reader(file)
+        assert tuple(header) == export.COLUMNS
+        return [tuple(row) for row in rows]
+    lines = path.read_text(encoding="utf-8").splitlines()
+    return [
+        tuple(json.loads(line)[column] for column in export.COLUMNS) for line in lines
+    ]
+
+
+@pytest.mark.parametrize("fmt", ["csv", "jsonl"])
+def test_round_trip(fmt, folder):
+    exporter = export.Exporter(fmt)
+    assert exporter.begin()
+    assert not exporter.begin()  # deja ouvert
+    exporter.write_rows(ROWS[:2])
+    exporter.write_rows(ROWS[2:])
+    path = exporter.end()
+    assert path.suffix == f".{fmt}"
+    assert read(path) == ROWS
+    assert list(folder.iterdir()) == [path]
+
+
+def test_parquet_without_pyarrow_falls_back_to_csv(monkeypatch):
+    monkeypatch.setattr(export, "pa", None)
+    exporter = export.Exporter("parquet")
+    exporter.begin()
+    exporter.write_rows(ROWS)
+    path = exporter.end()
+    assert path.suffix == ".csv"
+    assert read(path) == ROWS
+
+
+@pytest.mark.parametrize("fmt", ["csv", "jsonl"])
+def test_shards_are_merged_by_the_parent(fmt, folder, monkeypatch):
+    monkeypatch.setattr(export, "EXPORT_ROW_GROUP", 2)  # plusieurs paquets
+    parts = []
+    for rows in (ROWS[:1], ROWS[1:], []):
+        shard = export.Exporter(fmt)
+        shard.shard = True
+        assert shard.begin()
+        shard.write_rows(rows)
+        parts.append(shard.end())
+    assert len(set(parts)) == len(parts)
+
+    exporter = export.Exporter(fmt)
+    exporter.begin()
+    for part in [*parts, None]:
+        exporter.merge(part)
+    path = exporter.end()
+    assert read(path) == ROWS
+    assert list(folder.iterdir()) == [path]
@@ -0,0 +1,109 @@
+import json
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+
+from Unused_Port import health
+from Unused_Port.concurrency import Outcome
+from Unused_Port.health import HealthStore
+from Unused_Port.inventory import Inventory
+from Unused_Port.static import HEALTH_COOLDOWN, HEALTH_THRESHOLD
+
+
+@pytest.fixture
+def inventory(tmp_path, monkeypatch):
+    inventory = Inventory(tmp_path / "inventory.json")
+    inventory.update(["10.0.0.1", "10.0.0.2"])
+    monkeypatch.setattr(health, "inventory", inventory)
+    return inventory
+
+
+@pytest.fixture
+def store(tmp_path, inventory):
+    return HealthStore(tmp_path / "health.json")
+
+
+def age(store: HealthStore, ip: str, days: int) -> None:
+    last = datetime.now() - timedelta(days=days)
+    store._hosts[ip]["last"] = last.isoformat(timespec="seconds")
+
+
+def test_closed_until_threshold(store):
+    for _ in range(HEALTH_THRESHOLD - 1):
+        store.record("10.0.0.1", Outcome.TIMEOUT)
+    assert store.state("10.0.0.1") == "closed"
+    store.record("10.0.0.1", Outcome.TIMEOUT)
+    assert store.state("10.0.0.1") == "open"
+
+
+def test_other_failure_resets_count(store):
+    for _ in range(HEALTH_THRESHOLD - 1):
+        store.record("10.0.0.1", Outcome.TIMEOUT)
+    store.record("10.0.0.1", Outcome.AUTH)
+    assert store.state("10.0.0.1") == "closed"
+
+
+def test_half_open_after_cooldown(store):
+    for _ in range(HEALTH_THRESHOLD):
+        store.record("10.0.0.1", Outcome.AUTH)
+    age(store, "10.0.0.1", HEALTH_COOLDOWN[Outcome.AUTH])
+    assert store.state("10.0.0.1") == "half_open"
+
+
+def test_success_closes(store):
+    for _ in range(HEALTH_THRESHOLD):
+        store.record("10.0.0.1", Outcome.TIMEOUT)
+    store.record("10.0.0.1", None)
+    assert store.state("10.0.0.1") == "closed"
+
+
+def test_filter_order(store):
+    for ip in ("10.0.0.1", "10.0.0.2"):
+        for _ in range(HEALTH_THRESHOLD):
+            store.record(ip, Outcome.TIMEOUT)
+    age(store, "10.0.0.2", HEALTH_COOLDOWN[Outcome.TIMEOUT])
+    hosts = ["10.0.0.1", "10.0.0.2", "10.0.0.3"]
+    assert list(store.filter(hosts)) == ["10.0.0.3", "10.0.0.2"]
+
+
+def test_down_only_for_known_hosts(store):
+    store.record("10.0.0.1", Outcome.DOWN)
+    store.record("10.0.0.9", Outcome.DOWN)
+    assert "10.0.0.1" in store._hosts
+    assert "10.0.0.9" not in store._hosts
+    store.record("10.0.0.9", Outcome.NON_CISCO)
+    store.record("10.0.0.9", Outcome.DOWN)  # deja vu joignable
+    assert store._hosts["10.0.0.9"]["failure"] == Outcome.DOWN
+
+
+def test_save_once_per_run(store):
+    store.begin()
+    store.begin()
+    store.record("10.0.0.1", Outcome.TIMEOUT)
+    store.end()
+    assert not store.path.exists()
+    store.end()
+    assert json.loads(store.path.read_text())["10.0.0.1"]["count"] == 1
+
+
+def test_save_merges_other_process(store):
+    store.path.write_text(json.dumps({"10.0.0.5": {"failure": "auth"}}))
+    store.record("10.0.0.1", Outcome.TIMEOUT)
+    store.save()
+    assert set(json.loads(store.path.read_text())) == {"10.0.0.1", "10.0.0.5"}
+
+
+def save_one(path: str, ip: str) -> None:
+    store = HealthStore(Path(path))
+    store.record(ip, Outcome.TIMEOUT)
+    store.save()
+
+
+def test_concurrent_saves_keep_every_process(tmp_path):
+    path = tmp_path / "health.json"
+    ips = [f"10.0.1.{i}" for i in range(64)]
+    with ProcessPoolExecutor(8) as pool:
+        list(pool.map(save_one, [str(path)] * len(ips), ips))
+    assert set(json.loads(path.read_text())) == set(ips)
@@ -0,0 +1,44 @@
+import json
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from Unused_Port.inventory import Inventory
+
+
+def save_one(path: str, ip: str) -> None:
+    inventory = Inventory(Path(path))
+    inventory.update([ip], "France", full=True)
+    inventory.save()
+
+
+def test_save_merges_with_the_file(tmp_path):
+    path = tmp_path / "inventory.json"
+    first, second = Inventory(path), Inventory(path)
+    first.update(["10.0.0.1"])
+    second.update(["10.0.0.2"], "US", full=True)
+    first.save()
+    second.save()
+    data = json.loads(path.read_text())
+    assert set(data["hosts"]) == {"10.0.0.1", "10.0.0.2"}
+    assert set(data["sweeps"]) == {"US"}
+    assert Inventory(path).known("10.0.0.1")
+
+
+def test_failed_save_keeps_changes(tmp_path):
+    blocker = tmp_path / "state"
+    blocker.write_text("")  # le dossier ne peut pas être créé
+    inventory = Inventory(blocker / "inventory.json")
+    inventory.update(["10.0.0.1"])
+    inventory.save()
+    blocker.unlink()
+    inventory.save()
+    data = json.loads((blocker / "inventory.json").read_text())
+    assert set(data["hosts"]) == {"10.0.0.1"}
+
+
+def test_concurrent_saves_keep_every_process(tmp_path):
+    path = tmp_path / "inventory.json"
+    ips = [f"10.0.1.{i}" for i in range(64)]
+    with ProcessPoolExecutor(8) as pool:
+        list(pool.map(save_one, [str(path)] * len(ips), ips))
+    assert set(json.loads(path.read_text())["hosts"]) == set(ips)
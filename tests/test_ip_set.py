@@ -0,0 +1,81 @@
+import pickle
+from ipaddress import IPv4Address
+
+import pytest
+
+from Unused_Port.ip_set import IPSet
+
+
+def test_merge_overlapping_and_adjacent():
+    ips = IPSet(["10.0.0.0-10.0.0.10", "10.0.0.5-10.0.0.20", "10.0.0.21"])
+    assert ips.intervals == (
+        (int(IPv4Address("10.0.0.0")), int(IPv4Address("10.0.0.21"))),
+    )
+    assert len(ips) == 22
+
+
+def test_network_hosts():
+    assert len(IPSet(["192.168.1.0/24"])) == 256
+    hosts = IPSet(["192.168.1.0/24"], hosts=True)
+    assert len(hosts) == 254
+    assert "192.168.1.0" not in hosts
+    assert "192.168.1.255" not in hosts
+    assert len(IPSet(["192.168.1.0/31"], hosts=True)) == 2
+
+
+def test_large_network_is_not_expanded():
+    ips = IPSet(["10.0.0.0/8"])
+    assert len(ips) == 2**24
+    assert len(ips.intervals) == 1
+    assert "10.255.255.255" in ips
+    assert "11.0.0.0" not in ips
+
+
+@pytest.mark.parametrize("value", ["not an ip", "10.0.0", ""])
+def test_contains_invalid(value):
+    assert value not in IPSet(["10.0.0.0/24"])
+
+
+def test_iteration_order():
+    ips = IPSet(["10.0.0.3", "10.0.0.1", "10.0.0.2"])
+    assert list(ips) == ["10.0.0.1", "10.0.0.2", "10.0.0.3"]
+
+
+def test_subtraction():
+    ips = IPSet(["10.0.0.0/24"]) - IPSet(["10.0.0.0-10.0.0.9", "10.0.0.100/30"])
+    assert len(ips) == 256 - 10 - 4
+    assert "10.0.0.9" not in ips
+    assert "10.0.0.10" in ips
+    assert "10.0.0.102" not in ips
+    assert "10.0.0.104" in ips
+    assert IPSet(["10.0.0.0/24"]) - IPSet(["10.0.0.0/16"]) == IPSet()
+
+
+def test_union():
+    ips = IPSet(["10.0.0.0/25"]) | IPSet(["10.0.0.128/25"])
+    assert ips == IPSet(["10.0.0.0/24"])
+
+
+@pytest.mark.parametrize("parts", [1, 3, 7, 300])
+def test_split(parts):
+    ips = IPSet(["10.0.0.0/24", "10.0.2.0-10.0.2.9"])
+    chunks = ips.split(parts)
+    assert len(chunks) == min(parts, len(ips))
+    sizes = [len(chunk) for chunk in chunks]
+    assert sum(sizes) == len(ips)
+    assert max(sizes) - min(sizes) <= 1
+    merged = IPSet()
+    for chunk in chunks:
+        merged = merged | chunk
+    assert merged == ips
+
+
+def test_split_empty():
+    assert IPSet().split(4) == []
+
+
+def test_pickle():
+    ips = IPSet(["10.0.0.0/24", "10.0.5.1"])
+    copy = pickle.loads(pickle.dumps(ips))
+    assert copy == ips
+    assert "10.0.5.1" in copy
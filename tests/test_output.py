@@ -0,0 +1,46 @@
+import time
+
+import pytest
+
+output = pytest.importorskip("Unused_Port.output")  # helper.py: schedule, pywin32
+
+
+@pytest.fixture
+def saved(monkeypatch):
+    saved = []
+
+    def save_wb(workbook, *, site=None, hostname="error"):
+        time.sleep(0.05)  # écriture lente
+        if workbook is None:
+            raise OSError("disque plein")
+        saved.append((site, hostname))
+        return True
+
+    monkeypatch.setattr(output, "save_wb", save_wb)
+    return saved
+
+
+def test_flush_waits_for_queued_writes(saved):
+    queue = output.OutputQueue()
+    for hostname in ("SW1", "SW2", "SW3"):
+        queue.put(b"xl", site="France", hostname=hostname)
+    queue.flush()
+    assert saved == [("France", "SW1"), ("France", "SW2"), ("France", "SW3")]
+
+
+def test_failed_write_does_not_stop_the_writer(saved):
+    queue = output.OutputQueue()
+    queue.put(None, hostname="SW1")
+    queue.put(b"xl", hostname="SW2")
+    queue.flush()
+    assert saved == [(None, "SW2")]
+
+
+def test_put_waits_when_the_queue_is_full(saved):
+    queue = output.OutputQueue(max_size=1)
+    start = time.monotonic()
+    for hostname in ("SW1", "SW2", "SW3"):
+        queue.put(b"xl", hostname=hostname)
+    assert time.monotonic() - start >= 0.05  # au moins une écriture attendue
+    queue.flush()
+    assert len(saved) == 3
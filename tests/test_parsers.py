@@ -0,0 +1,111 @@
+import pytest
+
+from Unused_Port.parsers import (
+    IntRow,
+    IntStatusRow,
+    UPC_Commands,
+    UPC_Parser,
+    int_key,
+    parse,
+)
+
+SH_INT_STATUS = """
+Port      Name               Status       Vlan       Duplex  Speed Type
+Gi1/0/1                      connected    10         a-full a-1000 10/100/1000BaseTX
+Gi1/0/2   Bureau 12          notconnect   10           auto   auto 10/100/1000BaseTX
+Gi1/0/3   desc notconnect x  connected    1          a-full a-1000 10/100/1000BaseTX
+Gi1/0/4                      disabled     1            auto   auto Not Present
+Gi1/0/5   connected          notconnect   20           auto   auto 10/100/1000BaseTX
+Gi1/0/6   Imprimante         err-disabled 1            auto   auto 10/100/1000BaseTX
+Gi1/0/7   was connected to PC notconnect   10           auto   auto 10/100/1000BaseTX
+Po1                          connected    trunk      a-full a-10G
+"""
+
+
+@pytest.fixture
+def rows() -> dict[str, IntStatusRow]:
+    parser = parse(UPC_Commands.SH_INT, SH_INT_STATUS)
+    return {row.interface: row for row in parser.rows}
+
+
+def test_int_status_simple(rows):
+    assert rows["Gi1/0/1"] == IntStatusRow("Gi1/0/1", "connected", "10", "a-1000")
+    assert rows["Gi1/0/2"] == IntStatusRow("Gi1/0/2", "notconnect", "10", "auto")
+    assert rows["Gi1/0/4"] == IntStatusRow("Gi1/0/4", "disabled", "1", "auto")
+
+
+@pytest.mark.parametrize(
+    ("interface", "status", "vlan", "speed"),
+    [
+        ("Gi1/0/3", "connected", "1", "a-1000"),
+        ("Gi1/0/5", "notconnect", "20", "auto"),
+        ("Gi1/0/7", "notconnect", "10", "auto"),
+    ],
+)
+def test_int_status_keyword_in_description(rows, interface, status, vlan, speed):
+    assert rows[interface] == IntStatusRow(interface, status, vlan, speed)
+
+
+def test_int_status_ignored_lines(rows):
+    assert "Gi1/0/6" not in rows  # err-disabled
+    assert "Po1" not in rows
+    assert len(rows) == 6
+
+
+def test_last_input():
+    data = """
+GigabitEthernet1/0/2 is down, line protocol is down (notconnect)
+  Last input never, output never, output hang never
+GigabitEthernet1/0/3 is up, line protocol is up (connected)
+  Last input 00:00:01, output 00:00:00, output hang never
+TenGigabitEthernet1/1/1 is administratively down, line protocol is down
+  Last input 3y2w, output never, output hang never
+"""
+    parser = parse(UPC_Commands.SH_ALL_INT, data)
+    assert [row[:2] for row in parser.rows] == [
+        ("GigabitEthernet1/0/2", "never"),
+        ("GigabitEthernet1/0/3", "00:00:01"),
+        ("TenGigabitEthernet1/1/1", "3y2w"),
+    ]
+    assert isinstance(parser.rows[1], IntRow)
+    assert parser.rows[1].seconds == 1
+
+
+def test_last_input_without_header():
+    parser = parse(UPC_Commands.SH_LAST_INT, "  Last input never, output never")
+    assert parser.rows == []
+
+
+def test_version():
+    data = """
+Cisco IOS Software, C2960X Software (C2960X-UNIVERSALK9-M), Version 15.2(7)E4
+SW-PARIS-01 uptime is 1 year, 2 weeks, 3 days, 4 hours, 5 minutes
+Model Number                       : WS-C2960X-48FPD-L
+"""
+    row = parse(UPC_Commands.SH_VERSION, data).result()
+    assert row is not None
+    assert row.hostname == "SW-PARIS-01"
+    assert row.model == "WS-C2960X-48FPD-L"
+    assert row.uptime == "1 year, 2 weeks, 3 days, 4 hours, 5 minutes"
+
+
+def test_version_not_cisco():
+    assert parse(UPC_Commands.SH_VERSION, "Linux 5.10 x86_64").result() is None
+
+
+@pytest.mark.parametrize(
+    ("short", "full"),
+    [
+        ("Gi1/0/2", "GigabitEthernet1/0/2"),
+        ("Te1/1/1", "TenGigabitEthernet1/1/1"),
+        ("Po1", "Port-channel1"),
+    ],
+)
+def test_int_key(short, full):
+    assert int_key(short) == int_key(full)
+    assert int_key("Gi1/0/2") != int_key("Gi1/0/20")
+
+
+def test_parser_is_abstract():
+    with pytest.raises(TypeError):
+        UPC_Parser()  # type: ignore
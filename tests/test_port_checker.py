@@ -0,0 +1,132 @@
+import re
+import socket
+import time
+
+import pytest
+
+# port_checker importe helper (schedule, pywin32)
+pc = pytest.importorskip("Unused_Port.port_checker")
+
+
+class FakeShell:
+    """Shell interactif paramiko, la réponse a chaque envoi est scriptée."""
+
+    def __init__(self, replies=None):
+        self.replies = list(replies or [])
+        self.chunks: list[tuple[float, bytes]] = []
+        self.sent: list[str] = []
+        self.timeout = 0.0
+
+    def sendall(self, data: str) -> None:
+        self.sent.append(data)
+        if self.replies:
+            reply = self.replies.pop(0)
+            for delay, chunk in reply if isinstance(reply, list) else [(0, reply)]:
+                self.chunks.append((delay, chunk.encode()))
+
+    def settimeout(self, timeout: float) -> None:
+        self.timeout = timeout
+
+    def recv(self, size: int) -> bytes:
+        if not self.chunks or self.chunks[0][0] > self.timeout:
+            time.sleep(self.timeout)
+            raise socket.timeout
+        delay, chunk = self.chunks.pop(0)
+        time.sleep(delay)
+        return chunk
+
+    def close(self) -> None:
+        pass
+
+
+@pytest.fixture
+def upc(monkeypatch):
+    monkeypatch.setattr(pc, "throttle", lambda *args, **kwargs: None)
+    upc = object.__new__(pc.UnusedPortChecker)
+    upc._hostname = "10.0.0.1"
+    upc.real_hostname = "SW1"
+    upc._site = None
+    upc._prompt = ""
+    upc._echocompile = None
+    upc._morecompile = re.compile(pc.UPC_Regex.MORE_REGEX)
+    upc._buffer = pc.RecvBuffer()
+    upc._learn_prompt("SW1")
+    return upc
+
+
+def test_slow_output_is_not_cut(upc):
+    chunks = [(0.1, f"ligne {i}\r\n") for i in range(10)] + [(0.1, "SW1#")]
+    upc._shell = FakeShell([chunks])
+    output = upc._exec_command("show interfaces", timeout=0.3)
+    assert output.splitlines()[-2] == "ligne 9"
+
+
+def test_silent_shell_times_out(upc):
+    upc._shell = FakeShell()
+    with pytest.raises(pc.UPC_RETRY_ERROR):
+        upc._exec_command("show interfaces", timeout=0.2)
+
+
+def sh_int(name: str, last_input: str, prompt: str = "SW1#") -> str:
+    return (
+        f"{prompt}show int {name}\r\n"
+        f"{name} is down, line protocol is down (notconnect)\r\n"
+        f"  Hardware is Gigabit Ethernet, address is 0011.2233.4455\r\n"
+        f"  Last input {last_input}, output never, output hang never\r\n"
+    )
+
+
+ERASE_MORE = "\x08" * 9 + " " * 9 + "\x08" * 9
+
+
+def test_batch_is_split_on_echoes(upc):
+    upc.batch = 3
+    first = sh_int("GigabitEthernet1/0/1", "never", prompt="")
+    upc._shell = FakeShell(
+        [
+            first
+            + sh_int("GigabitEthernet1/0/2", "1y2w")
+            + sh_int("GigabitEthernet1/0/3", "00:00:05")
+            + "SW1#"
+        ]
+    )
+    table = upc._batch_last_inputs(["Gi1/0/1", "Gi1/0/2", "Gi1/0/3"], {})
+    assert {key: row.last_input for key, row in table.items()} == {
+        "gigabitethernet1/0/1": "never",
+        "gigabitethernet1/0/2": "1y2w",
+        "gigabitethernet1/0/3": "00:00:05",
+    }
+    assert upc._shell.sent == [
+        "show int Gi1/0/1\r\nshow int Gi1/0/2\r\nshow int Gi1/0/3\r\n"
+    ]
+
+
+def test_batch_more_prompt(upc):
+    upc.batch = 2
+    second = sh_int("GigabitEthernet1/0/2", "3d04h")
+    head, rest = second.split("  Last input")
+    upc._shell = FakeShell(
+        [
+            sh_int("GigabitEthernet1/0/1", "never", prompt="") + head + " --More-- ",
+            ERASE_MORE + "  Last input" + rest + "SW1#",
+        ]
+    )
+    table = upc._batch_last_inputs(["Gi1/0/1", "Gi1/0/2"], {})
+    assert table["gigabitethernet1/0/2"].seconds == 3 * 86400 + 4 * 3600
+    assert table["gigabitethernet1/0/1"].last_input == "never"
+    assert upc._shell.sent[1] == " "
+
+
+def test_batch_shifted_output_reopens_shell(upc, monkeypatch):
+    upc.batch = 2
+    upc._shell = FakeShell(
+        [
+            sh_int("GigabitEthernet1/0/1", "never", prompt="")
+            + sh_int("GigabitEthernet1/0/9", "never")
+            + "SW1#"
+        ]
+    )
+    reopened: list[bool] = []
+    monkeypatch.setattr(upc, "_open_shell", lambda: reopened.append(True))
+    assert upc._batch_last_inputs(["Gi1/0/1", "Gi1/0/2"], {}) == {}
+    assert reopened == [True]
@@ -0,0 +1,102 @@
+import pytest
+
+from Unused_Port import ratelimit
+from Unused_Port.ratelimit import TokenBucket, throttle
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)  # threads arrivés en meme temps
+
+
+@pytest.fixture(autouse=True)
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(ratelimit, "monotonic", clock)
+    monkeypatch.setattr(ratelimit, "sleep", clock.sleep)
+    monkeypatch.setattr(TokenBucket, "_instance", {})
+    monkeypatch.setattr(
+        ratelimit,
+        "RATE_LIMITS",
+        {
+            None: {
+                "login": {"rate": 1, "burst": 4},
+                "command": {"rate": 10, "burst": 20},
+            },
+            "US": {"login": {"rate": 2}},
+            "Lab": {"login": {"rate": 0}},
+        },
+    )
+    monkeypatch.setattr(
+        ratelimit, "AAA_DOMAINS", {"France": "eu", "Spain": "eu", "US": "us"}
+    )
+    monkeypatch.setattr(
+        ratelimit, "AAA_RATE_LIMITS", {"eu": {"login": {"rate": 1, "burst": 2}}}
+    )
+    return clock
+
+
+def test_burst_then_wait(clock):
+    bucket = TokenBucket(rate=2, burst=3)
+    assert [bucket.acquire() for _ in range(3)] == [0, 0, 0]
+    assert bucket.acquire() == pytest.approx(0.5)
+    assert clock.sleeps == [pytest.approx(0.5)]
+
+
+def test_waiting_threads_keep_their_order():
+    bucket = TokenBucket(rate=2, burst=1)
+    bucket.acquire()
+    waits = [bucket.acquire() for _ in range(3)]  # jetons réservés
+    assert waits == [pytest.approx(0.5), pytest.approx(1.0), pytest.approx(1.5)]
+
+
+def test_refill_is_capped_by_burst(clock):
+    bucket = TokenBucket(rate=2, burst=3)
+    for _ in range(3):
+        bucket.acquire()
+    clock.now += 1  # 2 jetons
+    assert [bucket.acquire() for _ in range(2)] == [0, 0]
+    assert bucket.acquire() > 0
+    clock.now += 3600
+    assert [bucket.acquire() for _ in range(3)] == [0, 0, 0]
+    assert bucket.acquire() > 0
+
+
+def test_burst_is_at_least_one_token():
+    assert TokenBucket(rate=5, burst=0).burst == 1
+
+
+def test_site_config_is_merged_with_defaults():
+    us = TokenBucket.get("US", "login")
+    assert (us.rate, us.burst) == (2, 4)
+    default = TokenBucket.get("Mexico", "login")
+    assert (default.rate, default.burst) == (1, 4)
+    command = TokenBucket.get(None, "command")
+    assert (command.rate, command.burst) == (10, 20)
+    assert TokenBucket.get("US", "login") is us
+
+
+def test_rate_zero_disables_the_bucket():
+    assert TokenBucket.get("Lab", "login") is None
+    assert throttle("Lab", "login") == 0
+
+
+def test_aaa_bucket_is_shared_between_sites():
+    assert throttle("France", "login") == 0
+    assert throttle("Spain", "login") == 0
+    assert throttle("France", "login") == pytest.approx(1)  # bucket 'eu' vide
+    assert TokenBucket.get("France", "login").acquire() == 0  # site: burst 4
+
+
+def test_aaa_domain_without_limit_uses_site_bucket_only():
+    assert TokenBucket.get("us", "login") is None
+    assert TokenBucket.get("eu", "command") is None
+    assert throttle("US", "login") == 0
+    assert throttle("France", "command") == 0
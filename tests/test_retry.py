@@ -0,0 +1,82 @@
+import pytest
+
+from Unused_Port import retry as retry_module
+from Unused_Port.errors import UPC_AUTH_ERROR, UPC_RETRY_ERROR
+from Unused_Port.retry import RetryBudget, _backoff, retry
+
+
+@pytest.fixture(autouse=True)
+def no_sleep(monkeypatch):
+    waits: list[float] = []
+    monkeypatch.setattr(retry_module, "sleep", waits.append)
+    return waits
+
+
+class Host:
+    def __init__(self, hostname: str, failures: int, error=UPC_RETRY_ERROR):
+        self._hostname = hostname
+        self.failures = failures
+        self.error = error
+        self.calls = 0
+
+    @retry(max_retries=3, delay=0.5)
+    def run(self):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise self.error("échec")
+        return "ok"
+
+
+@pytest.fixture
+def host(request):
+    hostname = request.node.name
+    RetryBudget.reset(hostname)
+    yield hostname
+    RetryBudget.reset(hostname)
+
+
+@pytest.mark.parametrize("attempt", range(6))
+def test_backoff_bounds(attempt):
+    base = min(10.0, 0.5 * retry_module.RETRY_BACKOFF**attempt)
+    for _ in range(50):
+        wait = _backoff(0.5, attempt, 10.0)
+        assert base * (1 - retry_module.RETRY_JITTER) <= wait <= base
+
+
+def test_backoff_capped():
+    assert _backoff(0.5, 30, 2.0) <= 2.0
+
+
+def test_retry_then_success(host, no_sleep):
+    upc = Host(host, failures=2)
+    assert upc.run() == "ok"
+    assert upc.calls == 3
+    assert len(no_sleep) == 2
+
+
+def test_retry_gives_up(host, no_sleep):
+    upc = Host(host, failures=5)
+    assert upc.run() is None
+    assert upc.calls == 3
+    assert len(no_sleep) == 2  # pas d'attente après le dernier essai
+
+
+def test_retry_non_retryable(host, no_sleep):
+    upc = Host(host, failures=5, error=UPC_AUTH_ERROR)
+    assert upc.run() is None
+    assert upc.calls == 1
+    assert no_sleep == []
+
+
+def test_retry_host_budget(host, monkeypatch):
+    monkeypatch.setattr(retry_module, "RETRY_HOST_BUDGET", 1)
+    upc = Host(host, failures=5)
+    assert upc.run() is None
+    assert upc.calls == 2
+
+
+def test_budget_deadline():
+    budget = RetryBudget(retries=5, seconds=1.0)
+    assert budget.spend(0.1)
+    assert not budget.spend(2.0)
+    assert budget.retries == 4
@@ -0,0 +1,132 @@
+import pytest
+
+pytest.importorskip("paramiko")  # sinon session_pool.py lance pip install
+
+from Unused_Port import session_pool
+from Unused_Port.session_pool import SessionPool
+
+KEY = ("SW1", "admin", "secret")
+
+
+class StubTransport:
+    def __init__(self, active=True, authenticated=True, ignore_error=None):
+        self.active = active
+        self.authenticated = authenticated
+        self.ignore_error = ignore_error
+        self.keepalive = None
+        self.closed = False
+
+    def is_active(self):
+        return self.active and not self.closed
+
+    def is_authenticated(self):
+        return self.authenticated
+
+    def send_ignore(self):
+        if self.ignore_error:
+            raise self.ignore_error
+
+    def set_keepalive(self, interval):
+        self.keepalive = interval
+
+    def close(self):
+        self.closed = True
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class StubThread:
+    started = 0
+
+    def __init__(self, target, daemon):
+        pass
+
+    def start(self):
+        StubThread.started += 1
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(session_pool, "monotonic", clock)
+    monkeypatch.setattr(session_pool, "Thread", StubThread)
+    StubThread.started = 0
+    return clock
+
+
+def test_put_then_get_reuses_the_session(clock):
+    pool = SessionPool(2, keepalive=15)
+    transport = StubTransport()
+    assert pool.put(KEY, transport)
+    assert transport.keepalive == 15
+    assert pool.get(KEY) is transport
+    assert pool.get(KEY) is None  # retirée de la pool
+    assert not transport.closed
+
+
+def test_disabled_pool_keeps_nothing(clock):
+    pool = SessionPool(0)
+    assert not pool.put(KEY, StubTransport())
+    assert not pool.put(KEY, None)
+    assert StubThread.started == 0
+
+
+@pytest.mark.parametrize(
+    "transport",
+    [
+        StubTransport(active=False),
+        StubTransport(authenticated=False),
+        StubTransport(ignore_error=EOFError()),
+        StubTransport(ignore_error=OSError("reset")),
+        StubTransport(ignore_error=session_pool.SSHException("closed")),
+    ],
+)
+def test_unhealthy_session_is_not_kept_or_reused(clock, transport):
+    pool = SessionPool(2)
+    assert not SessionPool._healthy(transport)
+    assert not pool.put(KEY, transport)
+    pool._sessions[KEY] = (transport, clock.now)  # cassée dans la pool
+    assert pool.get(KEY) is None
+    assert transport.closed
+
+
+def test_oldest_session_is_closed_when_full(clock):
+    pool = SessionPool(2)
+    transports = [StubTransport() for _ in range(3)]
+    for i, transport in enumerate(transports):
+        assert pool.put((f"SW{i}", "admin", "secret"), transport)
+    assert [t.closed for t in transports] == [True, False, False]
+    assert pool.get(("SW0", "admin", "secret")) is None
+    assert StubThread.started == 1
+
+
+def test_put_replaces_the_session_of_the_same_key(clock):
+    pool = SessionPool(2)
+    old, new = StubTransport(), StubTransport()
+    pool.put(KEY, old)
+    pool.put(KEY, old)  # la meme session n'est pas fermée
+    assert not old.closed
+    pool.put(KEY, new)
+    assert old.closed
+    assert pool.get(KEY) is new
+
+
+def test_evict_closes_idle_sessions(clock):
+    pool = SessionPool(3, idle_timeout=60)
+    idle, used = StubTransport(), StubTransport()
+    pool.put(("SW1", "admin", "secret"), idle)
+    clock.now += 30
+    pool.put(("SW2", "admin", "secret"), used)
+    clock.now += 30
+    assert pool.evict() == 1
+    assert idle.closed
+    assert not used.closed
+    pool.close_all()
+    assert used.closed
+    assert pool.get(("SW2", "admin", "secret")) is None
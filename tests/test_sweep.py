@@ -0,0 +1,193 @@
+import errno
+import selectors
+from collections import deque
+from queue import Queue
+from types import SimpleNamespace
+
+import pytest
+
+from Unused_Port import sweep
+from Unused_Port.concurrency import Outcome
+
+
+class Clock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeSocket:
+    def __init__(self, network, *_):
+        self.network = network
+        self.host = None
+        self.closed = False
+
+    def setblocking(self, flag):
+        pass
+
+    def connect_ex(self, address):
+        self.host = address[0]
+        self.network.connects.append(self.host)
+        if self.network.hosts[self.host] == "refused":
+            return errno.ECONNREFUSED
+        return errno.EINPROGRESS
+
+    def getsockopt(self, level, option):
+        return 0
+
+    def close(self):
+        self.closed = True
+
+
+class FakeSelector:
+    """Selector sans réseau : les hosts 'up' répondent, sinon le temps avance."""
+
+    def __init__(self, network):
+        self.network = network
+        self.map = {}
+        self.timeouts = []
+
+    def register(self, s, events, data=None):
+        self.map[s] = selectors.SelectorKey(s, id(s), events, data)
+
+    def unregister(self, s):
+        return self.map.pop(s)
+
+    def get_map(self):
+        return self.map
+
+    def get_key(self, s):
+        return self.map[s]
+
+    def select(self, timeout=None):
+        self.timeouts.append(timeout)
+        ready = [
+            (key, key.events)
+            for key in self.map.values()
+            if self.network.hosts[key.fileobj.host] == "up"
+        ]
+        if not ready:
+            self.network.clock.now += timeout or 0
+        return ready
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def network(monkeypatch):
+    network = SimpleNamespace(hosts={}, connects=[], down=[], clock=Clock())
+    fake_socket = SimpleNamespace(
+        socket=lambda *args: FakeSocket(network, *args),
+        AF_INET=0,
+        SOCK_STREAM=0,
+        SOL_SOCKET=0,
+        SO_ERROR=0,
+    )
+    monkeypatch.setattr(sweep, "socket", fake_socket)
+    monkeypatch.setattr(sweep, "monotonic", network.clock)
+    monkeypatch.setattr(sweep.socket_handoff, "enabled", False)
+
+    def record(host, outcome):
+        if outcome is Outcome.DOWN:
+            network.down.append(host)
+
+    monkeypatch.setattr(sweep.health_store, "record", record)
+    return network
+
+
+def make_sweep(network, hosts, **kwargs):
+    network.hosts.update(hosts)
+    kwargs.setdefault("banner", False)
+    s = sweep.Sweep(list(hosts), **kwargs)
+    s._selector = FakeSelector(network)
+    return s
+
+
+def test_rto_without_samples_is_the_max_timeout():
+    s = sweep.Sweep([], timeout=3, min_timeout=0.2)
+    assert s._rto() == 3
+
+
+def test_rto_follows_rfc_6298():
+    s = sweep.Sweep([], timeout=3, min_timeout=0.2)
+    s._sample(0.1)  # srtt 0.1, rttvar 0.05
+    assert s._rto() == pytest.approx(0.3)
+    s._sample(0.5)  # rttvar 0.1375, srtt 0.15
+    assert s._srtt == pytest.approx(0.15)
+    assert s._rttvar == pytest.approx(0.1375)
+    assert s._rto() == pytest.approx(0.7)
+
+
+def test_rto_is_clamped():
+    s = sweep.Sweep([], timeout=3, min_timeout=0.2)
+    s._sample(0.01)
+    assert s._rto() == 0.2
+    s = sweep.Sweep([], timeout=3, min_timeout=0.2)
+    s._sample(2)
+    assert s._rto() == 3
+
+
+def test_silent_host_is_retried_with_a_doubled_timeout(network):
+    s = make_sweep(network, {"10.0.0.1": "silent"}, timeout=1, retries=2)
+    s._fill()
+    deadlines = []
+    for _ in range(3):
+        deadline = s._deadlines[0][0]
+        deadlines.append(deadline - network.clock.now)
+        network.clock.now = deadline
+        s._expire()
+    assert deadlines == [1, 2, 4]
+    assert network.connects == ["10.0.0.1"] * 3
+    assert network.down == ["10.0.0.1"]
+    assert not s._selector.get_map()
+
+
+def test_stale_deadline_is_ignored(network):
+    s = make_sweep(network, {"10.0.0.1": "up"}, banner=True)
+    s._fill()
+    network.clock.now += 0.05
+    s._wait()  # connecté, la bannière est attendue avec une nouvelle deadline
+    network.hosts["10.0.0.1"] = "silent"
+    network.clock.now = s._deadlines[0][0]  # deadline de la connexion
+    s._expire()
+    assert s._selector.get_map()
+    assert not s.valid
+    network.clock.now = s._deadlines[0][0]  # deadline de la bannière
+    s._expire()
+    assert s.valid == ["10.0.0.1"]
+    assert s.kinds["10.0.0.1"] == "unknown"
+
+
+def test_start_sorts_hosts(network):
+    hosts = {"10.0.0.1": "up", "10.0.0.2": "refused", "10.0.0.3": "silent"}
+    s = make_sweep(network, hosts, timeout=1, retries=1)
+    assert s.start() == ["10.0.0.1"]
+    assert sorted(network.down) == ["10.0.0.2", "10.0.0.3"]
+    assert network.connects.count("10.0.0.3") == 2
+    assert s._srtt is not None
+
+
+def test_full_queue_keeps_hosts_pending(network):
+    queue = Queue(maxsize=1)
+    s = make_sweep(network, {"10.0.0.9": "silent"}, queue=queue)
+    s._fill()  # une connexion en cours, _flush() ne bloque pas
+    s._pending = deque(["10.0.0.1", "10.0.0.2"])
+    s._flush()
+    assert list(s._pending) == ["10.0.0.2"]
+    assert queue.get_nowait() == "10.0.0.1"
+    s._flush()
+    assert not s._pending
+    assert queue.get_nowait() == "10.0.0.2"
+
+
+def test_wait_polls_pending_hosts(network):
+    s = make_sweep(network, {"10.0.0.9": "silent"}, queue=Queue(), timeout=1)
+    s._fill()
+    s._wait()
+    network.clock.now -= 1  # le select() a avancé le temps
+    s._pending.append("10.0.0.1")
+    s._wait()
+    assert s._selector.timeouts == [1, 0.1]